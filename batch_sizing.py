@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+ADAPTIVE BATCH-GRÖSSE: Zeilen pro Batch aus Zeilenbreite und gemessener Latenz
+Startwert aus der geschätzten Zeilenbreite (Spaltenlängen aus get_table_schema),
+danach Verdopplung bzw. Halbierung je nach Batch-Latenz, begrenzt durch eine
+Speicherobergrenze pro Batch.
+"""
+
+TARGET_BATCH_BYTES = 1024 * 1024        # Startwert: ca. 1 MB pro Batch
+BATCH_MEMORY_LIMIT = 32 * 1024 * 1024   # Obergrenze pro Batch (geschätzte Bytes)
+MIN_BATCH_ROWS = 100
+MAX_BATCH_ROWS = 50000
+TARGET_BATCH_SECONDS = 0.5              # Ziel-Latenz eines Batches (Schreiben + Commit)
+LOB_WIDTH_ESTIMATE = 4096               # BYTE/TEXT/BLOB: Länge im Katalog ist nicht aussagekräftig
+
+# Geschätzte Breite als COPY-Text je Informix-Typ (ohne Zeichenketten-Typen)
+TYPE_WIDTHS = {
+    'SMALLINT': 6, 'INTEGER': 11, 'SERIAL': 11, 'INT8': 20, 'SERIAL8': 20, 'BIGINT': 20, 'BIGSERIAL': 20,
+    'FLOAT': 24, 'SMALLFLOAT': 14, 'DECIMAL': 20, 'MONEY': 16, 'DATE': 10, 'DATETIME': 26,
+    'INTERVAL': 20, 'BOOLEAN': 1, 'BYTE': LOB_WIDTH_ESTIMATE, 'TEXT': LOB_WIDTH_ESTIMATE, 'BLOB': LOB_WIDTH_ESTIMATE,
+}
+
+def estimate_row_width(columns):
+    """Geschätzte Bytes pro Zeile aus den Spalten von get_table_schema"""
+    width = 0
+    for col in columns:
+        ifx_type, length = col.get('ifx_type'), col.get('length') or 0
+        if ifx_type in TYPE_WIDTHS:
+            width += TYPE_WIDTHS[ifx_type]
+        elif ifx_type in ('VARCHAR', 'NVARCHAR'):
+            # collength = max + 256 * min
+            width += (length % 256) or 255
+        else:
+            width += length or 32
+        width += 1  # Trennzeichen
+    return max(width, 1)
+
+def estimate_width_from_description(description):
+    """Breite aus cursor.description (display_size), wenn kein Schema vorliegt"""
+    return max(sum((col[2] or 32) + 1 for col in description), 1)
+
+class BatchSizer:
+    """Wählt und regelt die Batch-Größe einer Tabelle"""
+    def __init__(self, table_name, row_width, log=None,
+                 min_rows=MIN_BATCH_ROWS, max_rows=MAX_BATCH_ROWS, memory_limit=BATCH_MEMORY_LIMIT):
+        self.table_name, self.log = table_name, log
+        self.min_rows, self.max_rows_limit, self.memory_limit = min_rows, max_rows, memory_limit
+        self.row_width = row_width
+        self.max_rows = self._memory_cap(max_rows)
+        self.size = self._clamp(TARGET_BATCH_BYTES // row_width)
+        self.sizes = [self.size]
+        if log: log(f"{table_name}: batch size {self.size} (row width ~{row_width} bytes)")
+
+    def _memory_cap(self, max_rows):
+        return max(self.min_rows, min(max_rows, self.memory_limit // self.row_width))
+
+    def _clamp(self, rows):
+        return max(self.min_rows, min(self.max_rows, int(rows)))
+
+    def observe(self, rows, nbytes, latency):
+        """Nach jedem Batch: gemessene Breite und Latenz; liefert die neue Größe"""
+        if rows and nbytes:
+            # Gemessene Breite ersetzt die Schätzung für die Speichergrenze
+            self.row_width = max(1, nbytes // rows)
+            self.max_rows = self._memory_cap(self.max_rows_limit)
+        new_size = self.size
+        if latency < TARGET_BATCH_SECONDS / 2: new_size = self.size * 2
+        elif latency > TARGET_BATCH_SECONDS * 2: new_size = self.size // 2
+        new_size = self._clamp(new_size)
+        if new_size != self.size:
+            if self.log: self.log(f"{self.table_name}: batch size {self.size} -> {new_size} (latency {latency:.2f}s, row width {self.row_width} bytes)")
+            self.size = new_size
+            self.sizes.append(new_size)
+        return self.size
+
+    def summary(self):
+        return f"{self.table_name}: batch sizes min {min(self.sizes)} / max {max(self.sizes)} / final {self.size}"
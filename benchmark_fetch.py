@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: fetchone vs. Block-Fetch vs. Block-Fetch mit Spalten-Konvertern
+Misst Zeilen/Sek. der Lesepfade (Informix über jaydebeapi) auf den breitesten Tabellen.
+--converters-only misst nur die Umwandlung je Zeile: alter Pfad (fetchone + tuple(row))
+und Konverter-Plan, jeweils abzüglich eines reinen rs.next()-Durchlaufs gleicher Fetchgröße.
+Aufruf: python benchmark_fetch.py [--tables a,b] [--limit 100000] [--converters-only]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+# --- ZENTRALE CONFIG IMPORTIEREN ---
+from db_config import connect_informix
+from jdbc_fetch import iter_column_blocks, column_converters, set_fetch_size, BLOCK_SIZE, FETCH_SIZE
+from value_converters import build_converter_plan
+from schema_mapping import get_table_schema
+
+LOG_DIR = r"C:\postgres\migration"
+RESULT_FILE = os.path.join(LOG_DIR, f"benchmark_fetch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+os.environ['JAVA_HOME'] = r'C:\baustelle_8.6\jdk-17.0.11.9-hotspot'
+
+def log(message):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
+
+def get_widest_tables(ifx_conn, count):
+    """Tabellen mit den meisten Spalten (und überhaupt Zeilen)"""
+    cursor = ifx_conn.cursor()
+    cursor.execute("""
+        SELECT t.tabname, COUNT(*) AS ncols
+        FROM systables t JOIN syscolumns c ON c.tabid = t.tabid
+        WHERE t.tabid > 99 AND t.tabtype = 'T' AND t.nrows > 0
+        GROUP BY t.tabname
+        ORDER BY 2 DESC
+    """)
+    rows = cursor.fetchmany(count)
+    cursor.close()
+    return [row[0] for row in rows]
+
+def run_fetchone(ifx_conn, table_name, limit):
+    cursor = ifx_conn.cursor()
+    cursor.execute(f"SELECT FIRST {limit} * FROM {table_name}")
+    start, rows = time.perf_counter(), 0
+    while True:
+        row = cursor.fetchone()
+        if row is None: break
+        rows += 1
+    duration = time.perf_counter() - start
+    cursor.close()
+    return rows, duration
+
+def run_block_fetch(ifx_conn, table_name, limit, block_size, columns=None):
+    """Block-Fetch; mit columns (get_table_schema) über den Konverter-Plan statt der jaydebeapi-Konverter"""
+    cursor = ifx_conn.cursor()
+    cursor.execute(f"SELECT FIRST {limit} * FROM {table_name}")
+    converters = build_converter_plan(columns, column_converters(cursor)) if columns else None
+    start, rows = time.perf_counter(), 0
+    for block in iter_column_blocks(cursor, block_size, converters):
+        rows += len(block[0])
+    duration = time.perf_counter() - start
+    cursor.close()
+    return rows, duration
+
+def timed_scan(ifx_conn, table_name, limit, scan):
+    """scan(cursor) → Zeilen; Fetchgröße wie im Block-Fetch, damit nur die Umwandlung verschieden ist"""
+    cursor = ifx_conn.cursor()
+    cursor.execute(f"SELECT FIRST {limit} * FROM {table_name}")
+    set_fetch_size(cursor, max(BLOCK_SIZE, FETCH_SIZE))
+    start = time.perf_counter()
+    rows = scan(cursor)
+    duration = time.perf_counter() - start
+    cursor.close()
+    return rows, duration
+
+def scan_next_only(cursor):
+    rs, rows = cursor._rs, 0
+    while rs.next(): rows += 1
+    return rows
+
+def scan_tuple_rows(cursor):
+    """Alter Pfad der Datenphase: jaydebeapi.fetchone() und tuple(row) je Zeile"""
+    rows = 0
+    while True:
+        row = cursor.fetchone()
+        if row is None: break
+        tuple(row)
+        rows += 1
+    return rows
+
+def run_converters_only(ifx_conn, table_name, limit, columns):
+    """µs Umwandlung je Zeile für den alten Pfad und den Konverter-Plan (Lesezeit abgezogen)"""
+    def scan_plan(cursor):
+        converters = build_converter_plan(columns, column_converters(cursor))
+        return sum(len(block[0]) for block in iter_column_blocks(cursor, BLOCK_SIZE, converters))
+    rows, dur_next = timed_scan(ifx_conn, table_name, limit, scan_next_only)
+    _, dur_tuple = timed_scan(ifx_conn, table_name, limit, scan_tuple_rows)
+    _, dur_plan = timed_scan(ifx_conn, table_name, limit, scan_plan)
+    if not rows: return {'table': table_name, 'rows': 0}
+    result = {'table': table_name, 'rows': rows, 'columns': len(columns),
+              'tuple_row_convert_us_per_row': (dur_tuple - dur_next) / rows * 1e6,
+              'plan_convert_us_per_row': (dur_plan - dur_next) / rows * 1e6}
+    if result['plan_convert_us_per_row'] > 0:
+        result['speedup_convert'] = result['tuple_row_convert_us_per_row'] / result['plan_convert_us_per_row']
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="fetchone vs. Block-Fetch Benchmark")
+    parser.add_argument('--tables', help="Kommagetrennte Tabellennamen (Default: die breitesten Tabellen)")
+    parser.add_argument('--count', type=int, default=5, help="Anzahl automatisch gewählter Tabellen")
+    parser.add_argument('--limit', type=int, default=100000, help="Max. Zeilen je Tabelle")
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE)
+    parser.add_argument('--converters-only', action='store_true', help="Nur die Umwandlung je Zeile messen: fetchone + tuple(row) gegen den Konverter-Plan")
+    args = parser.parse_args()
+
+    ifx_conn = connect_informix()
+    try:
+        tables = args.tables.split(',') if args.tables else get_widest_tables(ifx_conn, args.count)
+        results = []
+        for table_name in tables:
+            # Aufwärmlauf für Informix-Cache und JVM-JIT
+            run_block_fetch(ifx_conn, table_name, min(args.limit, 1000), args.block_size)
+            if args.converters_only:
+                result = run_converters_only(ifx_conn, table_name, args.limit, get_table_schema(ifx_conn, table_name, None))
+                results.append(result)
+                if result['rows']:
+                    log(f"{table_name:30} | {result['rows']:>8} rows | tuple(row): {result['tuple_row_convert_us_per_row']:>7.2f} µs/row"
+                        f" | plan: {result['plan_convert_us_per_row']:>7.2f} µs/row (x{result.get('speedup_convert', 0):.1f})")
+                continue
+            rows_old, dur_old = run_fetchone(ifx_conn, table_name, args.limit)
+            rows_new, dur_new = run_block_fetch(ifx_conn, table_name, args.limit, args.block_size)
+            columns = get_table_schema(ifx_conn, table_name, None)
+            rows_plan, dur_plan = run_block_fetch(ifx_conn, table_name, args.limit, args.block_size, columns)
+            result = {
+                'table': table_name, 'rows': rows_new, 'columns': len(columns),
+                'fetchone_rows_per_sec': rows_old / dur_old if dur_old else None,
+                'block_rows_per_sec': rows_new / dur_new if dur_new else None,
+                'converter_plan_rows_per_sec': rows_plan / dur_plan if dur_plan else None,
+            }
+            if result['fetchone_rows_per_sec'] and result['block_rows_per_sec']:
+                result['speedup'] = result['block_rows_per_sec'] / result['fetchone_rows_per_sec']
+            if result['fetchone_rows_per_sec'] and result['converter_plan_rows_per_sec']:
+                result['speedup_plan'] = result['converter_plan_rows_per_sec'] / result['fetchone_rows_per_sec']
+            results.append(result)
+            log(f"{table_name:30} | {rows_new:>8} rows | fetchone: {result['fetchone_rows_per_sec'] or 0:>10,.0f}/s"
+                f" | block: {result['block_rows_per_sec'] or 0:>10,.0f}/s (x{result.get('speedup', 0):.1f})"
+                f" | plan: {result['converter_plan_rows_per_sec'] or 0:>10,.0f}/s (x{result.get('speedup_plan', 0):.1f})")
+        if not os.path.exists(LOG_DIR): os.makedirs(LOG_DIR)
+        with open(RESULT_FILE, 'w') as f: json.dump(results, f, indent=2)
+        log(f"Results: {RESULT_FILE}")
+    finally:
+        ifx_conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+OFFLINE-BENCHMARK: Lade- und Constraint-Pfad ohne Produktions-Informix
+Quelle ist der SQLite-Stand-in (informix_standin.py) mit generierten Tabellen je
+Typmischung; Ziel ist eine lokale PostgreSQL-Datenbank (Default: migration_bench).
+Gemessen werden Schema-Lesen, migrate_table_data (Zeilen/s, Zeit je Stufe) und das
+Anlegen von PKs, Indizes und FKs mit den Funktionen der Constraint-Skripte, dazu
+der Peak-RSS des Prozesses. Mit --baseline werden Rückschritte gegenüber einer
+gespeicherten Messung markiert (Exit-Code 1).
+Aufruf: python benchmark_offline.py [--mixes narrow,mixed] [--rows 200000] [--width 24]
+        [--baseline bench_baseline.json] [--save-baseline bench_baseline.json]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+from datetime import datetime
+import psycopg2
+from db_config import PG_CONFIG
+import informix_standin
+import migrate_full_informix_to_postgres as data_phase
+import migrate_primary_keys as pk_phase
+import migrate_indexes as index_phase
+import migrate_foreign_keys as fk_phase
+from catalog_cache import CatalogSnapshot
+from migration_metrics import MetricsRegistry
+
+LOG_DIR = r"C:\postgres\migration"
+RESULT_FILE = os.path.join(LOG_DIR, f"benchmark_offline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+SOURCE_DB = os.path.join(tempfile.gettempdir(), "informix_standin.db")
+BENCH_DATABASE = 'migration_bench'
+REGRESSION_TOLERANCE = 0.10  # 10 % langsamer bzw. mehr Speicher als die Baseline gilt als Rückschritt
+
+def log(message):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
+
+def peak_rss_mb():
+    """Höchster Speicherverbrauch des Prozesses bisher; None, wo das Modul resource fehlt (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet KB, macOS Bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def build_specs(args):
+    specs = [informix_standin.table_spec(f"bench_{mix}", args.rows, args.width, mix) for mix in args.mixes]
+    # Alle weiteren Tabellen verweisen auf die erste, damit die FK-Phase etwas zu prüfen hat
+    for spec in specs[1:]: informix_standin.add_reference(spec, specs[0])
+    return specs
+
+def run_data_phase(ifx_conn, pg_conn, tables, args, logger, registry):
+    results = {}
+    for table in tables:
+        table_name = table['name']
+        start = time.perf_counter()
+        columns = data_phase.get_table_schema(ifx_conn, table_name, logger)
+        schema_seconds = time.perf_counter() - start
+        if not data_phase.create_table_postgres(pg_conn, table_name, columns, logger, unlogged=args.fast_load):
+            raise Exception(f"{table_name}: creation failed")
+        metrics = registry.stage(table_name, 'data')
+        rows = None
+        if args.partitions > 1:
+            rows = data_phase.migrate_table_partitioned(ifx_conn, table_name, columns, table['rows'], logger, args.partitions, metrics, args.fast_load, args.copy_format)
+        if rows is None:
+            rows = data_phase.migrate_table_data(ifx_conn, pg_conn, table_name, columns, table['rows'], logger, metrics=metrics,
+                                                 fast_load=args.fast_load, copy_format=args.copy_format)
+        if args.fast_load:
+            with metrics.timer('set_logged'):
+                data_phase.set_table_logged(pg_conn, table_name, rows)
+        metrics.finish()
+        summary = metrics.summary()
+        results[table_name] = {
+            'rows': rows, 'columns': len(columns), 'rows_per_sec': summary['rows_per_sec'], 'duration': summary['duration'],
+            'schema_seconds': schema_seconds, 'stage_seconds': summary['stage_seconds'], 'peak_rss_mb': peak_rss_mb(),
+        }
+        log(f"{table_name:20} | {rows:>9} rows | {len(columns):>3} cols | {summary['rows_per_sec']:>10,.0f} rows/s")
+    return results
+
+def run_constraint_phase(ifx_conn, pg_conn):
+    """PKs, Indizes und FKs nacheinander, wie die drei Skripte sie anlegen; Zeit und Fehler je Phase"""
+    phases = {}
+    start = time.perf_counter()
+    catalog = CatalogSnapshot.load(ifx_conn, cache_file=None)
+    phases['catalog'] = {'seconds': time.perf_counter() - start, 'objects': len(catalog.tables), 'failures': 0}
+    jobs = {
+        'primary_keys': [(pk, pk_phase.create_primary_key, [catalog.column_names(pk['table_name'], pk['column_numbers'])])
+                         for pk in pk_phase.get_primary_keys(ifx_conn)],
+        'indexes': [(idx, index_phase.create_index, [index_phase.get_column_names_with_order(catalog, idx['table_name'], idx['columns_info'])])
+                    for idx in index_phase.get_indexes(ifx_conn)],
+        'foreign_keys': [(fk, fk_phase.create_foreign_key, [catalog.column_names(fk['child_table'], fk['child_col_numbers']),
+                                                            catalog.column_names(fk['parent_table'], fk['parent_col_numbers'])])
+                         for fk in fk_phase.get_foreign_keys(ifx_conn)],
+    }
+    for phase, phase_jobs in jobs.items():
+        start, failures = time.perf_counter(), 0
+        for info, create, create_args in phase_jobs:
+            result = create(pg_conn, info, *create_args)
+            if not result[0]:
+                failures += 1
+                log(f"{phase}: {result[1]}")
+        phases[phase] = {'seconds': time.perf_counter() - start, 'objects': len(phase_jobs), 'failures': failures}
+        log(f"{phase:20} | {len(phase_jobs):>4} objects | {phases[phase]['seconds']:.2f}s | {failures} failed")
+    return phases
+
+def find_regressions(result, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Vergleicht Zeilen/s je Tabelle, Sekunden je Constraint-Phase und Peak-RSS mit der Baseline"""
+    regressions = []
+    def check(label, current, previous, higher_is_better):
+        if not current or not previous: return
+        change = (current - previous) / previous
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append({'metric': label, 'baseline': previous, 'current': current, 'change': change})
+    for table_name, table in result['tables'].items():
+        previous = baseline.get('tables', {}).get(table_name)
+        if previous: check(f"{table_name}.rows_per_sec", table['rows_per_sec'], previous['rows_per_sec'], True)
+    for phase, stats in result['phases'].items():
+        previous = baseline.get('phases', {}).get(phase)
+        if previous: check(f"{phase}.seconds", stats['seconds'], previous['seconds'], False)
+    check('peak_rss_mb', result['peak_rss_mb'], baseline.get('peak_rss_mb'), False)
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline-Benchmark gegen einen SQLite-Stand-in für Informix")
+    parser.add_argument('--mixes', type=lambda s: s.split(','), default=['narrow', 'mixed'],
+                        help=f"Typmischungen, je eine Tabelle ({', '.join(informix_standin.TYPE_MIXES)})")
+    parser.add_argument('--rows', type=int, default=200000, help="Zeilen je Tabelle")
+    parser.add_argument('--width', type=int, default=24, help="Spalten je Tabelle")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--source-db', default=SOURCE_DB, help="SQLite-Datei des Stand-ins (wird bei gleicher Spezifikation wiederverwendet)")
+    parser.add_argument('--pg-database', default=BENCH_DATABASE, help="Lokale Zieldatenbank (Host/Benutzer aus db_config)")
+    parser.add_argument('--partitions', type=int, default=1, help="Bereichsweises Laden wie --partitions der Migration")
+    parser.add_argument('--fast-load', action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument('--copy-format', choices=['text', 'binary'], default=data_phase.COPY_FORMAT)
+    parser.add_argument('--skip-constraints', action='store_true', help="Nur die Datenphase messen")
+    parser.add_argument('--baseline', help="Ergebnis-JSON eines früheren Laufs zum Vergleich")
+    parser.add_argument('--save-baseline', help="Ergebnis zusätzlich als neue Baseline speichern")
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args(argv)
+    unknown = set(args.mixes) - set(informix_standin.TYPE_MIXES)
+    if unknown: parser.error(f"unknown mixes: {', '.join(sorted(unknown))}")
+    return args
+
+def main():
+    args = parse_args()
+    if not os.path.exists(LOG_DIR): os.makedirs(LOG_DIR)
+    specs = build_specs(args)
+    informix_standin.build_source(args.source_db, specs, args.seed, log=log)
+    connect_informix = lambda: informix_standin.connect(args.source_db)
+    connect_postgres = lambda: psycopg2.connect(**dict(PG_CONFIG, database=args.pg_database))
+    # Bereichsweises Laden öffnet eigene Verbindungspaare über die Modulfunktionen
+    data_phase.connect_informix, data_phase.connect_postgres = connect_informix, connect_postgres
+    # Logs der Constraint-Module neben das Ergebnis statt in deren Laufprotokolle
+    for module in (pk_phase, index_phase, fk_phase):
+        module.LOG_DIR, module.LOG_FILE = LOG_DIR, os.path.join(LOG_DIR, "benchmark_offline.log")
+    logger, registry = data_phase.MigrationLogger(os.path.join(LOG_DIR, "benchmark_offline.log")), MetricsRegistry()
+    ifx_conn, pg_conn = connect_informix(), connect_postgres()
+    try:
+        result = {
+            'created': datetime.now().isoformat(),
+            'config': {k: v for k, v in vars(args).items() if k not in ('baseline', 'save_baseline')},
+            'tables': run_data_phase(ifx_conn, pg_conn, [{'name': s['name'], 'rows': s['rows']} for s in specs], args, logger, registry),
+            'phases': {} if args.skip_constraints else run_constraint_phase(ifx_conn, pg_conn),
+        }
+    finally:
+        ifx_conn.close(); pg_conn.close()
+    result['peak_rss_mb'] = peak_rss_mb()
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r') as f: baseline = json.load(f)
+        if baseline.get('config', {}).get('rows') != args.rows or baseline.get('config', {}).get('width') != args.width:
+            log("WARNING: baseline was measured with different --rows/--width")
+        regressions = find_regressions(result, baseline, args.tolerance)
+        result['baseline'] = args.baseline
+        result['regressions'] = regressions
+        for r in regressions:
+            log(f"REGRESSION {r['metric']}: {r['baseline']:.2f} → {r['current']:.2f} ({r['change']:+.0%})")
+        if not regressions: log(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    for path in filter(None, (RESULT_FILE, args.save_baseline)):
+        with open(path, 'w') as f: json.dump(result, f, indent=2)
+        log(f"Results: {path}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
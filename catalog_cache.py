@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+KATALOG-CACHE: Informix-Systemkatalog als Snapshot
+Lädt systables, syscolumns, sysindexes, sysconstraints und sysreferences mit je
+einer Abfrage und löst Spaltennummern im Speicher auf, statt pro PK/Index/FK
+einzeln syscolumns abzufragen. Der Snapshot wird als JSON im Log-Verzeichnis
+abgelegt und von allen Phasen wiederverwendet, solange sich die
+Katalogversion (Anzahl/Summe von systables.version) nicht ändert.
+"""
+
+import os
+import json
+from datetime import datetime
+from jdbc_fetch import iter_rows
+
+LOG_DIR = r"C:\postgres\migration"
+CACHE_FILE = os.path.join(LOG_DIR, "catalog_cache.json")
+
+# systables.version wird bei jeder DDL-Änderung einer Tabelle hochgezählt
+VERSION_SQL = "SELECT COUNT(*), SUM(version), MAX(tabid) FROM systables"
+
+CATALOG_QUERIES = {
+    'tables': "SELECT tabid, tabname, nrows, tabtype FROM systables WHERE tabid > 99",
+    'columns': "SELECT tabid, colno, colname, coltype, collength FROM syscolumns WHERE tabid > 99",
+    'indexes': """
+        SELECT tabid, idxname, idxtype,
+               part1, part2, part3, part4, part5, part6, part7, part8,
+               part9, part10, part11, part12, part13, part14, part15, part16
+        FROM sysindexes WHERE tabid > 99
+    """,
+    'constraints': "SELECT constrid, constrname, tabid, constrtype, idxname FROM sysconstraints WHERE tabid > 99",
+    'references': "SELECT r.constrid, r.primary, r.delrule, r.updrule FROM sysreferences r",
+}
+
+def get_catalog_version(ifx_conn):
+    cursor = ifx_conn.cursor()
+    cursor.execute(VERSION_SQL)
+    count, version_sum, max_tabid = cursor.fetchone()
+    cursor.close()
+    return f"{count}:{version_sum}:{max_tabid}"
+
+class CatalogSnapshot:
+    """Read-only Sicht auf den Informix-Katalog; nach dem Laden threadsicher"""
+    def __init__(self, version, data):
+        self.version, self.data = version, data
+        self.tables = {row[0]: {'name': row[1], 'rows': row[2] or 0, 'type': row[3]} for row in data['tables']}
+        self.table_ids = {t['name']: tabid for tabid, t in self.tables.items()}
+        self.columns = {}
+        for tabid, colno, colname, coltype, collength in data['columns']:
+            self.columns.setdefault(tabid, {})[colno] = {'name': colname, 'coltype': coltype, 'length': collength}
+        self.index_parts = {(row[0], row[1]): [p for p in row[3:19] if p] for row in data['indexes']}
+        self.primary_key_index = {row[2]: row[4] for row in data['constraints'] if row[3] == 'P'}
+
+    @classmethod
+    def load(cls, ifx_conn, cache_file=CACHE_FILE, log=None):
+        """Snapshot von Platte, falls die Katalogversion passt; sonst neu einlesen und speichern"""
+        version = get_catalog_version(ifx_conn)
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r') as f: cached = json.load(f)
+                if cached.get('version') == version:
+                    if log: log(f"Catalog cache hit ({cache_file})")
+                    return cls(version, cached['data'])
+            except (OSError, ValueError, KeyError):
+                pass
+        if log: log("Loading Informix catalog snapshot...")
+        data = {}
+        for name, sql in CATALOG_QUERIES.items():
+            cursor = ifx_conn.cursor()
+            cursor.execute(sql)
+            data[name] = [list(row) for row in iter_rows(cursor)]
+            cursor.close()
+        snapshot = cls(version, data)
+        if cache_file: snapshot.save(cache_file)
+        return snapshot
+
+    def save(self, cache_file=CACHE_FILE):
+        if not os.path.exists(os.path.dirname(cache_file)):
+            os.makedirs(os.path.dirname(cache_file))
+        tmp_file = cache_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump({'version': self.version, 'created': datetime.now().isoformat(), 'data': self.data}, f)
+        os.replace(tmp_file, cache_file)
+
+    def table_columns(self, table_name):
+        """{colno: {'name', 'coltype', 'length'}} einer Tabelle"""
+        return self.columns.get(self.table_ids.get(table_name), {})
+
+    def column_names(self, table_name, col_numbers):
+        """Spaltennamen in der Reihenfolge von col_numbers (wie die bisherigen get_column_names)"""
+        cols = self.table_columns(table_name)
+        return [cols[num]['name'] if num in cols else f"col_{num}" for num in col_numbers]
+
+    def primary_key_columns(self, table_name):
+        """Spaltennamen des Primärschlüssels in Indexreihenfolge ([] ohne PK)"""
+        tabid = self.table_ids.get(table_name)
+        parts = self.index_parts.get((tabid, self.primary_key_index.get(tabid)), [])
+        return self.column_names(table_name, [abs(p) for p in parts])
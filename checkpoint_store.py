@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+CHECKPOINT-STORE: Fortschritt aller Skripte in einer SQLite-Datei
+Statt nach jeder Tabelle bzw. alle 10-100 Objekte die komplette JSON-Datei neu zu
+schreiben, wird je Objekt genau eine Zeile (scope, key) per UPSERT aktualisiert.
+Jeder Schreibzugriff ist eine eigene Transaktion (WAL, busy_timeout), damit Worker-
+Threads und parallel laufende Skripte sich nicht überschreiben. Lookups laufen über
+einen Dictionary-Cache. Bestehende *_checkpoint.json werden beim ersten Öffnen eines
+Bereichs importiert; export() schreibt sie weiterhin für das Jenkins-Archiv.
+
+Aufruf: checkpoint_store.py [--export] [--compact]
+"""
+
+import os
+import json
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+
+LOG_DIR = r"C:\postgres\migration"
+CHECKPOINT_DB = os.path.join(LOG_DIR, "checkpoints.db")
+BUSY_TIMEOUT_MS = 30000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint (
+    scope   TEXT NOT NULL,
+    key     TEXT NOT NULL,
+    status  TEXT NOT NULL,
+    data    TEXT NOT NULL,
+    updated TEXT NOT NULL,
+    PRIMARY KEY (scope, key)
+)
+"""
+
+class CheckpointStore:
+    """Eine SQLite-Verbindung je Store; alle Zugriffe unter einem Lock"""
+    def __init__(self, db_file=CHECKPOINT_DB):
+        if not os.path.exists(os.path.dirname(db_file) or '.'): os.makedirs(os.path.dirname(db_file))
+        self.db_file = db_file
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SCHEMA)
+
+    def load_scope(self, scope):
+        """{key: (status, data)} eines Bereichs"""
+        with self.lock:
+            rows = self.conn.execute("SELECT key, status, data FROM checkpoint WHERE scope = ?", (scope,)).fetchall()
+        return {key: (status, json.loads(data)) for key, status, data in rows}
+
+    def put(self, scope, key, status, data):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO checkpoint (scope, key, status, data, updated) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (scope, key) DO UPDATE SET status = excluded.status, data = excluded.data, updated = excluded.updated",
+                (scope, key, status, json.dumps(data), datetime.now().isoformat()))
+
+    def put_many(self, scope, entries):
+        """entries: [(key, status, data)] in einer Transaktion (Import)"""
+        now = datetime.now().isoformat()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoint (scope, key, status, data, updated) VALUES (?, ?, ?, ?, ?)",
+                    [(scope, key, status, json.dumps(data), now) for key, status, data in entries])
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def scopes(self):
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT scope FROM checkpoint ORDER BY scope")]
+
+    def compact(self):
+        """WAL in die Hauptdatei übernehmen und freie Seiten zurückgeben"""
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.execute("VACUUM")
+
+    def close(self):
+        with self.lock: self.conn.close()
+
+def read_legacy_json(path):
+    """Einträge [(key, status, data)] aus einer bisherigen Checkpoint-Datei (Tabellen-, Constraint- oder Export-Format)"""
+    with open(path, 'r') as f: legacy = json.load(f)
+    entries = {}
+    if 'entries' in legacy:
+        for key, entry in legacy['entries'].items():
+            entry = dict(entry)
+            entries[key] = (entry.pop('status'), entry)
+    if 'stats' in legacy:
+        for key, stats in legacy['stats'].items():
+            entries[key] = (stats.get('status', 'completed'), {k: v for k, v in stats.items() if k != 'status'})
+        for key in legacy.get('completed_tables', []):
+            if key not in entries or entries[key][0] != 'completed': entries[key] = ('completed', {})
+    if 'completed' in legacy:
+        for failure in legacy.get('failed', []):
+            name = failure.get('index') or failure.get('fk')
+            key = f"{failure['table']}.{name}" if name else failure['table']
+            entries[key] = ('failed', {'error': failure.get('error')})
+        for key in legacy.get('not_valid', []): entries[key] = ('not_valid', {})
+        for key in legacy['completed']: entries[key] = ('completed', {})
+    return [(key, status, data) for key, (status, data) in entries.items()]
+
+class Checkpoint:
+    """Fortschritt eines Skripts; Bereich = Name der bisherigen JSON-Datei (z.B. 'pk_checkpoint').
+    Alle Methoden schreiben sofort und atomar, is_completed/status lesen aus dem Cache."""
+    def __init__(self, checkpoint_file, store=None):
+        self.checkpoint_file = checkpoint_file
+        self.scope = os.path.splitext(os.path.basename(checkpoint_file))[0]
+        self.store = store or CheckpointStore(os.path.join(os.path.dirname(checkpoint_file), os.path.basename(CHECKPOINT_DB)))
+        self.lock = threading.RLock()
+        self.entries = self.store.load_scope(self.scope)
+        if not self.entries and os.path.exists(checkpoint_file):
+            # Migrationspfad: bestehende JSON-Datei einmalig übernehmen
+            self.store.put_many(self.scope, read_legacy_json(checkpoint_file))
+            self.entries = self.store.load_scope(self.scope)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        return entry[1] if entry else None
+    def status(self, key):
+        entry = self.entries.get(key)
+        return entry[0] if entry else None
+    def is_completed(self, key): return self.status(key) == 'completed'
+    def keys(self, status=None):
+        with self.lock: return [key for key, (s, _) in self.entries.items() if status is None or s == status]
+
+    def mark(self, key, status, merge=False, **info):
+        with self.lock:
+            data = dict(self.get(key) or {}) if merge else {}
+            data.update(info)
+            self.store.put(self.scope, key, status, data)
+            self.entries[key] = (status, data)
+    def mark_progress(self, key, rows_committed, **info):
+        self.mark(key, 'running', rows_committed=rows_committed, **info)
+    def mark_completed(self, key, row_count, duration, fingerprint=None):
+        info = {'rows': row_count, 'duration': duration}
+        if fingerprint: info['fingerprint'] = fingerprint
+        self.mark(key, 'completed', **info)
+    def mark_unchanged(self, key):
+        self.mark(key, self.status(key) or 'completed', merge=True, last_checked=datetime.now().isoformat())
+    def get_fingerprint(self, key):
+        return (self.get(key) or {}).get('fingerprint') if self.is_completed(key) else None
+    def mark_failed(self, key, error, **info):
+        # Zusammenführen: rows_committed und resume bleiben erhalten, damit der nächste Lauf fortsetzen kann
+        self.mark(key, 'failed', merge=True, error=str(error), **info)
+
+    def export(self, path=None):
+        """JSON-Abbild des Bereichs (für das Jenkins-Archiv); atomar ersetzt"""
+        path = path or self.checkpoint_file
+        with self.lock:
+            entries = {key: dict(data, status=status) for key, (status, data) in sorted(self.entries.items())}
+        counts = {}
+        for entry in entries.values(): counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump({'scope': self.scope, 'exported': datetime.now().isoformat(), 'counts': counts, 'entries': entries}, f, indent=2)
+        os.replace(tmp_file, path)
+        return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpoint-Datenbank exportieren/kompaktieren")
+    parser.add_argument('--db', default=CHECKPOINT_DB)
+    parser.add_argument('--export', action='store_true', help="Alle Bereiche als <bereich>.json neben die Datenbank schreiben")
+    parser.add_argument('--compact', action='store_true', help="WAL übernehmen und VACUUM")
+    args = parser.parse_args()
+    store = CheckpointStore(args.db)
+    if args.export:
+        for scope in store.scopes():
+            print(Checkpoint(os.path.join(os.path.dirname(args.db), f"{scope}.json"), store).export())
+    if args.compact:
+        store.compact()
+        print(f"Compacted {args.db}")
+    store.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,10 @@
 import os
-import jaydebeapi
 import psycopg2
 
 # Falls eine Variable fehlt, wirft os.environ[key] sofort einen KeyError
 # Das ist genau das "Hart-Abbrechen", das wir wollen.
+# IFX_PW erst in connect_informix(), damit reine PostgreSQL-Skripte (load_stage_segments.py) ohne Informix laufen.
 PG_PASSWORD = os.environ['PG_PW']
-IFX_PASSWORD = os.environ['IFX_PW']
 
 # Zentrale PostgreSQL Config
 PG_CONFIG = {
@@ -30,9 +29,10 @@ def connect_postgres():
 
 def connect_informix():
     """Verbindung zu Informix mit den Jenkins-Secrets"""
+    import jaydebeapi  # erst hier: lädt JPype/JVM
     return jaydebeapi.connect(
         INFORMIX_JDBC_DRIVER,
         INFORMIX_JDBC_URL,
-        ["informix", IFX_PASSWORD],
+        ["informix", os.environ['IFX_PW']],
         INFORMIX_JDBC_JAR
     )
\ No newline at end of file
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+DDL-PLANER: Komplettes Zielschema (Tabellen, PKs, Indizes, FKs) aus einem Katalog-Read
+Statt DROP/CREATE/COMMIT je Tabelle zwischen den Datenladungen wird das Soll-Schema aus
+dem Katalog-Snapshot erzeugt – mit denselben Mappings und SQL-Bausteinen wie die
+Lade- und Constraint-Skripte – und mit dem vorhandenen PostgreSQL-Schema verglichen.
+Unveränderte Objekte bleiben stehen; nur fehlende oder abweichende werden (neu) angelegt.
+Das Ergebnis ist ein prüfbares SQL-Skript mit Inhalts-Hash und je Phase einer Transaktion.
+Vorhandene FKs entfernt die Phase 'tables' vorab und 'foreign_keys' legt sie neu an: der Lader
+leert jede Tabelle (TRUNCATE) und lädt in beliebiger Reihenfolge, UNLOGGED verlangt unreferenzierte Tabellen.
+Ablauf:  python ddl_planner.py                         → Skript zur Durchsicht
+         python ddl_planner.py --script <datei> --phases tables
+                                                       → geprüftes Skript anwenden (Hash muss passen)
+         python migrate_full_informix_to_postgres.py --planned-schema
+         python ddl_planner.py --apply --phases primary_keys,indexes,foreign_keys
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+from datetime import datetime
+from db_config import connect_informix, connect_postgres
+from catalog_cache import CatalogSnapshot
+from schema_mapping import schema_column
+from pg_load import create_table_sql, escape_identifier
+from migrate_primary_keys import primary_key_sql, pg_primary_key_name
+from migrate_indexes import index_sql, get_column_names_with_order, configure_session
+from migrate_foreign_keys import foreign_key_sql, pg_foreign_key_name
+
+LOG_DIR = r"C:\postgres\migration"
+LOG_FILE = os.path.join(LOG_DIR, f"ddl_planner_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+PHASES = ('tables', 'primary_keys', 'indexes', 'foreign_keys')
+PLAN_MARKER = "-- ==== PLAN ===="
+HASH_PREFIX = "-- content-hash: sha256:"
+
+# Typnamen, wie format_type() sie für die Typen aus POSTGRES_TYPE_MAPPING liefert
+FORMAT_TYPES = {
+    'CHAR': 'character', 'VARCHAR': 'character varying', 'NUMERIC': 'numeric',
+    'DOUBLE PRECISION': 'double precision', 'REAL': 'real', 'SMALLINT': 'smallint',
+    'INTEGER': 'integer', 'BIGINT': 'bigint', 'SERIAL': 'integer', 'BIGSERIAL': 'bigint',
+    'DATE': 'date', 'TIMESTAMP': 'timestamp without time zone', 'BYTEA': 'bytea',
+    'TEXT': 'text', 'INTERVAL': 'interval', 'BOOLEAN': 'boolean',
+}
+SERIAL_TYPES = {'SERIAL', 'BIGSERIAL'}
+# pg_constraint.confdeltype/confupdtype; alles andere ist NO ACTION ('a')
+FK_RULES = {'C': 'c', 'R': 'r'}
+
+PG_SCHEMA_QUERIES = {
+    'tables': """
+        SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod), a.attnotnull
+        FROM pg_attribute a JOIN pg_class c ON c.oid = a.attrelid JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relkind = 'r' AND a.attnum > 0 AND NOT a.attisdropped
+        ORDER BY c.relname, a.attnum
+    """,
+    'primary_keys': """
+        SELECT con.conname, t.relname,
+               ARRAY(SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY k(attnum, ord)
+                     JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum ORDER BY k.ord)
+        FROM pg_constraint con JOIN pg_class t ON t.oid = con.conrelid JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = 'public' AND con.contype = 'p'
+    """,
+    'indexes': """
+        SELECT ic.relname, t.relname, i.indisunique,
+               ARRAY(SELECT a.attname || CASE WHEN i.indoption[k.ord - 1] & 1 = 1 THEN ' DESC' ELSE '' END
+                     FROM unnest(i.indkey) WITH ORDINALITY k(attnum, ord)
+                     JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum ORDER BY k.ord)
+        FROM pg_index i JOIN pg_class ic ON ic.oid = i.indexrelid JOIN pg_class t ON t.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = 'public' AND NOT i.indisprimary
+    """,
+    'foreign_keys': """
+        SELECT con.conname, t.relname, p.relname, con.confdeltype, con.confupdtype,
+               ARRAY(SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY k(attnum, ord)
+                     JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum ORDER BY k.ord),
+               ARRAY(SELECT a.attname FROM unnest(con.confkey) WITH ORDINALITY k(attnum, ord)
+                     JOIN pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.attnum ORDER BY k.ord)
+        FROM pg_constraint con JOIN pg_class t ON t.oid = con.conrelid JOIN pg_class p ON p.oid = con.confrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = 'public' AND con.contype = 'f'
+    """,
+}
+
+def log(message, level="INFO"):
+    """Log message to file and console"""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    log_line = f"[{timestamp}] [{level}] {message}"
+    print(log_line)
+
+    if not os.path.exists(LOG_DIR):
+        os.makedirs(LOG_DIR)
+
+    with open(LOG_FILE, 'a', encoding='utf-8') as f:
+        f.write(log_line + '\n')
+
+def type_signature(pg_type):
+    """Typ aus get_table_schema in der Schreibweise von format_type(), z.B. VARCHAR(20) → character varying(20)"""
+    base, _, args = pg_type.partition('(')
+    name = FORMAT_TYPES.get(base.strip().upper(), base.strip().lower())
+    if base.strip().upper() == 'CHAR' and not args: args = '1)'
+    return name + (f"({args.replace(' ', '')}" if args else '')
+
+def index_column(name, desc):
+    return f"{name.lower()} DESC" if desc else name.lower()
+
+def plan_objects(catalog, tables=None, unlogged=False):
+    """Soll-Schema je Phase: [{'name', 'table', 'signature', 'create', 'drop'}]; Namen klein wie in PostgreSQL"""
+    selected = {tabid: t['name'] for tabid, t in catalog.tables.items() if t['type'] == 'T' and (tables is None or t['name'] in tables)}
+    constraints = {row[0]: row for row in catalog.data['constraints']}
+    plan = {phase: [] for phase in PHASES}
+    for tabid, table_name in sorted(selected.items(), key=lambda t: t[1]):
+        columns = [schema_column(c['name'], c['coltype'], c['length']) for _, c in sorted(catalog.table_columns(table_name).items())]
+        plan['tables'].append({
+            'name': table_name.lower(), 'table': table_name.lower(),
+            'signature': [[c['name'].lower(), type_signature(c['type']), c['not_null'] or c['type'] in SERIAL_TYPES] for c in columns],
+            'create': create_table_sql(table_name, columns, unlogged),
+            'drop': f"DROP TABLE IF EXISTS {escape_identifier(table_name)} CASCADE",
+        })
+        key_columns = catalog.primary_key_columns(table_name)
+        if key_columns:
+            name = pg_primary_key_name(table_name).lower()
+            plan['primary_keys'].append({
+                'name': name, 'table': table_name.lower(), 'signature': [c.lower() for c in key_columns],
+                'create': primary_key_sql({'table_name': table_name}, key_columns),
+                'drop': f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {name} CASCADE",
+            })
+    for row in sorted(catalog.data['indexes'], key=lambda r: (selected.get(r[0], ''), r[1])):
+        tabid, index_name, index_type = row[0], row[1], row[2]
+        parts = catalog.index_parts.get((tabid, index_name))
+        if tabid not in selected or not parts or index_name == catalog.primary_key_index.get(tabid): continue
+        table_name = selected[tabid]
+        index_info = {'table_name': table_name, 'index_name': index_name, 'is_unique': index_type == 'U',
+                      'columns_info': [{'col_num': abs(p), 'desc': p < 0} for p in parts]}
+        name, create_sql = index_sql(index_info, get_column_names_with_order(catalog, table_name, index_info['columns_info']))
+        names = catalog.column_names(table_name, [c['col_num'] for c in index_info['columns_info']])
+        plan['indexes'].append({
+            'name': name, 'table': table_name.lower(),
+            'signature': [table_name.lower(), index_info['is_unique'], [index_column(n, c['desc']) for n, c in zip(names, index_info['columns_info'])]],
+            'create': create_sql, 'drop': f"DROP INDEX IF EXISTS {name} CASCADE",
+        })
+    for constrid, primary, delete_rule, update_rule in catalog.data['references']:
+        child, parent = constraints.get(constrid), constraints.get(primary)
+        if not child or not parent or child[2] not in selected or parent[2] not in catalog.tables: continue
+        child_parts, parent_parts = catalog.index_parts.get((child[2], child[4])), catalog.index_parts.get((parent[2], parent[4]))
+        if not child_parts or not parent_parts: continue
+        fk_info = {'child_table': selected[child[2]], 'fk_name': child[1], 'parent_table': catalog.tables[parent[2]]['name'],
+                   'delete_rule': delete_rule, 'update_rule': update_rule}
+        child_cols = catalog.column_names(fk_info['child_table'], [abs(p) for p in child_parts])
+        parent_cols = catalog.column_names(fk_info['parent_table'], [abs(p) for p in parent_parts])
+        name = pg_foreign_key_name(fk_info)
+        plan['foreign_keys'].append({
+            'name': name, 'table': fk_info['child_table'].lower(), 'parent': fk_info['parent_table'].lower(),
+            'signature': [fk_info['child_table'].lower(), [c.lower() for c in child_cols], fk_info['parent_table'].lower(),
+                          [c.lower() for c in parent_cols], FK_RULES.get(delete_rule, 'a'), FK_RULES.get(update_rule, 'a')],
+            'create': foreign_key_sql(fk_info, child_cols, parent_cols),
+            'drop': f"ALTER TABLE {fk_info['child_table']} DROP CONSTRAINT IF EXISTS {name}",
+        })
+    plan['foreign_keys'].sort(key=lambda o: (o['table'], o['name']))
+    return plan
+
+def read_pg_schema(pg_conn):
+    """Ist-Schema (public) je Phase als {Name: (Tabelle, Signatur)}, Signatur vergleichbar mit plan_objects"""
+    rows = {}
+    cursor = pg_conn.cursor()
+    try:
+        for phase, sql in PG_SCHEMA_QUERIES.items():
+            cursor.execute(sql)
+            rows[phase] = cursor.fetchall()
+    finally:
+        cursor.close()
+    existing = {phase: {} for phase in PHASES}
+    for table, column, column_type, not_null in rows['tables']:
+        existing['tables'].setdefault(table, (table, []))[1].append([column, column_type, not_null])
+    for name, table, columns in rows['primary_keys']:
+        existing['primary_keys'][name] = (table, list(columns))
+    for name, table, unique, columns in rows['indexes']:
+        existing['indexes'][name] = (table, [table, unique, list(columns)])
+    for name, table, parent, delete_rule, update_rule, columns, parent_columns in rows['foreign_keys']:
+        existing['foreign_keys'][name] = (table, [table, list(columns), parent, list(parent_columns), delete_rule, update_rule])
+    return existing
+
+def diff_plan(plan, existing, all_tables=True, drop_foreign_keys=True):
+    """Setzt je Objekt 'action' (create/replace/unchanged) und 'statements'; liefert je Phase die Objekte,
+    die nur in PostgreSQL existieren. DROP ... CASCADE einer Tabelle, eines PKs oder Index entfernt
+    abhängige Objekte mit; diese werden neu angelegt. drop_foreign_keys (Phase 'tables' wird vor einem
+    Neuladen angewandt): vorhandene FKs entfernt 'predrop' in der Phase 'tables', 'foreign_keys' legt sie neu an."""
+    rebuilt, invalidated = set(), set()
+    for phase in PHASES:
+        for obj in plan[phase]:
+            current = existing[phase].get(obj['name'], (None, None))[1]
+            forced = obj['table'] in rebuilt or obj.get('parent') in rebuilt | invalidated
+            if phase != 'tables' and obj['table'] in rebuilt:
+                obj['action'], obj['statements'] = 'create', [obj['create']]
+            elif forced or current is not None and current != obj['signature']:
+                obj['action'], obj['statements'] = 'replace' if current is not None else 'create', [obj['drop'], obj['create']]
+            elif current is None:
+                obj['action'], obj['statements'] = 'create', [obj['create']]
+            else:
+                obj['action'], obj['statements'] = 'unchanged', []
+            if phase == 'foreign_keys' and drop_foreign_keys and current is not None:
+                obj['action'], obj['statements'], obj['predrop'] = 'replace', [obj['create']], True
+            if obj['action'] != 'unchanged':
+                if phase == 'tables': rebuilt.add(obj['table'])
+                elif phase in ('primary_keys', 'indexes') and obj['action'] == 'replace': invalidated.add(obj['table'])
+    # Wird nicht gelöscht, nur im Skript gemeldet; bei --tables nur für die gewählten Tabellen
+    planned_tables = {obj['table'] for obj in plan['tables']}
+    return {phase: sorted(name for name, (table, _) in existing[phase].items()
+                          if name not in {o['name'] for o in plan[phase]} and (all_tables or table in planned_tables))
+            for phase in PHASES}
+
+def phase_statements(plan, phase):
+    # Vor den Tabellen: FKs entfernen, die nach dem Laden in 'foreign_keys' neu entstehen
+    predrops = [obj['drop'] for obj in plan['foreign_keys'] if obj.get('predrop')] if phase == 'tables' else []
+    return predrops + [s for obj in plan[phase] for s in obj['statements']]
+
+def render_script(plan, extra, catalog_version):
+    """(Skripttext, Hash); der Hash deckt nur den Plan unterhalb von PLAN_MARKER ab"""
+    body = []
+    for phase in PHASES:
+        counts = {action: sum(1 for o in plan[phase] if o['action'] == action) for action in ('create', 'replace', 'unchanged')}
+        body.append(f"-- {phase}: " + ', '.join(f"{n} {action}" for action, n in counts.items()))
+        statements = phase_statements(plan, phase)
+        if statements: body += ["BEGIN;"] + [s + ";" for s in statements] + ["COMMIT;"]
+        body.append("")
+    body_text = '\n'.join(body)
+    digest = hashlib.sha256(body_text.encode('utf-8')).hexdigest()
+    header = [
+        "-- DDL-Plan Informix → PostgreSQL (ddl_planner.py)",
+        f"-- created: {datetime.now().isoformat(timespec='seconds')}",
+        f"-- catalog version: {catalog_version}",
+        HASH_PREFIX + digest,
+    ]
+    for phase in PHASES:
+        if extra.get(phase): header.append(f"-- only in PostgreSQL, kept ({phase}): {', '.join(extra[phase])}")
+    return '\n'.join(header + [PLAN_MARKER, body_text]), digest
+
+def script_hash(path):
+    """(im Kopf eingetragener Hash, Hash des Planteils) eines Skripts"""
+    with open(path, 'r', encoding='utf-8') as f: text = f.read()
+    header, _, body = text.partition(PLAN_MARKER + '\n')
+    recorded = next((line[len(HASH_PREFIX):] for line in header.splitlines() if line.startswith(HASH_PREFIX)), None)
+    return recorded, hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+def apply_plan(pg_conn, plan, phases, maintenance_work_mem=None):
+    """Je Phase eine Transaktion; bei einem Fehler wird die Phase vollständig zurückgerollt"""
+    for phase in phases:
+        statements = phase_statements(plan, phase)
+        if not statements: continue
+        if phase == 'indexes': configure_session(pg_conn, maintenance_work_mem)
+        start, cursor = time.perf_counter(), pg_conn.cursor()
+        try:
+            for statement in statements: cursor.execute(statement)
+            pg_conn.commit()
+        except Exception as e:
+            pg_conn.rollback()
+            raise Exception(f"{phase}: {e} (phase rolled back)")
+        finally:
+            cursor.close()
+        log(f"✓ {phase}: {len(statements)} statements in {time.perf_counter() - start:.1f}s")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Zielschema planen, mit PostgreSQL abgleichen und gebündelt anwenden")
+    parser.add_argument('--output', help="Pfad des SQL-Skripts (Default: ddl_plan_<zeit>_<hash>.sql im Log-Verzeichnis)")
+    parser.add_argument('--tables', help="Kommagetrennte Tabellen (Default: alle)")
+    parser.add_argument('--unlogged', action='store_true', help="Tabellen UNLOGGED anlegen (Fast-Load schaltet sie nach der Prüfung auf LOGGED)")
+    parser.add_argument('--apply', action='store_true', help="Plan direkt anwenden")
+    parser.add_argument('--script', help="Geprüftes Skript anwenden; nur wenn sein Hash dem aktuellen Plan entspricht")
+    parser.add_argument('--phases', type=lambda s: s.split(','), default=list(PHASES), help=f"Anzuwendende Phasen ({','.join(PHASES)})")
+    parser.add_argument('--maintenance-work-mem', help="maintenance_work_mem für die Index-Phase, z.B. '1GB'")
+    args = parser.parse_args()
+    unknown = set(args.phases) - set(PHASES)
+    if unknown: parser.error(f"unknown phases: {', '.join(sorted(unknown))}")
+    return args
+
+def main():
+    args = parse_args()
+    log("=" * 80)
+    log("DDL PLANNER: Informix → PostgreSQL")
+    log("=" * 80)
+    try:
+        ifx_conn, pg_conn = connect_informix(), connect_postgres()
+        catalog = CatalogSnapshot.load(ifx_conn, log=log)
+        plan = plan_objects(catalog, set(args.tables.split(',')) if args.tables else None, args.unlogged)
+        extra = diff_plan(plan, read_pg_schema(pg_conn), all_tables=not args.tables, drop_foreign_keys='tables' in args.phases)
+        script, digest = render_script(plan, extra, catalog.version)
+        for phase in PHASES:
+            actions = [o['action'] for o in plan[phase]]
+            log(f"{phase:14} | {actions.count('create'):>5} create | {actions.count('replace'):>5} replace | {actions.count('unchanged'):>5} unchanged")
+        output = args.output or os.path.join(LOG_DIR, f"ddl_plan_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{digest[:12]}.sql")
+        with open(output, 'w', encoding='utf-8') as f: f.write(script)
+        log(f"Script: {output} (sha256 {digest})")
+        if args.script:
+            recorded, actual = script_hash(args.script)
+            if recorded != actual:
+                log(f"{args.script}: content does not match its recorded hash (edited after planning?)", "ERROR")
+                return 1
+            if actual != digest:
+                log(f"{args.script}: schema changed since review (plan now {digest[:12]}), review {output}", "ERROR")
+                return 1
+        if args.apply or args.script:
+            # Constraints auf Tabellen, die noch neu angelegt werden müssten, sind nicht anwendbar
+            if 'tables' not in args.phases and phase_statements(plan, 'tables'):
+                log("Table changes pending: apply --phases tables (and reload the data) first", "ERROR")
+                return 1
+            apply_plan(pg_conn, plan, [p for p in PHASES if p in args.phases], args.maintenance_work_mem)
+        return 0
+    except Exception as e:
+        log(f"FATAL: {e}", "ERROR")
+        return 1
+    finally:
+        if 'ifx_conn' in locals(): ifx_conn.close()
+        if 'pg_conn' in locals(): pg_conn.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+INFORMIX-STAND-IN: SQLite-Quelle mit jaydebeapi-ähnlicher Schnittstelle
+Für Offline-Benchmarks ohne Produktions-Informix. Erzeugt Tabellen mit einstellbarer
+Zeilenzahl, Breite und Typmischung samt Systemkatalog (systables, syscolumns,
+sysindexes, sysconstraints, sysreferences) und stellt Cursor bereit, die wie
+jaydebeapi ein ResultSet unter cursor._rs anbieten. Damit laufen read_batches,
+der Konverter-Plan, get_table_schema und die Katalogabfragen der Constraint-Skripte
+unverändert. Gemessen wird der Python-Pfad; JDBC-/Netzwerkzeiten fehlen naturgemäß.
+"""
+
+import re
+import json
+import random
+import string
+import sqlite3
+import hashlib
+from datetime import date, datetime, timedelta
+
+# Informix-coltype-Codes (siehe TYPE_MAPPING); +256 = NOT NULL
+COLTYPES = {
+    'CHAR': 0, 'SMALLINT': 1, 'INTEGER': 2, 'FLOAT': 3, 'SMALLFLOAT': 4, 'DECIMAL': 5,
+    'SERIAL': 6, 'DATE': 7, 'MONEY': 8, 'DATETIME': 10, 'VARCHAR': 13, 'NCHAR': 15,
+    'NVARCHAR': 16, 'INT8': 17, 'LVARCHAR': 40, 'BOOLEAN': 43, 'BIGINT': 52,
+}
+# collength wie in syscolumns: Zeichen, DECIMAL als (Präzision << 8) | Skala, DATETIME YEAR TO FRACTION(3)
+COLLENGTHS = {
+    'CHAR': 20, 'NCHAR': 20, 'VARCHAR': 64, 'NVARCHAR': 64, 'LVARCHAR': 2048,
+    'DECIMAL': (14 << 8) | 4, 'MONEY': (12 << 8) | 2, 'DATETIME': 4365,
+    'SMALLINT': 2, 'INTEGER': 4, 'SERIAL': 4, 'INT8': 8, 'BIGINT': 8, 'FLOAT': 8, 'SMALLFLOAT': 4, 'DATE': 4, 'BOOLEAN': 1,
+}
+# BYTE/BLOB/TEXT fehlen: die Stream-Reader aus lob_stream brauchen eine JVM
+TYPE_MIXES = {
+    'narrow': ['INTEGER', 'VARCHAR', 'DATE'],
+    'mixed': ['INTEGER', 'BIGINT', 'CHAR', 'VARCHAR', 'DECIMAL', 'DATE', 'DATETIME', 'FLOAT', 'SMALLINT', 'MONEY', 'BOOLEAN'],
+    'numeric': ['DECIMAL', 'MONEY', 'FLOAT', 'SMALLFLOAT', 'INT8'],
+    'text': ['CHAR', 'NCHAR', 'VARCHAR', 'NVARCHAR', 'LVARCHAR'],
+}
+NULL_RATIO = 0.05
+FIRST_TABID = 100
+CATALOG_SCHEMA = """
+CREATE TABLE systables (tabid INTEGER PRIMARY KEY, tabname TEXT, nrows INTEGER, tabtype TEXT, version INTEGER);
+CREATE TABLE syscolumns (tabid INTEGER, colno INTEGER, colname TEXT, coltype INTEGER, collength INTEGER);
+CREATE TABLE sysindexes (tabid INTEGER, idxname TEXT, idxtype TEXT,
+    part1 INTEGER DEFAULT 0, part2 INTEGER DEFAULT 0, part3 INTEGER DEFAULT 0, part4 INTEGER DEFAULT 0,
+    part5 INTEGER DEFAULT 0, part6 INTEGER DEFAULT 0, part7 INTEGER DEFAULT 0, part8 INTEGER DEFAULT 0,
+    part9 INTEGER DEFAULT 0, part10 INTEGER DEFAULT 0, part11 INTEGER DEFAULT 0, part12 INTEGER DEFAULT 0,
+    part13 INTEGER DEFAULT 0, part14 INTEGER DEFAULT 0, part15 INTEGER DEFAULT 0, part16 INTEGER DEFAULT 0);
+CREATE TABLE sysconstraints (constrid INTEGER PRIMARY KEY, constrname TEXT, tabid INTEGER, constrtype TEXT, idxname TEXT);
+CREATE TABLE sysreferences (constrid INTEGER, "primary" INTEGER, delrule TEXT, updrule TEXT);
+CREATE TABLE standin_meta (spec_hash TEXT);
+"""
+
+def table_spec(name, rows, width, mix):
+    """Spalte 1 ist immer der SERIAL-PK 'id'; die übrigen Spalten durchlaufen die Typmischung"""
+    types = TYPE_MIXES[mix]
+    columns = [{'name': 'id', 'ifx_type': 'SERIAL', 'not_null': True}]
+    for n in range(1, max(2, width)):
+        ifx_type = types[(n - 1) % len(types)]
+        columns.append({'name': f"c{n}_{ifx_type.lower()}", 'ifx_type': ifx_type, 'not_null': n % 4 == 0})
+    return {'name': name, 'rows': rows, 'columns': columns}
+
+def add_reference(spec, parent):
+    """Fremdschlüsselspalte ref_id → parent.id (mit Index, wie Informix sie für FKs anlegt)"""
+    spec['columns'].insert(1, {'name': 'ref_id', 'ifx_type': 'INTEGER', 'not_null': False})
+    spec['parent'] = parent['name']
+    spec['parent_rows'] = parent['rows']
+    return spec
+
+def _value_generator(ifx_type, rnd):
+    letters, base_date = string.ascii_letters + string.digits + ' ', date(2000, 1, 1)
+    length = COLLENGTHS.get(ifx_type, 0)
+    if ifx_type in ('CHAR', 'NCHAR'):
+        # CHAR kommt aus Informix auf volle Länge aufgefüllt
+        return lambda: ''.join(rnd.choices(letters, k=rnd.randint(1, length))).ljust(length)
+    if ifx_type in ('VARCHAR', 'NVARCHAR', 'LVARCHAR'):
+        return lambda: ''.join(rnd.choices(letters, k=rnd.randint(0, length)))
+    if ifx_type == 'SMALLINT': return lambda: rnd.randint(-32768, 32767)
+    if ifx_type in ('INTEGER', 'SERIAL'): return lambda: rnd.randint(-2**31, 2**31 - 1)
+    if ifx_type in ('INT8', 'BIGINT'): return lambda: rnd.randint(-2**63, 2**63 - 1)
+    if ifx_type in ('FLOAT', 'SMALLFLOAT'): return lambda: rnd.uniform(-1e6, 1e6)
+    if ifx_type in ('DECIMAL', 'MONEY'):
+        precision, scale = length >> 8, length & 0xFF
+        limit = 10 ** (precision - scale) - 1
+        return lambda: f"{rnd.randint(-limit, limit)}.{rnd.randint(0, 10 ** scale - 1):0{scale}d}"
+    if ifx_type == 'DATE': return lambda: (base_date + timedelta(days=rnd.randint(0, 9000))).isoformat()
+    if ifx_type == 'DATETIME':
+        # Format von java.sql.Timestamp.toString()
+        return lambda: (datetime(2000, 1, 1) + timedelta(seconds=rnd.randint(0, 9 * 10**8), milliseconds=rnd.randint(0, 999))).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    if ifx_type == 'BOOLEAN': return lambda: rnd.random() < 0.5
+    raise ValueError(f"No generator for {ifx_type}")
+
+def _row_generator(spec, rnd):
+    generators = []
+    for col in spec['columns'][1:]:
+        if col['name'] == 'ref_id':
+            parent_rows = spec['parent_rows']
+            value = lambda: rnd.randint(1, parent_rows)
+        else:
+            value = _value_generator(col['ifx_type'], rnd)
+        generators.append(value if col['not_null'] else (lambda value=value: None if rnd.random() < NULL_RATIO else value()))
+    return lambda row_id: (row_id, *[g() for g in generators])
+
+def spec_hash(specs, seed):
+    return hashlib.sha1(json.dumps([specs, seed], sort_keys=True).encode('utf-8')).hexdigest()
+
+def build_source(db_file, specs, seed=1, log=None):
+    """Legt Tabellen und Katalog an; eine vorhandene Datei mit gleicher Spezifikation wird wiederverwendet"""
+    wanted = spec_hash(specs, seed)
+    db = sqlite3.connect(db_file)
+    try:
+        try:
+            if db.execute("SELECT spec_hash FROM standin_meta").fetchone() == (wanted,):
+                if log: log(f"Stand-in source reused ({db_file})")
+                return
+        except sqlite3.OperationalError:
+            pass
+        if log: log(f"Generating stand-in source {db_file}...")
+        for (name,) in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+            db.execute(f'DROP TABLE "{name}"')
+        db.executescript(CATALOG_SCHEMA)
+        rnd, constrid, pk_constraints = random.Random(seed), 1, {}
+        for tabid, spec in enumerate(specs, FIRST_TABID):
+            name, columns = spec['name'], spec['columns']
+            db.execute(f"CREATE TABLE {name} ({', '.join(col['name'] for col in columns)})")
+            make_row, insert_sql = _row_generator(spec, rnd), f"INSERT INTO {name} VALUES ({', '.join('?' * len(columns))})"
+            for start in range(1, spec['rows'] + 1, 10000):
+                db.executemany(insert_sql, (make_row(i) for i in range(start, min(start + 10000, spec['rows'] + 1))))
+            db.execute("INSERT INTO systables VALUES (?, ?, ?, 'T', 1)", (tabid, name, spec['rows']))
+            db.executemany("INSERT INTO syscolumns VALUES (?, ?, ?, ?, ?)",
+                           [(tabid, colno, col['name'], COLTYPES[col['ifx_type']] + (256 if col['not_null'] else 0), COLLENGTHS[col['ifx_type']])
+                            for colno, col in enumerate(columns, 1)])
+            # PK auf id, Duplikat-Index auf der zweiten Spalte
+            db.execute("INSERT INTO sysindexes (tabid, idxname, idxtype, part1) VALUES (?, ?, 'U', 1)", (tabid, f" {tabid}_pk"))
+            db.execute("INSERT INTO sysconstraints VALUES (?, ?, ?, 'P', ?)", (constrid, f"u{tabid}_pk", tabid, f" {tabid}_pk"))
+            pk_constraints[name], constrid = constrid, constrid + 1
+            db.execute("INSERT INTO sysindexes (tabid, idxname, idxtype, part1) VALUES (?, ?, 'D', 2)", (tabid, f"ix_{name}_c2"))
+            if spec.get('parent'):
+                db.execute("INSERT INTO sysconstraints VALUES (?, ?, ?, 'R', ?)", (constrid, f"r{tabid}_ref", tabid, f"ix_{name}_c2"))
+                db.execute("INSERT INTO sysreferences VALUES (?, ?, 'R', 'R')", (constrid, pk_constraints[spec['parent']]))
+                constrid += 1
+        db.execute("INSERT INTO standin_meta VALUES (?)", (wanted,))
+        db.commit()
+    finally:
+        db.close()
+
+# --- jaydebeapi-ähnliche Schnittstelle ---
+
+_SELECT_FIRST = re.compile(r'^\s*SELECT\s+FIRST\s+(\d+)\s+(.*)$', re.IGNORECASE | re.DOTALL)
+_PRIMARY_COLUMN = re.compile(r'\b(\w+)\.primary\b')
+
+def translate_sql(sql):
+    """Informix-Dialekt → SQLite: SELECT FIRST n, Spalte sysreferences.primary (in SQLite reserviert)"""
+    sql = _PRIMARY_COLUMN.sub(r'\1."primary"', sql)
+    match = _SELECT_FIRST.match(sql)
+    return f"SELECT {match.group(2)} LIMIT {match.group(1)}" if match else sql
+
+class StandinResultSet:
+    """Die Getter von java.sql.ResultSet, die der Konverter-Plan und jaydebeapi benutzen.
+    getDate/getTimestamp liefern Text im Format von toString(), wie die Konverter ihn erwarten."""
+    def __init__(self, sqlite_cursor, fetch_size=5000):
+        self.cursor, self.fetch_size = sqlite_cursor, fetch_size
+        self.buffer, self.row = iter(()), None
+    def setFetchSize(self, fetch_size): self.fetch_size = max(1, fetch_size)
+    def next(self):
+        self.row = next(self.buffer, None)
+        if self.row is None:
+            self.buffer = iter(self.cursor.fetchmany(self.fetch_size))
+            self.row = next(self.buffer, None)
+        return self.row is not None
+    def getObject(self, idx): return self.row[idx - 1]
+    def getString(self, idx):
+        v = self.row[idx - 1]
+        return v if v is None or isinstance(v, str) else str(v)
+    getDate = getTimestamp = getString
+    def getBytes(self, idx): return self.row[idx - 1]
+    def close(self): self.cursor.close()
+
+class StandinMetaData:
+    def __init__(self, description): self.description = description
+    def getColumnCount(self): return len(self.description)
+    def getColumnType(self, idx): return 1111  # java.sql.Types.OTHER → jaydebeapi-Default getObject
+
+class StandinCursor:
+    def __init__(self, db):
+        self.db = db
+        self._rs = self._meta = self.description = None
+        self._converters = {}
+        self.rowcount = -1
+    def execute(self, sql, parameters=None):
+        self.close()
+        cursor = self.db.execute(translate_sql(sql), list(parameters or []))
+        self.description, self.rowcount = cursor.description, cursor.rowcount
+        if cursor.description:
+            self._rs, self._meta = StandinResultSet(cursor), StandinMetaData(cursor.description)
+    def fetchone(self):
+        if self._rs is None or not self._rs.next(): return None
+        return tuple(self._rs.row)
+    def fetchmany(self, size=1):
+        rows = []
+        while len(rows) < size:
+            row = self.fetchone()
+            if row is None: break
+            rows.append(row)
+        return rows
+    def fetchall(self): return self.fetchmany(2**62)
+    def close(self):
+        if self._rs is not None: self._rs.close()
+        self._rs = self._meta = None
+
+class StandinConnection:
+    """Eine SQLite-Verbindung; Reader-Threads benutzen sie wie eine JDBC-Verbindung"""
+    def __init__(self, db_file):
+        self.db = sqlite3.connect(db_file, check_same_thread=False)
+        self.db.create_function('MOD', 2, lambda a, b: None if a is None or b is None else a % b, deterministic=True)
+    def cursor(self): return StandinCursor(self.db)
+    def commit(self): self.db.commit()
+    def rollback(self): self.db.rollback()
+    def close(self): self.db.close()
+
+def connect(db_file):
+    return StandinConnection(db_file)
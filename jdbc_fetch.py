@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+JDBC BLOCK-FETCH: Informix-Resultsets blockweise lesen
+jaydebeapi.fetchone() fragt für jeden Wert erneut getColumnType() über JPype ab
+und baut pro Aufruf ein Tupel. Hier werden die Konverter einmal je Spalte
+aufgelöst und ganze Blöcke spaltenweise gelesen.
+"""
+
+FETCH_SIZE = 5000   # JDBC-Fetchgröße (Zeilen pro Netzwerk-Roundtrip zum Informix-Server)
+BLOCK_SIZE = 5000   # Zeilen pro Python-Block
+
+def set_fetch_size(cursor, fetch_size=FETCH_SIZE):
+    """Setzt die JDBC-Fetchgröße auf dem offenen ResultSet (nur jaydebeapi-Cursor)"""
+    rs = getattr(cursor, '_rs', None)
+    if rs is None: return False
+    try:
+        rs.setFetchSize(fetch_size)
+        return True
+    except Exception:
+        return False
+
+def column_converters(cursor):
+    """Löst die jaydebeapi-Konverter einmal pro Spalte auf"""
+    from jaydebeapi import _unknownSqlTypeConverter
+    meta = cursor._meta
+    return [cursor._converters.get(meta.getColumnType(i), _unknownSqlTypeConverter)
+            for i in range(1, meta.getColumnCount() + 1)]
+
+def fetch_column_block(cursor, block_size=BLOCK_SIZE, converters=None):
+    """Liest bis zu block_size Zeilen als Liste von Spaltenlisten; None am Ende des Resultsets"""
+    rs = getattr(cursor, '_rs', None)
+    if rs is None:
+        # Kein jaydebeapi-Cursor (z.B. psycopg2 oder Test-Stand-in): DB-API fetchmany
+        rows = cursor.fetchmany(block_size)
+        return [list(col) for col in zip(*rows)] if rows else None
+    if converters is None: converters = column_converters(cursor)
+    columns = [[] for _ in converters]
+    readers = [(col.append, conv, idx) for idx, (col, conv) in enumerate(zip(columns, converters), 1)]
+    count = 0
+    while count < block_size and rs.next():
+        for append, conv, idx in readers:
+            append(conv(rs, idx))
+        count += 1
+    return columns if count else None
+
+def fetch_row_block_capped(cursor, max_rows, max_bytes, converters=None, row_bytes=len):
+    """Zeilenblock, der nach max_rows Zeilen oder max_bytes (row_bytes je Zeile) endet; None am Ende.
+    Für Tabellen mit großen Werten, bei denen die Zeilenzahl allein den Speicher nicht begrenzt."""
+    rs = getattr(cursor, '_rs', None)
+    if rs is not None and converters is None: converters = column_converters(cursor)
+    rows, nbytes = [], 0
+    while len(rows) < max_rows and nbytes < max_bytes:
+        if rs is None:
+            row = cursor.fetchone()
+            if row is None: break
+        else:
+            if not rs.next(): break
+            row = tuple([conv(rs, idx) for idx, conv in enumerate(converters, 1)])
+        rows.append(row)
+        nbytes += row_bytes(row)
+    return rows or None
+
+def iter_column_blocks(cursor, block_size=BLOCK_SIZE, converters=None):
+    """Generator über Spaltenblöcke eines bereits ausgeführten Cursors"""
+    set_fetch_size(cursor, max(block_size, FETCH_SIZE))
+    if converters is None and getattr(cursor, '_rs', None) is not None:
+        converters = column_converters(cursor)
+    while True:
+        block = fetch_column_block(cursor, block_size, converters)
+        if block is None: return
+        yield block
+
+def iter_row_blocks(cursor, block_size=BLOCK_SIZE, converters=None):
+    """Wie iter_column_blocks, aber als Zeilenlisten (für executemany/COPY)"""
+    for block in iter_column_blocks(cursor, block_size, converters):
+        yield list(zip(*block))
+
+def iter_rows(cursor, block_size=BLOCK_SIZE):
+    """Zeilenweise Iteration über blockweise gelesene Daten (Ersatz für fetchone-Schleifen)"""
+    for rows in iter_row_blocks(cursor, block_size):
+        yield from rows
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+STAGE-LADEN: Extrahierte Segmente (migrate_full_informix_to_postgres.py --stage-dir) nach PostgreSQL
+Liest je Tabelle das Manifest, legt die Tabelle neu an und lädt jedes Segment per
+COPY direkt aus der mmap-gemappten gzip-Datei. Informix wird dabei nicht berührt;
+der Lauf lässt sich mit --replay beliebig oft wiederholen.
+"""
+
+import os
+import sys
+import queue
+import argparse
+import threading
+from datetime import datetime
+# Nur PostgreSQL-Seite: kein Import von migrate_full_informix_to_postgres (IFX_PW-Prüfung, JDBC/JPype)
+from db_config import connect_postgres
+from pg_load import MigrationLogger, create_table_postgres, set_table_logged, escape_identifier, COPY_DELIMITER
+from checkpoint_store import Checkpoint
+from stage_segments import list_staged_tables, read_segment, table_stage_dir, manifest_identity
+from migration_metrics import MetricsRegistry
+from sampling_profiler import start_profiler, finish_profiler, PROFILE_HELP
+
+LOG_DIR = r"C:\postgres\migration"
+LOG_FILE = os.path.join(LOG_DIR, f"stage_load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+CHECKPOINT_FILE = os.path.join(LOG_DIR, "stage_load_checkpoint.json")
+METRICS = MetricsRegistry()
+
+def load_staged_table(pg_conn, stage_dir, manifest, logger, checkpoint, fast_load):
+    table_name, columns = manifest['table'], manifest['columns']
+    start_time = datetime.now()
+    metrics = METRICS.stage(table_name, 'stage_load')
+    try:
+        if not create_table_postgres(pg_conn, table_name, columns, logger, unlogged=fast_load): raise Exception("Creation failed")
+        col_list = ', '.join(escape_identifier(col['name']) for col in columns)
+        copy_sql = f"COPY {escape_identifier(table_name)} ({col_list}) FROM STDIN WITH (FORMAT text, DELIMITER '{COPY_DELIMITER}')"
+        cursor = pg_conn.cursor()
+        rows = 0
+        try:
+            # Ein Commit je Segment; der Fortschritt steht im Checkpoint
+            for segment in manifest['segments']:
+                path = os.path.join(table_stage_dir(stage_dir, table_name), segment['file'])
+                with metrics.timer('write'), read_segment(path, segment['sha1']) as stream:
+                    cursor.copy_expert(copy_sql, stream)
+                with metrics.timer('commit'):
+                    pg_conn.commit()
+                rows += segment['rows']
+                metrics.record_batch(segment['rows'], segment['bytes'], 0.0)
+                checkpoint.mark_progress(table_name, rows)
+        except Exception:
+            pg_conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        if fast_load:
+            with metrics.timer('set_logged'):
+                set_table_logged(pg_conn, table_name, rows)
+        metrics.finish()
+        # Kennung der geladenen Extraktion: eine neu extrahierte Tabelle wird beim nächsten Lauf wieder geladen
+        checkpoint.mark_completed(table_name, rows, (datetime.now() - start_time).total_seconds(), manifest_identity(manifest))
+        logger.success(f"{table_name}: {rows} rows from {len(manifest['segments'])} segments")
+        return True
+    except Exception as e:
+        logger.error(f"{table_name}: stage load failed: {e}")
+        metrics.record_failure(); metrics.finish()
+        checkpoint.mark_failed(table_name, str(e))
+        return False
+
+def pending_manifests(manifests, checkpoint, replay=False):
+    """Ohne --replay nur Tabellen, deren aktuelle Extraktion noch nicht geladen wurde"""
+    if replay: return manifests
+    return [m for m in manifests if checkpoint.get_fingerprint(m['table']) != manifest_identity(m)]
+
+def load_worker(worker_id, manifest_queue, stage_dir, logger, checkpoint, fast_load):
+    try:
+        pg_conn = connect_postgres()
+    except Exception as e:
+        logger.error(f"Worker {worker_id}: {e}")
+        return
+    try:
+        while True:
+            try: manifest = manifest_queue.get_nowait()
+            except queue.Empty: break
+            load_staged_table(pg_conn, stage_dir, manifest, logger, checkpoint, fast_load)
+    finally:
+        pg_conn.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Lädt extrahierte Stage-Segmente nach PostgreSQL")
+    parser.add_argument('--stage-dir', required=True, help="Verzeichnis der Extraktion (--stage-dir beim Extrahieren)")
+    parser.add_argument('--workers', type=int, default=1, help="Parallel geladene Tabellen")
+    parser.add_argument('--tables', nargs='*', help="Nur diese Tabellen laden")
+    parser.add_argument('--replay', action='store_true', help="Bereits geladene Tabellen erneut laden (neu extrahierte werden immer geladen)")
+    parser.add_argument('--fast-load', action=argparse.BooleanOptionalAction, default=True,
+                        help="UNLOGGED-Tabellen bis zur Zeilenprüfung (Default: an)")
+    parser.add_argument('--profile', action='store_true', help=PROFILE_HELP)
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    if not os.path.exists(LOG_DIR): os.makedirs(LOG_DIR)
+    logger, checkpoint = MigrationLogger(LOG_FILE), Checkpoint(CHECKPOINT_FILE)
+    profiler = start_profiler(args.profile, 'stage_load')
+    try:
+        manifests = list_staged_tables(args.stage_dir)
+        if args.tables: manifests = [m for m in manifests if m['table'] in args.tables]
+        manifests = pending_manifests(manifests, checkpoint, args.replay)
+        logger.log(f"{len(manifests)} staged tables to load from {args.stage_dir}")
+        # Größte Tabellen zuerst
+        manifest_queue = queue.Queue()
+        for m in sorted(manifests, key=lambda m: m['rows'], reverse=True): manifest_queue.put(m)
+        threads = [threading.Thread(target=load_worker, args=(i, manifest_queue, args.stage_dir, logger, checkpoint, args.fast_load), name=f"loader-{i}")
+                   for i in range(1, max(1, args.workers) + 1)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        failed = [m['table'] for m in manifests if checkpoint.status(m['table']) == 'failed']
+        if failed:
+            logger.error(f"{len(failed)} tables failed: {', '.join(failed)}"); sys.exit(1)
+    finally:
+        checkpoint.export()
+        json_path, prom_path = METRICS.export(LOG_DIR, "stage_load_metrics")
+        logger.log(f"Metrics written: {json_path}, {prom_path}")
+        finish_profiler(profiler, LOG_DIR, logger.log)
+
+if __name__ == "__main__":
+    main()
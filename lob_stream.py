@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+LOB-STREAMING: BYTE/BLOB/TEXT/LVARCHAR-Spalten ohne Komplettkopie über JPype
+getBytes()/getString() erzeugen für jeden Wert ein Java-Array bzw. einen String in
+voller Größe, der dann noch einmal nach Python kopiert wird. Hier werden BYTE/BLOB
+über getBinaryStream() und TEXT über getCharacterStream() in festen Chunks gelesen.
+Tabellen mit solchen Spalten werden außerdem nach Bytes statt nur nach Zeilen
+in Batches geteilt (LOB_BATCH_BYTES).
+JPype wird erst in den Stream-Readern importiert (dann läuft die JVM ohnehin schon),
+damit der Import dieses Moduls ohne Java-Umgebung möglich bleibt.
+"""
+
+LOB_TYPES = {'BYTE', 'BLOB', 'TEXT', 'LVARCHAR'}
+LOB_CHUNK_SIZE = 1024 * 1024          # Bytes bzw. Zeichen pro read() auf dem JDBC-Stream
+LOB_BATCH_BYTES = 16 * 1024 * 1024    # LOB-Daten pro Batch; mit PIPELINE_DEPTH gepufferten Batches plus COPY-Puffer
+LOB_FETCH_SIZE = 50                   # JDBC-Fetchgröße für LOB-Tabellen (der Treiber puffert ganze Zeilen)
+
+def lob_column_indexes(columns):
+    """0-basierte Positionen der LOB-Spalten aus get_table_schema"""
+    return [i for i, col in enumerate(columns) if col.get('ifx_type') in LOB_TYPES]
+
+def lob_row_bytes(lob_indexes):
+    """Funktion row → Größe der LOB-Werte einer Zeile (Zeichen bei TEXT, Bytes bei BYTE/BLOB)"""
+    def row_bytes(row):
+        return sum(len(row[i]) for i in lob_indexes if row[i] is not None)
+    return row_bytes
+
+def read_binary_stream(rs, idx):
+    """Liefert das bytearray selbst: format_copy_value und der Binär-Encoder nehmen es wie bytes an,
+    bytes(data) würde jeden Wert noch einmal vollständig kopieren"""
+    stream = rs.getBinaryStream(idx)
+    if stream is None: return None
+    from jpype import JArray, JByte
+    chunk, data = JArray(JByte)(LOB_CHUNK_SIZE), bytearray()
+    try:
+        while True:
+            n = stream.read(chunk, 0, LOB_CHUNK_SIZE)
+            if n < 0: break
+            data += memoryview(chunk)[:n]
+    finally:
+        stream.close()
+    return data
+
+def read_character_stream(rs, idx):
+    reader = rs.getCharacterStream(idx)
+    if reader is None: return None
+    from jpype import JArray, JChar, JClass
+    java_string = JClass('java.lang.String')
+    chunk, parts = JArray(JChar)(LOB_CHUNK_SIZE), []
+    try:
+        while True:
+            n = reader.read(chunk, 0, LOB_CHUNK_SIZE)
+            if n < 0: break
+            parts.append(str(java_string(chunk, 0, n)))
+    finally:
+        reader.close()
+    return ''.join(parts)
+
+# LVARCHAR ist auf 32 KB begrenzt und bleibt bei getString; es zählt aber zum Byte-Limit des Batches
+LOB_STREAM_CONVERTERS = {'BYTE': read_binary_stream, 'BLOB': read_binary_stream, 'TEXT': read_character_stream}
+
+def apply_lob_streaming(plan, columns):
+    """Ersetzt im Konverter-Plan die Getter der BYTE/BLOB/TEXT-Spalten durch Stream-Reader"""
+    return [LOB_STREAM_CONVERTERS.get(col.get('ifx_type'), conv) for conv, col in zip(plan, columns)]
@@ -5,30 +5,42 @@ Sicherheits-Update: Nutzt zentrale db_config.py
 """
 
 import os
-import json
 import sys
+import time
+import argparse
+import threading
 from datetime import datetime
 # --- ZENTRALE CONFIG IMPORTIEREN ---
 from db_config import connect_informix, connect_postgres
+from jdbc_fetch import iter_rows
+from catalog_cache import CatalogSnapshot
+from migration_metrics import MetricsRegistry
+from checkpoint_store import Checkpoint
+from sampling_profiler import start_profiler, finish_profiler, PROFILE_HELP
 
 # Lokale Pfade für Logs
 LOG_DIR = r"C:\postgres\migration"
 LOG_FILE = os.path.join(LOG_DIR, f"fk_migration_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
 CHECKPOINT_FILE = os.path.join(LOG_DIR, "fk_checkpoint.json")
+METRICS = MetricsRegistry()
+VALIDATE_WORKERS = 4  # Parallele VALIDATE CONSTRAINT im --not-valid-Modus
 
 os.environ['JAVA_HOME'] = r'C:\baustelle_8.6\jdk-17.0.11.9-hotspot'
 
+_log_lock = threading.Lock()
+
 def log(message, level="INFO"):
     """Log message to file and console"""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     log_line = f"[{timestamp}] [{level}] {message}"
-    print(log_line)
-    
-    if not os.path.exists(LOG_DIR):
-        os.makedirs(LOG_DIR)
+    with _log_lock:
+        print(log_line)
         
-    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(log_line + '\n')
+        if not os.path.exists(LOG_DIR):
+            os.makedirs(LOG_DIR)
+            
+        with open(LOG_FILE, 'a', encoding='utf-8') as f:
+            f.write(log_line + '\n')
 
 def get_foreign_keys(ifx_conn):
     log("Fetching Foreign Keys from Informix...")
@@ -64,10 +76,7 @@ def get_foreign_keys(ifx_conn):
     """)
     
     foreign_keys = []
-    while True:
-        row = cursor.fetchone()
-        if row is None: break
-        
+    for row in iter_rows(cursor):
         child_cols = [abs(row[i]) for i in range(3, 19) if row[i] and row[i] != 0]
         parent_cols = [abs(row[i]) for i in range(19, 35) if row[i] and row[i] != 0]
         
@@ -80,16 +89,14 @@ def get_foreign_keys(ifx_conn):
     cursor.close()
     return foreign_keys
 
-def get_column_names(ifx_conn, table_name, col_numbers):
-    cursor = ifx_conn.cursor()
-    placeholders = ','.join(['?'] * len(col_numbers))
-    query = f"SELECT colno, colname FROM syscolumns c JOIN systables t ON c.tabid = t.tabid WHERE t.tabname = ? AND c.colno IN ({placeholders}) ORDER BY c.colno"
-    cursor.execute(query, [table_name] + col_numbers)
-    col_mapping = {row[0]: row[1] for row in iter(cursor.fetchone, None)}
-    cursor.close()
-    return [col_mapping.get(num, f"col_{num}") for num in col_numbers]
+def get_column_names(catalog, table_name, col_numbers):
+    """Spaltennamen aus dem Katalog-Snapshot (kein eigener syscolumns-Roundtrip)"""
+    return catalog.column_names(table_name, col_numbers)
+
+def pg_foreign_key_name(fk_info):
+    return f"{fk_info['child_table']}_{fk_info['fk_name']}_fkey".lower()[:63]
 
-def create_foreign_key(pg_conn, fk_info, child_cols, parent_cols):
+def foreign_key_sql(fk_info, child_cols, parent_cols, not_valid=False):
     def escape_col(col):
         return f'"{col}"' if col.lower() in ['user', 'order', 'group', 'select', 'table'] else col
     
@@ -100,9 +107,14 @@ def create_foreign_key(pg_conn, fk_info, child_cols, parent_cols):
     on_delete = f" ON DELETE {rules[fk_info['delete_rule']]}" if fk_info['delete_rule'] in rules else ""
     on_update = f" ON UPDATE {rules[fk_info['update_rule']]}" if fk_info['update_rule'] in rules else ""
     
-    pg_fk_name = f"{fk_info['child_table']}_{fk_info['fk_name']}_fkey".lower()[:63]
+    pg_fk_name = pg_foreign_key_name(fk_info)
+    not_valid_clause = " NOT VALID" if not_valid else ""
     
-    alter_sql = f"ALTER TABLE {fk_info['child_table']} ADD CONSTRAINT {pg_fk_name} FOREIGN KEY ({child_cols_str}) REFERENCES {fk_info['parent_table']} ({parent_cols_str}){on_delete}{on_update}"
+    return f"ALTER TABLE {fk_info['child_table']} ADD CONSTRAINT {pg_fk_name} FOREIGN KEY ({child_cols_str}) REFERENCES {fk_info['parent_table']} ({parent_cols_str}){on_delete}{on_update}{not_valid_clause}"
+
+def create_foreign_key(pg_conn, fk_info, child_cols, parent_cols, not_valid=False):
+    """not_valid: Constraint ohne Prüfung der vorhandenen Zeilen anlegen (sofort, nur kurzer Lock)"""
+    alter_sql = foreign_key_sql(fk_info, child_cols, parent_cols, not_valid)
     
     try:
         cursor = pg_conn.cursor()
@@ -114,53 +126,159 @@ def create_foreign_key(pg_conn, fk_info, child_cols, parent_cols):
         pg_conn.rollback()
         return False, str(e)
 
-def load_checkpoint():
-    if os.path.exists(CHECKPOINT_FILE):
-        with open(CHECKPOINT_FILE, 'r') as f: return json.load(f)
-    return {'completed': [], 'failed': [], 'start_time': datetime.now().isoformat()}
+def validate_foreign_key(pg_conn, fk_info):
+    """Prüft einen NOT VALID angelegten FK; hält nur SHARE UPDATE EXCLUSIVE auf der Kindtabelle"""
+    try:
+        cursor = pg_conn.cursor()
+        cursor.execute(f"ALTER TABLE {fk_info['child_table']} VALIDATE CONSTRAINT {pg_foreign_key_name(fk_info)}")
+        pg_conn.commit()
+        cursor.close()
+        return True, None
+    except Exception as e:
+        pg_conn.rollback()
+        return False, str(e)
+
+class ValidationScheduler:
+    """Vergibt die FK-Gruppen (je Kindtabelle) so, dass keine Tabelle gleichzeitig in zwei
+    Validierungen steckt: weder dieselbe Kindtabelle (gegenseitige Sperre) noch dieselbe
+    Elterntabelle (zwei Worker würden sie parallel lesen). Größte Gruppen zuerst."""
+    def __init__(self, groups):
+        self.groups = sorted(groups, key=len, reverse=True)
+        self.busy = set()
+        self.cond = threading.Condition()
+    @staticmethod
+    def tables(table_fks):
+        return {table_fks[0]['child_table']} | {fk_info['parent_table'] for fk_info in table_fks}
+    def next_group(self):
+        with self.cond:
+            while self.groups:
+                for i, table_fks in enumerate(self.groups):
+                    if not self.tables(table_fks) & self.busy:
+                        self.busy |= self.tables(table_fks)
+                        return self.groups.pop(i)
+                # Alle übrigen Gruppen berühren eine Tabelle, die gerade validiert wird
+                self.cond.wait()
+            return None
+    def done(self, table_fks):
+        with self.cond:
+            self.busy -= self.tables(table_fks)
+            self.cond.notify_all()
+
+def validate_foreign_keys_parallel(fks, checkpoint, workers, metrics):
+    """VALIDATE CONSTRAINT über mehrere Verbindungen. Ein Worker übernimmt jeweils alle FKs einer
+    Kindtabelle; ValidationScheduler hält Gruppen mit gemeinsamer Kind- oder Elterntabelle auseinander.
+    Fehler werden je FK festgehalten; die übrigen FKs laufen weiter."""
+    by_table = {}
+    for fk_info in fks: by_table.setdefault(fk_info['child_table'], []).append(fk_info)
+    scheduler = ValidationScheduler(by_table.values())
+    lock, counter = threading.Lock(), [0]
+    def record(fk_info, success, error, duration):
+        key = f"{fk_info['child_table']}.{fk_info['fk_name']}"
+        if success:
+            metrics.record_batch(1, 0, duration)
+            checkpoint.mark_completed(key, 0, duration)
+        else:
+            metrics.record_failure()
+            log(f"✗ VALIDATE FAILED {key}: {error}", "ERROR")
+            # Der FK bleibt NOT VALID bestehen
+            checkpoint.mark(key, 'not_valid', error=error)
+    def worker():
+        try:
+            pg_conn = connect_postgres()
+        except Exception as e:
+            # Die Gruppen übernehmen die übrigen Worker; ohne jeden Worker bleiben sie unten als nicht validiert stehen
+            log(f"{threading.current_thread().name}: PostgreSQL connection failed: {e}", "ERROR")
+            return
+        try:
+            while True:
+                table_fks = scheduler.next_group()
+                if table_fks is None: break
+                try:
+                    for fk_info in table_fks:
+                        start = time.perf_counter()
+                        with metrics.timer('write', fk_info['child_table']):
+                            success, error = validate_foreign_key(pg_conn, fk_info)
+                        record(fk_info, success, error, time.perf_counter() - start)
+                        with lock:
+                            counter[0] += 1
+                            if counter[0] % 50 == 0: log(f"[{counter[0]}/{len(fks)}] validated")
+                finally:
+                    scheduler.done(table_fks)
+        finally:
+            pg_conn.close()
+    threads = [threading.Thread(target=worker, name=f"fk-validate-{n}") for n in range(1, min(workers, len(by_table)) + 1)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    for table_fks in scheduler.groups:
+        for fk_info in table_fks: record(fk_info, False, "not validated: no PostgreSQL connection", 0)
 
-def save_checkpoint(checkpoint):
-    with open(CHECKPOINT_FILE, 'w') as f: json.dump(checkpoint, f, indent=2)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Foreign-Key-Migration Informix → PostgreSQL")
+    parser.add_argument('--not-valid', action='store_true', help="FKs zuerst NOT VALID anlegen, danach parallel VALIDATE CONSTRAINT")
+    parser.add_argument('--workers', type=int, default=VALIDATE_WORKERS, help="Verbindungen für VALIDATE CONSTRAINT (nur mit --not-valid)")
+    parser.add_argument('--profile', action='store_true', help=PROFILE_HELP)
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
     log("=" * 80)
     log("FOREIGN KEYS MIGRATION: Informix → PostgreSQL (Secure Mode)")
     log("=" * 80)
     
     start_time = datetime.now()
+    profiler = start_profiler(args.profile, 'foreign_keys')
     try:
         ifx_conn = connect_informix()
         pg_conn = connect_postgres()
         
-        checkpoint = load_checkpoint()
+        checkpoint = Checkpoint(CHECKPOINT_FILE)
+        catalog = CatalogSnapshot.load(ifx_conn, log=log)
         fks = get_foreign_keys(ifx_conn)
-        completed_keys = set(checkpoint['completed'])
-        pending_fks = [fk for fk in fks if f"{fk['child_table']}.{fk['fk_name']}" not in completed_keys]
+        # NOT VALID angelegte FKs müssen nur noch validiert werden
+        pending_fks = [fk for fk in fks if checkpoint.status(f"{fk['child_table']}.{fk['fk_name']}") not in ('completed', 'not_valid')]
         
         log(f"Total: {len(fks)} | Pending: {len(pending_fks)}")
+        metrics = METRICS.stage('foreign_keys', phase='constraints')
         
         for i, fk_info in enumerate(pending_fks, 1):
             key = f"{fk_info['child_table']}.{fk_info['fk_name']}"
-            child_cols = get_column_names(ifx_conn, fk_info['child_table'], fk_info['child_col_numbers'])
-            parent_cols = get_column_names(ifx_conn, fk_info['parent_table'], fk_info['parent_col_numbers'])
+            child_cols = get_column_names(catalog, fk_info['child_table'], fk_info['child_col_numbers'])
+            parent_cols = get_column_names(catalog, fk_info['parent_table'], fk_info['parent_col_numbers'])
             
-            success, error = create_foreign_key(pg_conn, fk_info, child_cols, parent_cols)
+            start = time.perf_counter()
+            with metrics.timer('write', fk_info['child_table']):
+                success, error = create_foreign_key(pg_conn, fk_info, child_cols, parent_cols, not_valid=args.not_valid)
+            duration = time.perf_counter() - start
             if success:
-                checkpoint['completed'].append(key)
+                metrics.record_batch(1, 0, duration)
+                if args.not_valid: checkpoint.mark(key, 'not_valid')
+                else: checkpoint.mark_completed(key, 0, duration)
                 if i % 20 == 0: log(f"[{i}/{len(pending_fks)}] Created FK for {fk_info['child_table']}")
             else:
+                metrics.record_failure()
                 log(f"✗ FAILED {key}: {error}", "ERROR")
-                checkpoint['failed'].append({'table': fk_info['child_table'], 'fk': fk_info['fk_name'], 'error': error})
+                checkpoint.mark_failed(key, error)
             
-            if i % 50 == 0: save_checkpoint(checkpoint)
-            
-        save_checkpoint(checkpoint)
+        metrics.finish()
+        
+        not_valid_keys = set(checkpoint.keys('not_valid'))
+        if not_valid_keys:
+            to_validate = [fk for fk in fks if f"{fk['child_table']}.{fk['fk_name']}" in not_valid_keys]
+            log(f"Validating {len(to_validate)} FKs with {args.workers} workers...")
+            validate_metrics = METRICS.stage('foreign_keys_validate', phase='constraints')
+            validate_foreign_keys_parallel(to_validate, checkpoint, args.workers, validate_metrics)
+            validate_metrics.finish()
+            # Nicht validierte FKs bleiben NOT VALID bestehen (neue Zeilen werden geprüft) und werden beim nächsten Lauf erneut validiert
+            for key in checkpoint.keys('not_valid'): log(f"  NOT VALID: {key} {checkpoint.get(key).get('error') or ''}", "WARN")
+        checkpoint.export()
+        log(f"Metrics written: {', '.join(METRICS.export(LOG_DIR, 'fk_metrics'))}")
         log(f"Duration: {(datetime.now() - start_time).total_seconds() / 60:.1f} minutes")
         
     finally:
         if 'ifx_conn' in locals(): ifx_conn.close()
         if 'pg_conn' in locals(): pg_conn.close()
         log("Connections closed")
+        finish_profiler(profiler, LOG_DIR, log)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -10,8 +10,25 @@ import psycopg2
 from datetime import datetime
 import sys
 import os
-import json
+import argparse
+import copy
+import hashlib
+import queue
+import threading
+import time
 import traceback
+from contextlib import contextmanager
+from jdbc_fetch import iter_rows, set_fetch_size, column_converters, fetch_column_block, fetch_row_block_capped, FETCH_SIZE
+from batch_sizing import BatchSizer, estimate_row_width
+from value_converters import build_converter_plan
+from migration_metrics import MetricsRegistry, StageMetrics
+from schema_mapping import TYPE_MAPPING, INTEGER_KEY_TYPES, get_table_schema, ifx_epoch_seconds
+from pg_load import (COPY_FORMAT, escape_identifier, build_copy_buffer, MigrationLogger, postgres_table_exists,
+                     create_table_postgres, set_table_logged, BatchWriter)
+from stage_segments import SegmentWriter, is_staged
+from checkpoint_store import Checkpoint
+from lob_stream import lob_column_indexes, lob_row_bytes, apply_lob_streaming, LOB_BATCH_BYTES, LOB_FETCH_SIZE
+from sampling_profiler import start_profiler, finish_profiler, PROFILE_HELP
 
 # --- SICHERHEITS-CHECK: Credentials laden ---
 INFORMIX_PASSWORD = os.getenv('IFX_PW')
@@ -48,79 +65,16 @@ POSTGRES_CONFIG = {
     'password': POSTGRES_PASSWORD  # Nutzt die sichere Variable
 }
 
-BATCH_SIZE = 500
+# Batch-Größe wird je Tabelle von batch_sizing.BatchSizer gewählt
+FAST_LOAD_COMMIT_BATCHES = 20  # Fast-Load: ein Commit je 20 Batches statt je Batch
+PIPELINE_DEPTH = 4  # Max. gepufferte Batches zwischen Informix-Reader und PostgreSQL-Writer
+PARTITION_THRESHOLD_ROWS = 5_000_000  # Ab dieser Größe (systables.nrows) wird eine Tabelle in Bereiche aufgeteilt
+PARTITION_COUNT = 8
+RESUME_THRESHOLD_ROWS = 1_000_000  # Ab dieser Größe wird nach PK sortiert gelesen und die Position je Commit gespeichert
 LOG_DIR = r"C:\postgres\migration"
 CHECKPOINT_FILE = os.path.join(LOG_DIR, "checkpoint.json")
 LOG_FILE = os.path.join(LOG_DIR, f"migration_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-
-# Datentyp-Mapping: Informix → PostgreSQL
-TYPE_MAPPING = {
-    0: 'CHAR', 1: 'SMALLINT', 2: 'INTEGER', 3: 'FLOAT', 4: 'SMALLFLOAT', 
-    5: 'DECIMAL', 6: 'SERIAL', 7: 'DATE', 8: 'MONEY', 9: 'NULL', 
-    10: 'DATETIME', 11: 'BYTE', 12: 'TEXT', 13: 'VARCHAR', 14: 'INTERVAL', 
-    15: 'NCHAR', 16: 'NVARCHAR', 17: 'INT8', 18: 'SERIAL8', 19: 'SET', 
-    20: 'MULTISET', 21: 'LIST', 22: 'ROW', 23: 'COLLECTION', 40: 'LVARCHAR', 
-    41: 'BLOB', 43: 'BOOLEAN', 52: 'BIGINT', 53: 'BIGSERIAL',
-}
-
-POSTGRES_TYPE_MAPPING = {
-    'CHAR': 'CHAR', 'SMALLINT': 'SMALLINT', 'INTEGER': 'INTEGER', 
-    'FLOAT': 'DOUBLE PRECISION', 'SMALLFLOAT': 'REAL', 'DECIMAL': 'NUMERIC', 
-    'SERIAL': 'SERIAL', 'DATE': 'DATE', 'MONEY': 'NUMERIC(12,2)', 
-    'DATETIME': 'TIMESTAMP', 'BYTE': 'BYTEA', 'TEXT': 'TEXT', 
-    'VARCHAR': 'VARCHAR', 'LVARCHAR': 'TEXT', 'INTERVAL': 'INTERVAL', 
-    'NCHAR': 'CHAR', 'NVARCHAR': 'VARCHAR', 'INT8': 'BIGINT', 
-    'SERIAL8': 'BIGSERIAL', 'BLOB': 'BYTEA', 'BOOLEAN': 'BOOLEAN', 
-    'BIGINT': 'BIGINT', 'BIGSERIAL': 'BIGSERIAL',
-}
-
-POSTGRES_RESERVED_KEYWORDS = {
-    'user', 'order', 'select', 'from', 'where', 'insert', 'update', 'delete',
-    'group', 'having', 'create', 'drop', 'alter', 'table', 'index', 'view',
-    'union', 'all', 'and', 'or', 'not', 'null', 'default', 'primary', 'foreign',
-    'key', 'check', 'unique', 'references', 'on', 'to', 'as', 'is', 'in',
-    'exists', 'like', 'between', 'distinct', 'case', 'when', 'then', 'else',
-    'end', 'cast', 'extract', 'interval', 'timestamp', 'date', 'time'
-}
-
-def escape_identifier(name):
-    if name.lower() in POSTGRES_RESERVED_KEYWORDS:
-        return f'"{name}"'
-    return name
-
-class MigrationLogger:
-    def __init__(self, log_file):
-        self.log_file = log_file
-        self.start_time = datetime.now()
-    def log(self, message, level="INFO"):
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_line = f"[{timestamp}] [{level}] {message}"
-        print(log_line)
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_line + '\n')
-    def error(self, message): self.log(message, "ERROR")
-    def warning(self, message): self.log(message, "WARN")
-    def success(self, message): self.log(message, "SUCCESS")
-
-class Checkpoint:
-    def __init__(self, checkpoint_file):
-        self.checkpoint_file = checkpoint_file
-        self.data = self.load()
-    def load(self):
-        if os.path.exists(self.checkpoint_file):
-            with open(self.checkpoint_file, 'r') as f: return json.load(f)
-        return {'completed_tables': [], 'failed_tables': [], 'last_table': None, 'start_time': datetime.now().isoformat(), 'stats': {}}
-    def save(self):
-        with open(self.checkpoint_file, 'w') as f: json.dump(self.data, f, indent=2)
-    def mark_completed(self, table_name, row_count, duration):
-        self.data['completed_tables'].append(table_name)
-        self.data['stats'][table_name] = {'rows': row_count, 'duration': duration, 'status': 'completed'}
-        self.save()
-    def mark_failed(self, table_name, error):
-        self.data['failed_tables'].append(table_name)
-        self.data['stats'][table_name] = {'status': 'failed', 'error': str(error)}
-        self.save()
-    def is_completed(self, table_name): return table_name in self.data['completed_tables']
+METRICS = MetricsRegistry()
 
 def connect_informix():
     try:
@@ -146,99 +100,434 @@ def get_all_tables(ifx_conn, logger):
     cursor = ifx_conn.cursor()
     cursor.execute("SELECT tabname, nrows FROM systables WHERE tabid > 99 AND tabtype = 'T' ORDER BY nrows ASC")
     tables = []
-    while True:
-        row = cursor.fetchone()
-        if row is None: break
+    for row in iter_rows(cursor):
         tables.append({'name': row[0], 'rows': row[1] if row[1] else 0})
     cursor.close()
     return tables
 
-def get_table_schema(ifx_conn, table_name, logger):
+# --- Inkrementeller Modus: Fingerabdruck je Quelltabelle ---
+
+FINGERPRINT_SUM_TYPES = {'SMALLINT', 'INTEGER', 'SERIAL', 'INT8', 'SERIAL8', 'BIGINT', 'BIGSERIAL', 'DECIMAL', 'MONEY', 'FLOAT', 'SMALLFLOAT'}
+FINGERPRINT_LENGTH_TYPES = {'CHAR', 'NCHAR', 'VARCHAR', 'NVARCHAR', 'LVARCHAR'}
+
+def fingerprint_aggregates(columns):
+    """Ein Aggregat je Spalte, ohne Obergrenze. Typen ohne sinnvolles Aggregat (TEXT, BYTE, INTERVAL, ...)
+    gehen mit der Anzahl der Nicht-NULL-Werte ein; Inhaltsänderungen dort erkennt der Änderungszähler."""
+    aggregates = ['COUNT(*)']
+    for col in columns:
+        # Informix-Namen ohne Quotes: ohne DELIMIDENT wäre "user" ein String-Literal
+        name, ifx_type = col['name'], col['ifx_type']
+        if ifx_type in FINGERPRINT_SUM_TYPES: aggregates.append(f"SUM({name})")
+        elif ifx_type in FINGERPRINT_LENGTH_TYPES: aggregates.append(f"SUM(LENGTH({name}))")
+        elif ifx_type == 'DATE': aggregates.append(f"SUM({name} - MDY(12,31,1899))")
+        elif ifx_type == 'DATETIME': aggregates.append(f"SUM({ifx_epoch_seconds(name)})")
+        elif ifx_type == 'BOOLEAN': aggregates.append(f"SUM(CASE WHEN {name} = 't' THEN 1 ELSE 0 END)")
+        else: aggregates.append(f"SUM(CASE WHEN {name} IS NULL THEN 0 ELSE 1 END)")
+    return aggregates
+
+def compute_fingerprint(ifx_conn, table_name, columns):
+    """Änderungszähler der Engine, COUNT(*), Aggregate über alle Spalten und systables.version als SHA1.
+    Kein SUM(ROWID): fragmentierte Tabellen haben keine ROWID-Spalte."""
+    cursor = ifx_conn.cursor()
+    try:
+        cursor.execute(f"SELECT {', '.join(fingerprint_aggregates(columns))} FROM {table_name}")
+        values = list(cursor.fetchone())
+        # version zählt bei jeder DDL-Änderung hoch (ALTER TABLE, neue Spalten, ...)
+        cursor.execute("SELECT version FROM systables WHERE tabname = ?", [table_name])
+        values.append(cursor.fetchone()[0])
+        # Schreibzähler aller Fragmente: jedes INSERT/UPDATE/DELETE ändert sie, auch bei gleicher Länge oder Summe.
+        # Nach einem Neustart der Engine (neue Boot-Zeit) oder wenn die Partition aus dem Speicher verdrängt wurde
+        # (keine Zeile, NULL) ändert sich der Fingerabdruck ebenfalls: das erzwingt nur ein Neuladen.
+        cursor.execute("SELECT SUM(iswrites), SUM(isrewrites), SUM(isdeletes) FROM sysmaster:sysptprof "
+                       "WHERE dbsname = DBINFO('dbname') AND tabname = ?", [table_name])
+        values.extend(cursor.fetchone())
+        cursor.execute("SELECT sh_boottime FROM sysmaster:sysshmvals")
+        values.append(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+    return hashlib.sha1(repr([str(v) for v in values]).encode('utf-8')).hexdigest()
+
+
+# --- Pipeline: Informix-Reader-Thread → begrenzte Queue → PostgreSQL-Writer ---
+
+_END_OF_DATA = object()
+
+def _put_batch(batch_queue, item, cancel):
+    """Blockiert bei voller Queue (Backpressure), gibt aber auf, sobald der Writer abbricht"""
+    while not cancel.is_set():
+        try:
+            batch_queue.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def read_batches(ifx_conn, select_sql, columns, batch_queue, cancel, metrics, sizer):
+    """Reader-Thread: liest Batches aus Informix; Fehler werden als Queue-Element an den Writer gereicht.
+    Die Batch-Größe (sizer.size) wird vom Writer nachgeregelt und gilt ab dem nächsten Block.
+    Tabellen mit BYTE/BLOB/TEXT/LVARCHAR werden zeilenweise gelesen und zusätzlich nach LOB-Bytes begrenzt."""
+    ifx_cursor = ifx_conn.cursor()
+    lob_indexes = lob_column_indexes(columns)
+    try:
+        with metrics.timer('execute'):
+            ifx_cursor.execute(select_sql)
+        set_fetch_size(ifx_cursor, LOB_FETCH_SIZE if lob_indexes else FETCH_SIZE)
+        converters = None
+        if getattr(ifx_cursor, '_rs', None) is not None:
+            # Ein Konverter je Spalte aus den Informix-Typen, einmal pro Tabelle
+            converters = build_converter_plan(columns, column_converters(ifx_cursor))
+            if lob_indexes: converters = apply_lob_streaming(converters, columns)
+        row_bytes = lob_row_bytes(lob_indexes)
+        while True:
+            if lob_indexes:
+                with metrics.timer('fetch'):
+                    batch = fetch_row_block_capped(ifx_cursor, sizer.size, LOB_BATCH_BYTES, converters, row_bytes)
+                if batch is None: break
+            else:
+                with metrics.timer('fetch'):
+                    block = fetch_column_block(ifx_cursor, sizer.size, converters)
+                if block is None: break
+                with metrics.timer('transpose'):
+                    batch = list(zip(*block))
+            if not _put_batch(batch_queue, batch, cancel): return
+        _put_batch(batch_queue, _END_OF_DATA, cancel)
+    except Exception as e:
+        _put_batch(batch_queue, e, cancel)
+    finally:
+        ifx_cursor.close()
+
+def migrate_table_data(ifx_conn, pg_conn, table_name, columns, total_rows, logger, where_clause=None, on_commit=None, metrics=None, fast_load=False, copy_format=COPY_FORMAT, writer=None,
+                       resume_key=None, last_key=None):
+    """writer: Ziel der Batches, Default BatchWriter nach PostgreSQL (SegmentWriter für --stage-dir).
+    resume_key: eindeutige Schlüsselspalte; dann wird danach sortiert ab last_key gelesen und
+    on_commit(rows, key) erhält den Schlüssel der letzten committeten Zeile."""
+    conditions = [c for c in (where_clause, f"{resume_key} > {int(last_key)}" if resume_key and last_key is not None else None) if c]
+    select_sql = f"SELECT * FROM {table_name}" + (f" WHERE {' AND '.join(conditions)}" if conditions else "") + (f" ORDER BY {resume_key}" if resume_key else "")
+    key_index = [col['name'] for col in columns].index(resume_key) if resume_key else None
+    metrics = metrics or StageMetrics(table_name, 'data')
+    writer = writer or BatchWriter(pg_conn, table_name, columns, logger, metrics=metrics,
+                                   commit_every=FAST_LOAD_COMMIT_BATCHES if fast_load else 1, synchronous_commit=not fast_load, copy_format=copy_format)
+    sizer = BatchSizer(table_name, estimate_row_width(columns), logger.log)
+    batch_queue, cancel = queue.Queue(maxsize=PIPELINE_DEPTH), threading.Event()
+    reader = threading.Thread(target=read_batches, args=(ifx_conn, select_sql, columns, batch_queue, cancel, metrics, sizer), name=f"{table_name}-reader", daemon=True)
+    reader.start()
+    rows_migrated = 0
+    try:
+        while True:
+            with metrics.timer('wait'):
+                batch = batch_queue.get()
+            if batch is _END_OF_DATA: break
+            if isinstance(batch, Exception): raise batch
+            if key_index is not None and batch: last_key = int(batch[-1][key_index])
+            rows_committed = writer.write(batch)
+            sizer.observe(len(batch), writer.last_bytes, writer.last_latency)
+            # Fortschritt erst nach dem Commit des Writers melden
+            if rows_committed:
+                rows_migrated += rows_committed
+                if on_commit: on_commit(rows_migrated, last_key)
+        rows_committed = writer.flush()
+        if rows_committed:
+            rows_migrated += rows_committed
+            if on_commit: on_commit(rows_migrated, last_key)
+        logger.log(sizer.summary())
+    finally:
+        # Bei Writer-Fehlern hört der Reader nach dem aktuellen Block auf
+        cancel.set()
+        reader.join()
+        writer.close()
+    return rows_migrated
+
+# --- Bereichsweise Extraktion für sehr große Tabellen ---
+
+def get_partition_key(ifx_conn, table_name, unique=False):
+    """Führende PK-Spalte, falls ganzzahlig; sonst None (dann wird über ROWID geteilt).
+    unique=True: nur einspaltige PKs, bei denen 'key > letzter Wert' eine Fortsetzung eindeutig festlegt"""
+    cursor = ifx_conn.cursor()
+    cursor.execute("""
+        SELECT c.colname, MOD(c.coltype, 256), i.part2
+        FROM sysconstraints k
+        JOIN systables t ON k.tabid = t.tabid
+        JOIN sysindexes i ON k.idxname = i.idxname AND k.tabid = i.tabid
+        JOIN syscolumns c ON c.tabid = t.tabid AND c.colno = ABS(i.part1)
+        WHERE k.constrtype = 'P' AND t.tabname = ?
+    """, [table_name])
+    row = cursor.fetchone()
+    cursor.close()
+    if row and TYPE_MAPPING.get(row[1]) in INTEGER_KEY_TYPES and not (unique and row[2]):
+        return row[0]
+    return None
+
+def compute_key_ranges(ifx_conn, table_name, key_column, partitions):
+    """Teilt [MIN, MAX] der Schlüsselspalte in gleich breite Bereiche [start, end, inklusive]"""
     cursor = ifx_conn.cursor()
-    cursor.execute(f"SELECT c.colname, c.coltype, MOD(c.coltype, 256) as base_type, c.collength, CASE WHEN c.coltype >= 256 THEN 1 ELSE 0 END as not_null FROM syscolumns c JOIN systables t ON c.tabid = t.tabid WHERE t.tabname = '{table_name}' ORDER BY c.colno")
-    columns = []
-    while True:
-        row = cursor.fetchone()
-        if row is None: break
-        col_name, base_type_code, col_length, not_null = row[0], row[2], row[3], row[4] == 1
-        ifx_type = TYPE_MAPPING.get(base_type_code, 'VARCHAR')
-        pg_type = POSTGRES_TYPE_MAPPING.get(ifx_type, 'TEXT')
-        if ifx_type in ['CHAR', 'NCHAR'] and col_length: pg_type = f"CHAR({col_length})"
-        elif ifx_type in ['VARCHAR', 'NVARCHAR'] and col_length: pg_type = f"VARCHAR({col_length})"
-        elif ifx_type == 'DECIMAL' and col_length:
-            precision, scale = (col_length >> 8) & 0xFF, col_length & 0xFF
-            pg_type = f"NUMERIC({precision},{scale})" if 0 < precision <= 1000 else "NUMERIC(12,2)"
-        columns.append({'name': col_name, 'type': pg_type, 'not_null': not_null})
+    cursor.execute(f"SELECT MIN({key_column}), MAX({key_column}) FROM {table_name}")
+    low, high = cursor.fetchone()
     cursor.close()
-    return columns
+    if low is None or high is None: return []
+    low, high = int(low), int(high)
+    step = max(1, (high - low + 1) // partitions)
+    ranges, start = [], low
+    while start <= high:
+        end = start + step
+        if end > high or len(ranges) == partitions - 1:
+            ranges.append([start, high, True])
+            break
+        ranges.append([start, end, False])
+        start = end
+    return ranges
+
+def range_condition(key_column, bounds):
+    start, end, inclusive = bounds
+    return f"{key_column} >= {start} AND {key_column} {'<=' if inclusive else '<'} {end}"
+
+def count_source_rows(ifx_conn, table_name):
+    cursor = ifx_conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+@contextmanager
+def range_connections():
+    """Eigenes Verbindungspaar (Informix, PostgreSQL) je Bereich; der Orchestrator übergibt
+    stattdessen eine Fabrik, die Verbindungen aus seinen Pools leiht"""
+    ifx_conn = connect_informix()
+    try:
+        pg_conn = connect_postgres()
+        try:
+            yield ifx_conn, pg_conn
+        finally:
+            pg_conn.close()
+    finally:
+        ifx_conn.close()
 
-def create_table_postgres(pg_conn, table_name, columns, logger):
+def migrate_range(table_name, columns, total_rows, logger, where_clause, metrics=None, fast_load=False, copy_format=COPY_FORMAT, resume_key=None, last_key=None, on_commit=None,
+                  connections=range_connections):
+    """Ein Bereich mit eigenem Verbindungspaar aus connections()"""
+    with connections() as (ifx_conn, pg_conn):
+        return migrate_table_data(ifx_conn, pg_conn, table_name, columns, total_rows, logger, where_clause, on_commit, metrics=metrics, fast_load=fast_load, copy_format=copy_format,
+                                  resume_key=resume_key, last_key=last_key)
+
+def migrate_table_partitioned(ifx_conn, table_name, columns, total_rows, logger, partitions, metrics=None, fast_load=False, copy_format=COPY_FORMAT, checkpoint=None, resume=None,
+                              connections=range_connections):
+    """resume: Bereichsstand eines abgebrochenen Laufs; fertige Bereiche werden übersprungen, die übrigen fortgesetzt.
+    connections: Kontextmanager-Fabrik für das Verbindungspaar je Bereich (siehe range_connections)"""
+    if resume:
+        key_column, ranges = resume['key'], resume['ranges']
+    else:
+        key_column = get_partition_key(ifx_conn, table_name)
+        try:
+            bounds = compute_key_ranges(ifx_conn, table_name, key_column or 'ROWID', partitions)
+        except Exception as e:
+            # z.B. fragmentierte Tabelle ohne ROWIDs
+            logger.warning(f"{table_name}: no usable range key ({e}), loading unpartitioned")
+            return None
+        if len(bounds) < 2: return None
+        ranges = [{'bounds': b, 'rows': 0, 'done': False} for b in bounds]
+    # ROWID-Bereiche lassen sich in PostgreSQL nicht wiederfinden, daher ohne Fortsetzungsstand
+    state = {'mode': 'ranges', 'key': key_column, 'ranges': ranges} if key_column else None
+    resume_key = key_column if key_column and get_partition_key(ifx_conn, table_name, unique=True) else None
+    pending = [i for i, entry in enumerate(ranges) if not entry['done']]
+    logger.log(f"{table_name}: {len(pending)}/{len(ranges)} ranges on {key_column or 'ROWID'}")
+    lock, errors = threading.Lock(), []
+    def record(index, rows, last_key=None, done=False):
+        with lock:
+            ranges[index].update(rows=rows, done=done)
+            if last_key is not None: ranges[index]['last_key'] = last_key
+            if checkpoint: checkpoint.mark_progress(table_name, sum(entry['rows'] for entry in ranges), resume=copy.deepcopy(state))
+    def run(index):
+        entry = ranges[index]
+        where_clause, base = range_condition(key_column or 'ROWID', entry['bounds']), entry['rows']
+        try:
+            rows = migrate_range(table_name, columns, total_rows, logger, where_clause, metrics, fast_load, copy_format, resume_key, entry.get('last_key'),
+                                 on_commit=lambda rows_committed, last_key: record(index, base + rows_committed, last_key), connections=connections)
+            record(index, base + rows, done=True)
+        except Exception as e: errors.append(f"[{where_clause}] {e}")
+    threads = [threading.Thread(target=run, args=(i,), name=f"{table_name}-range-{i}") for i in pending]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    if errors: raise Exception(f"Range load failed: {'; '.join(errors)}")
+    rows_migrated, source_rows = sum(entry['rows'] for entry in ranges), count_source_rows(ifx_conn, table_name)
+    if rows_migrated != source_rows:
+        raise Exception(f"Row count mismatch after range load: migrated {rows_migrated}, source {source_rows}")
+    return rows_migrated
+
+def prepare_resume(pg_conn, table_name, progress, logger):
+    """Setzt die Zieltabelle eines abgebrochenen Laufs auf den gespeicherten Stand zurück: löscht Zeilen
+    hinter der letzten gespeicherten Position bzw. unfertige Bereiche ohne eindeutigen Schlüssel und prüft
+    die Zeilenzahl. None = komplett neu laden (z.B. UNLOGGED-Tabelle nach Absturz geleert)."""
+    resume = copy.deepcopy((progress or {}).get('resume'))
+    if not resume or not postgres_table_exists(pg_conn, table_name): return None
+    key = escape_identifier(resume['key'])
+    if resume['mode'] == 'key':
+        trims, resume['rows'] = [f"{key} > {int(resume['last_key'])}"], progress['rows_committed']
+    else:
+        trims = []
+        for entry in resume['ranges']:
+            if entry['done']: continue
+            if entry.get('last_key') is not None:
+                trims.append(f"{range_condition(key, entry['bounds'])} AND {key} > {int(entry['last_key'])}")
+            else:
+                trims.append(range_condition(key, entry['bounds']))
+                entry['rows'] = 0
+        resume['rows'] = sum(entry['rows'] for entry in resume['ranges'])
     escaped_table_name = escape_identifier(table_name)
-    col_defs = [f"{escape_identifier(c['name'])} {c['type']} {'NOT NULL' if c['not_null'] else ''}" for c in columns]
-    create_sql = f"CREATE TABLE IF NOT EXISTS {escaped_table_name} (\n  " + ",\n  ".join(col_defs) + "\n)"
+    cursor = pg_conn.cursor()
     try:
-        cursor = pg_conn.cursor()
-        cursor.execute(f"DROP TABLE IF EXISTS {escaped_table_name} CASCADE")
-        cursor.execute(create_sql)
+        # Zeilen, die nach dem letzten Checkpoint-Eintrag committet wurden
+        if trims: cursor.execute(f"DELETE FROM {escaped_table_name} WHERE " + " OR ".join(f"({t})" for t in trims))
+        cursor.execute(f"SELECT COUNT(*) FROM {escaped_table_name}")
+        pg_rows = cursor.fetchone()[0]
+        if pg_rows != resume['rows']:
+            pg_conn.rollback()
+            logger.warning(f"{table_name}: PostgreSQL has {pg_rows} rows, checkpoint {resume['rows']}, reloading")
+            return None
         pg_conn.commit()
-        cursor.close()
-        return True
     except Exception as e:
-        logger.error(f"Failed to create table {table_name}: {e}")
         pg_conn.rollback()
-        return False
-
-def migrate_table_data(ifx_conn, pg_conn, table_name, columns, total_rows, logger):
-    escaped_table_name = escape_identifier(table_name)
-    escaped_col_names = [escape_identifier(col['name']) for col in columns]
-    placeholders = ', '.join(['%s'] * len(escaped_col_names))
-    insert_sql = f"INSERT INTO {escaped_table_name} ({', '.join(escaped_col_names)}) VALUES ({placeholders})"
-    ifx_cursor, pg_cursor = ifx_conn.cursor(), pg_conn.cursor()
-    ifx_cursor.execute(f"SELECT * FROM {table_name}")
-    rows_migrated, batch = 0, []
-    while True:
-        row = ifx_cursor.fetchone()
-        if row is None: break
-        batch.append(tuple(row))
-        if len(batch) >= BATCH_SIZE:
-            pg_cursor.executemany(insert_sql, batch)
-            pg_conn.commit()
-            rows_migrated += len(batch)
-            batch = []
-    if batch:
-        pg_cursor.executemany(insert_sql, batch)
-        pg_conn.commit()
-        rows_migrated += len(batch)
-    ifx_cursor.close(); pg_cursor.close()
-    return rows_migrated
+        logger.warning(f"{table_name}: resume not possible ({e}), reloading")
+        return None
+    finally:
+        cursor.close()
+    return resume
 
-def migrate_single_table(ifx_conn, pg_conn, table_info, logger, checkpoint):
+def migrate_single_table(ifx_conn, pg_conn, table_info, logger, checkpoint, options=None, connections=range_connections):
+    options = options or parse_args([])
     table_name, total_rows = table_info['name'], table_info['rows']
     start_time = datetime.now()
+    metrics = METRICS.stage(table_name, 'extract' if options.stage_dir else 'data')
     try:
         columns = get_table_schema(ifx_conn, table_name, logger)
-        if not create_table_postgres(pg_conn, table_name, columns, logger): raise Exception("Creation failed")
-        rows = migrate_table_data(ifx_conn, pg_conn, table_name, columns, total_rows, logger) if total_rows > 0 else 0
-        checkpoint.mark_completed(table_name, rows, (datetime.now() - start_time).total_seconds())
+        fingerprint = None
+        if options.incremental:
+            try:
+                fingerprint = compute_fingerprint(ifx_conn, table_name, columns)
+            except Exception as e:
+                # Ohne Fingerabdruck lässt sich "unverändert" nicht feststellen: komplett neu laden
+                logger.warning(f"{table_name}: fingerprint failed, reloading completely: {e}")
+            target_exists = is_staged(options.stage_dir, table_name) if options.stage_dir else postgres_table_exists(pg_conn, table_name)
+            if fingerprint is not None and fingerprint == checkpoint.get_fingerprint(table_name) and target_exists:
+                logger.log(f"{table_name}: unchanged since last load, skipped")
+                checkpoint.mark_unchanged(table_name)
+                return True
+        if options.stage_dir:
+            # Nur extrahieren; geladen wird getrennt mit load_stage_segments.py
+            writer = SegmentWriter(options.stage_dir, table_name, columns, logger, build_copy_buffer, metrics)
+            on_commit = lambda rows_committed, last_key: checkpoint.mark_progress(table_name, rows_committed)
+            rows = migrate_table_data(ifx_conn, None, table_name, columns, total_rows, logger, on_commit=on_commit, metrics=metrics, writer=writer)
+            writer.complete(rows)
+            metrics.finish()
+            checkpoint.mark_completed(table_name, rows, (datetime.now() - start_time).total_seconds(), fingerprint)
+            return True
+        # Fast-Load: UNLOGGED bis zur Prüfung. Nach einem Absturz leert PostgreSQL solche Tabellen;
+        # prepare_resume erkennt das an der Zeilenzahl, dann wird die Tabelle komplett neu geladen.
+        # 'failed' behält den Stand (Verbindungsabbruch, COPY-Fehler), 'running' bleibt nach einem harten Abbruch stehen.
+        fast_load = fast_load_enabled(options)
+        resume = prepare_resume(pg_conn, table_name, checkpoint.get(table_name), logger) if checkpoint.status(table_name) in ('running', 'failed') else None
+        if resume:
+            logger.log(f"{table_name}: resuming after {resume['rows']} committed rows")
+        elif not create_table_postgres(pg_conn, table_name, columns, logger, unlogged=fast_load, keep_existing=options.planned_schema): raise Exception("Creation failed")
+        rows = None
+        if resume and resume['mode'] == 'ranges' or not resume and options.partitions > 1 and total_rows >= options.partition_threshold:
+            rows = migrate_table_partitioned(ifx_conn, table_name, columns, total_rows, logger, options.partitions, metrics, fast_load, options.copy_format, checkpoint, resume, connections)
+        if rows is None:
+            # Ohne eindeutigen ganzzahligen PK bleibt nur der Neustart der Tabelle
+            resume_key = resume['key'] if resume else get_partition_key(ifx_conn, table_name, unique=True) if total_rows >= options.resume_threshold else None
+            base = resume['rows'] if resume else 0
+            def on_commit(rows_committed, last_key):
+                state = {'mode': 'key', 'key': resume_key, 'last_key': last_key} if resume_key and last_key is not None else None
+                checkpoint.mark_progress(table_name, base + rows_committed, resume=state)
+            rows = base + migrate_table_data(ifx_conn, pg_conn, table_name, columns, total_rows, logger, on_commit=on_commit, metrics=metrics, fast_load=fast_load, copy_format=options.copy_format,
+                                             resume_key=resume_key, last_key=resume['last_key'] if resume else None) if total_rows > 0 else 0
+        if fast_load:
+            with metrics.timer('set_logged'):
+                set_table_logged(pg_conn, table_name, rows)
+        metrics.finish()
+        checkpoint.mark_completed(table_name, rows, (datetime.now() - start_time).total_seconds(), fingerprint)
         return True
     except Exception as e:
         logger.error(f"Migration failed: {e}")
+        metrics.record_failure(); metrics.finish()
         checkpoint.mark_failed(table_name, str(e))
         return False
 
+def migration_worker(worker_id, table_queue, logger, checkpoint, options):
+    """Worker mit eigenem Verbindungspaar; holt Tabellen aus der gemeinsamen Queue, bis sie leer ist"""
+    try:
+        ifx_conn, pg_conn = connect_informix(), connect_postgres()
+    except Exception as e:
+        logger.error(f"Worker {worker_id}: {e}")
+        return
+    try:
+        while True:
+            try: table_info = table_queue.get_nowait()
+            except queue.Empty: break
+            logger.log(f"Worker {worker_id}: {table_info['name']} ({table_info['rows']} rows)")
+            migrate_single_table(ifx_conn, pg_conn, table_info, logger, checkpoint, options)
+    finally:
+        ifx_conn.close(); pg_conn.close()
+
+def migrate_parallel(pending, workers, logger, checkpoint, options):
+    # Größte Tabellen zuerst, damit am Ende keine Riesentabelle allein läuft
+    table_queue = queue.Queue()
+    for t in sorted(pending, key=lambda t: t['rows'], reverse=True):
+        table_queue.put(t)
+    threads = [threading.Thread(target=migration_worker, args=(i, table_queue, logger, checkpoint, options), name=f"worker-{i}")
+               for i in range(1, workers + 1)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+def fast_load_enabled(options):
+    """Fast-Load ist Default für Voll-Ladungen und aus bei --incremental, sofern nicht explizit gesetzt"""
+    return (not options.incremental) if options.fast_load is None else options.fast_load
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Vollständige Migration Informix → PostgreSQL")
+    parser.add_argument('--workers', type=int, default=1, help="Parallele Worker mit eigenen Verbindungen (Default: 1 = sequentiell)")
+    parser.add_argument('--partitions', type=int, default=PARTITION_COUNT, help="Anzahl Schlüssel-/ROWID-Bereiche für große Tabellen (1 = aus)")
+    parser.add_argument('--partition-threshold', type=int, default=PARTITION_THRESHOLD_ROWS, help="Ab dieser Zeilenzahl wird eine Tabelle aufgeteilt")
+    parser.add_argument('--resume-threshold', type=int, default=RESUME_THRESHOLD_ROWS,
+                        help="Ab dieser Zeilenzahl wird nach dem PK sortiert gelesen, damit ein Abbruch ab der letzten committeten Zeile fortgesetzt werden kann")
+    parser.add_argument('--incremental', action='store_true', help="Alle Tabellen prüfen, aber nur geänderte (Fingerabdruck) neu laden")
+    parser.add_argument('--fast-load', action=argparse.BooleanOptionalAction, default=None,
+                        help="UNLOGGED-Tabellen, synchronous_commit=off, seltenere Commits (Default: an, außer bei --incremental)")
+    parser.add_argument('--copy-format', choices=['text', 'binary'], default=COPY_FORMAT,
+                        help="COPY-Format; 'binary' fällt je Tabelle auf Text zurück, wenn ein Typ nicht kodierbar ist")
+    parser.add_argument('--planned-schema', action='store_true',
+                        help="Tabellen wurden mit ddl_planner.py --phases tables angelegt: nur leeren (TRUNCATE) statt DROP/CREATE")
+    parser.add_argument('--stage-dir', help="Nur extrahieren: Tabellen als gzip-Segmente mit Manifest in dieses Verzeichnis schreiben (Laden mit load_stage_segments.py)")
+    parser.add_argument('--profile', action='store_true', help=PROFILE_HELP)
+    return parser.parse_args(argv)
+
 def main():
-    logger, checkpoint = MigrationLogger(LOG_FILE), Checkpoint(CHECKPOINT_FILE)
+    args = parse_args()
+    if args.stage_dir and not os.path.exists(args.stage_dir): os.makedirs(args.stage_dir)
+    # Extraktion in den Stage hat einen eigenen Checkpoint, damit der PostgreSQL-Ladestand unberührt bleibt
+    checkpoint_file = os.path.join(args.stage_dir, "extract_checkpoint.json") if args.stage_dir else CHECKPOINT_FILE
+    logger, checkpoint = MigrationLogger(LOG_FILE), Checkpoint(checkpoint_file)
     os.environ['JAVA_HOME'] = r'C:\baustelle_8.6\jdk-17.0.11.9-hotspot'
+    profiler = start_profiler(args.profile, 'extract' if args.stage_dir else 'migration')
     try:
         ifx_conn, pg_conn = connect_informix(), connect_postgres()
         logger.success("Databases connected via environment secrets")
         tables = get_all_tables(ifx_conn, logger)
-        pending = [t for t in tables if not checkpoint.is_completed(t['name'])]
-        for i, t in enumerate(pending, 1):
-            migrate_single_table(ifx_conn, pg_conn, t, logger, checkpoint)
+        # Inkrementell: der Fingerabdruck entscheidet, nicht die Liste der erledigten Tabellen
+        pending = tables if args.incremental else [t for t in tables if not checkpoint.is_completed(t['name'])]
+        if args.workers > 1:
+            # Die Hauptverbindungen bleiben offen, bis die Worker fertig sind (JVM ist damit bereits gestartet)
+            logger.log(f"Parallel mode: {args.workers} workers, {len(pending)} tables pending")
+            migrate_parallel(pending, args.workers, logger, checkpoint, args)
+        else:
+            for i, t in enumerate(pending, 1):
+                migrate_single_table(ifx_conn, pg_conn, t, logger, checkpoint, args)
         ifx_conn.close(); pg_conn.close()
     except Exception as e:
         logger.error(f"FATAL: {e}"); sys.exit(1)
+    finally:
+        checkpoint.export()
+        json_path, prom_path = METRICS.export(LOG_DIR, "migration_metrics")
+        logger.log(f"Metrics written: {json_path}, {prom_path}")
+        finish_profiler(profiler, LOG_DIR, logger.log)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
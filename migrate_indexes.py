@@ -5,31 +5,46 @@ Sicherheits-Update: Nutzt zentrale db_config.py
 """
 
 import os
-import json
 import re
 import sys
+import argparse
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime
 # --- ZENTRALE CONFIG IMPORTIEREN ---
 from db_config import connect_informix, connect_postgres
+from jdbc_fetch import iter_rows
+from catalog_cache import CatalogSnapshot
+from migration_metrics import MetricsRegistry
+from checkpoint_store import Checkpoint
+from sampling_profiler import start_profiler, finish_profiler, PROFILE_HELP
 
 # Lokale Pfade für Logs
 LOG_DIR = r"C:\postgres\migration"
 LOG_FILE = os.path.join(LOG_DIR, f"index_migration_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
 CHECKPOINT_FILE = os.path.join(LOG_DIR, "index_checkpoint.json")
+METRICS = MetricsRegistry()
+
+# Parallel-Build: Default für --max-per-table (gleichzeitige CREATE INDEX auf derselben Tabelle)
+MAX_BUILDS_PER_TABLE = 1
 
 os.environ['JAVA_HOME'] = r'C:\baustelle_8.6\jdk-17.0.11.9-hotspot'
 
+_log_lock = threading.Lock()
+
 def log(message, level="INFO"):
     """Log message to file and console"""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     log_line = f"[{timestamp}] [{level}] {message}"
-    print(log_line)
-    
-    if not os.path.exists(LOG_DIR):
-        os.makedirs(LOG_DIR)
+    with _log_lock:
+        print(log_line)
         
-    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(log_line + '\n')
+        if not os.path.exists(LOG_DIR):
+            os.makedirs(LOG_DIR)
+            
+        with open(LOG_FILE, 'a', encoding='utf-8') as f:
+            f.write(log_line + '\n')
 
 def normalize_index_name(index_name, table_name):
     """Normalize index name for PostgreSQL"""
@@ -50,7 +65,8 @@ def get_indexes(ifx_conn):
             t.tabname, i.idxname, i.idxtype,
             i.part1, i.part2, i.part3, i.part4, i.part5,
             i.part6, i.part7, i.part8, i.part9, i.part10,
-            i.part11, i.part12, i.part13, i.part14, i.part15, i.part16
+            i.part11, i.part12, i.part13, i.part14, i.part15, i.part16,
+            t.nrows
         FROM sysindexes i
         JOIN systables t ON i.tabid = t.tabid
         WHERE t.tabid > 99 AND t.tabtype = 'T'
@@ -62,10 +78,7 @@ def get_indexes(ifx_conn):
     """)
     
     indexes = []
-    while True:
-        row = cursor.fetchone()
-        if row is None: break
-        
+    for row in iter_rows(cursor):
         columns_info = [{'col_num': abs(row[i]), 'desc': row[i] < 0} 
                         for i in range(3, 19) if row[i] and row[i] != 0]
         
@@ -74,40 +87,32 @@ def get_indexes(ifx_conn):
                 'table_name': row[0],
                 'index_name': row[1],
                 'is_unique': row[2] == 'U',
-                'columns_info': columns_info
+                'columns_info': columns_info,
+                'table_rows': row[19] or 0
             })
     cursor.close()
     return indexes
 
-def get_column_names_with_order(ifx_conn, table_name, columns_info):
-    cursor = ifx_conn.cursor()
-    col_numbers = [col['col_num'] for col in columns_info]
-    placeholders = ','.join(['?'] * len(col_numbers))
-    
-    query = f"SELECT colno, colname FROM syscolumns c JOIN systables t ON c.tabid = t.tabid WHERE t.tabname = ? AND c.colno IN ({placeholders})"
-    cursor.execute(query, [table_name] + col_numbers)
-    
-    col_mapping = {}
-    while True:
-        row = cursor.fetchone()
-        if row is None: break
-        col_mapping[row[0]] = row[1]
-    cursor.close()
+def get_column_names_with_order(catalog, table_name, columns_info):
+    col_names = catalog.column_names(table_name, [col['col_num'] for col in columns_info])
     
     columns = []
-    for col_info in columns_info:
-        col_name = col_mapping.get(col_info['col_num'], f"col_{col_info['col_num']}")
+    for col_info, col_name in zip(columns_info, col_names):
         if col_name.lower() in ['user', 'order', 'group', 'table', 'select']:
             col_name = f'"{col_name}"'
         columns.append(f"{col_name} DESC" if col_info['desc'] else col_name)
     return columns
 
-def create_index(pg_conn, index_info, columns):
+def index_sql(index_info, columns):
+    """(PostgreSQL-Indexname, CREATE INDEX)"""
     table_name = index_info['table_name']
     normalized_name = normalize_index_name(index_info['index_name'], table_name)
     cols_str = ', '.join(columns)
     unique_clause = "UNIQUE " if index_info['is_unique'] else ""
-    create_sql = f"CREATE {unique_clause}INDEX {normalized_name} ON {table_name} ({cols_str})"
+    return normalized_name, f"CREATE {unique_clause}INDEX {normalized_name} ON {table_name} ({cols_str})"
+
+def create_index(pg_conn, index_info, columns):
+    normalized_name, create_sql = index_sql(index_info, columns)
     
     try:
         cursor = pg_conn.cursor()
@@ -119,46 +124,135 @@ def create_index(pg_conn, index_info, columns):
         pg_conn.rollback()
         return False, str(e), normalized_name
 
-def load_checkpoint():
-    if os.path.exists(CHECKPOINT_FILE):
-        with open(CHECKPOINT_FILE, 'r') as f: return json.load(f)
-    return {'completed': [], 'failed': [], 'start_time': datetime.now().isoformat()}
+def configure_session(pg_conn, maintenance_work_mem=None, parallel_maintenance_workers=None):
+    """Sitzungsparameter für Index-Builds (None = Server-Default)"""
+    cursor = pg_conn.cursor()
+    if maintenance_work_mem:
+        cursor.execute("SET maintenance_work_mem = %s", (maintenance_work_mem,))
+    if parallel_maintenance_workers is not None:
+        cursor.execute("SET max_parallel_maintenance_workers = %s", (parallel_maintenance_workers,))
+    pg_conn.commit()
+    cursor.close()
+
+class IndexScheduler:
+    """Vergibt Indizes größte Tabelle zuerst, mit höchstens max_per_table gleichzeitigen Builds je Tabelle"""
+    def __init__(self, jobs, max_per_table=MAX_BUILDS_PER_TABLE):
+        self.jobs = sorted(jobs, key=lambda job: job[0]['table_rows'], reverse=True)
+        self.max_per_table = max_per_table
+        self.active = defaultdict(int)
+        self.cond = threading.Condition()
+    def next_job(self):
+        with self.cond:
+            while self.jobs:
+                for i, job in enumerate(self.jobs):
+                    table_name = job[0]['table_name']
+                    if self.active[table_name] < self.max_per_table:
+                        self.active[table_name] += 1
+                        return self.jobs.pop(i)
+                # Alle übrigen Indizes gehören zu Tabellen, auf denen gerade gebaut wird
+                self.cond.wait()
+            return None
+    def done(self, job):
+        with self.cond:
+            self.active[job[0]['table_name']] -= 1
+            self.cond.notify_all()
+
+def record_result(checkpoint, index_info, success, error, normalized_name, i, total):
+    key = f"{index_info['table_name']}.{index_info['index_name']}"
+    if success:
+        checkpoint.mark(key, 'completed', index=normalized_name)
+        if i % 50 == 0: log(f"[{i}/{total}] Created: {normalized_name}")
+    else:
+        log(f"✗ FAILED {key}: {error}", "ERROR")
+        checkpoint.mark_failed(key, error)
 
-def save_checkpoint(checkpoint):
-    with open(CHECKPOINT_FILE, 'w') as f: json.dump(checkpoint, f, indent=2)
+def build_indexes_parallel(jobs, checkpoint, args, metrics):
+    """jobs: Liste aus (index_info, columns); jeder Worker hat eine eigene PostgreSQL-Verbindung"""
+    scheduler = IndexScheduler(jobs, args.max_per_table)
+    lock, counter, total = threading.Lock(), [0], len(jobs)
+    def worker():
+        try:
+            pg_conn = connect_postgres()
+            configure_session(pg_conn, args.maintenance_work_mem, args.parallel_maintenance_workers)
+        except Exception as e:
+            # Die Indizes übernehmen die übrigen Worker; ohne jeden Worker bleiben sie unten als fehlgeschlagen stehen
+            log(f"{threading.current_thread().name}: PostgreSQL session failed: {e}", "ERROR")
+            if 'pg_conn' in locals(): pg_conn.close()
+            return
+        try:
+            while True:
+                job = scheduler.next_job()
+                if job is None: break
+                index_info, columns = job
+                try:
+                    success, error, normalized_name = timed_create_index(pg_conn, index_info, columns, metrics)
+                finally:
+                    scheduler.done(job)
+                with lock:
+                    counter[0] += 1
+                    record_result(checkpoint, index_info, success, error, normalized_name, counter[0], total)
+        finally:
+            pg_conn.close()
+    threads = [threading.Thread(target=worker, name=f"index-worker-{n}") for n in range(1, args.workers + 1)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    for index_info, _ in scheduler.jobs:
+        metrics.record_failure()
+        record_result(checkpoint, index_info, False, "not built: no PostgreSQL connection", None, total, total)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Index-Migration Informix → PostgreSQL")
+    parser.add_argument('--workers', type=int, default=1, help="Gleichzeitige CREATE INDEX über eigene Verbindungen (Default: 1)")
+    parser.add_argument('--max-per-table', type=int, default=MAX_BUILDS_PER_TABLE,
+                        help=f"Gleichzeitige CREATE INDEX auf derselben Tabelle beim Parallel-Build (Default: {MAX_BUILDS_PER_TABLE})")
+    parser.add_argument('--maintenance-work-mem', help="maintenance_work_mem je Sitzung, z.B. '1GB'")
+    parser.add_argument('--parallel-maintenance-workers', type=int, help="max_parallel_maintenance_workers je Sitzung")
+    parser.add_argument('--profile', action='store_true', help=PROFILE_HELP)
+    return parser.parse_args()
+
+def timed_create_index(pg_conn, index_info, columns, metrics):
+    start = time.perf_counter()
+    # Je Tabelle ein Label, damit der Profiler die Zeit der Tabelle zuordnet
+    with metrics.timer('write', index_info['table_name']):
+        success, error, normalized_name = create_index(pg_conn, index_info, columns)
+    if success: metrics.record_batch(1, 0, time.perf_counter() - start)
+    else: metrics.record_failure()
+    return success, error, normalized_name
 
 def main():
+    args = parse_args()
     log("=" * 80)
     log("INDEXES MIGRATION: Informix → PostgreSQL (Secure Mode)")
     log("=" * 80)
     
     start_time = datetime.now()
+    profiler = start_profiler(args.profile, 'indexes')
     try:
         ifx_conn = connect_informix()
         pg_conn = connect_postgres()
         
-        checkpoint = load_checkpoint()
+        checkpoint = Checkpoint(CHECKPOINT_FILE)
+        catalog = CatalogSnapshot.load(ifx_conn, log=log)
         indexes = get_indexes(ifx_conn)
-        completed_keys = set(checkpoint['completed'])
-        pending_indexes = [idx for idx in indexes if f"{idx['table_name']}.{idx['index_name']}" not in completed_keys]
+        pending_indexes = [idx for idx in indexes if not checkpoint.is_completed(f"{idx['table_name']}.{idx['index_name']}")]
         
         log(f"Total: {len(indexes)} | Pending: {len(pending_indexes)}")
+        metrics = METRICS.stage('indexes', phase='constraints')
         
-        for i, index_info in enumerate(pending_indexes, 1):
-            key = f"{index_info['table_name']}.{index_info['index_name']}"
-            columns = get_column_names_with_order(ifx_conn, index_info['table_name'], index_info['columns_info'])
-            success, error, normalized_name = create_index(pg_conn, index_info, columns)
-            
-            if success:
-                checkpoint['completed'].append(key)
-                if i % 50 == 0: log(f"[{i}/{len(pending_indexes)}] Created: {normalized_name}")
-            else:
-                log(f"✗ FAILED {key}: {error}", "ERROR")
-                checkpoint['failed'].append({'table': index_info['table_name'], 'index': index_info['index_name'], 'error': error})
-            
-            if i % 100 == 0: save_checkpoint(checkpoint)
+        if args.workers > 1:
+            log(f"Parallel build: {args.workers} workers")
+            jobs = [(idx, get_column_names_with_order(catalog, idx['table_name'], idx['columns_info'])) for idx in pending_indexes]
+            build_indexes_parallel(jobs, checkpoint, args, metrics)
+        else:
+            configure_session(pg_conn, args.maintenance_work_mem, args.parallel_maintenance_workers)
+            for i, index_info in enumerate(pending_indexes, 1):
+                columns = get_column_names_with_order(catalog, index_info['table_name'], index_info['columns_info'])
+                success, error, normalized_name = timed_create_index(pg_conn, index_info, columns, metrics)
+                record_result(checkpoint, index_info, success, error, normalized_name, i, len(pending_indexes))
         
-        save_checkpoint(checkpoint)
+        checkpoint.export()
+        metrics.finish()
+        log(f"Metrics written: {', '.join(METRICS.export(LOG_DIR, 'index_metrics'))}")
         log(f"Duration: {(datetime.now() - start_time).total_seconds() / 60:.1f} minutes")
         log("=" * 80)
         
@@ -166,6 +260,7 @@ def main():
         if 'ifx_conn' in locals(): ifx_conn.close()
         if 'pg_conn' in locals(): pg_conn.close()
         log("Connections closed")
+        finish_profiler(profiler, LOG_DIR, log)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
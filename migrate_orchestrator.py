@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+ORCHESTRATOR: Daten, Primary Keys, Indizes und Foreign Keys in einem Prozess
+Jede Tabelle, jeder PK, jeder Index und jeder FK ist ein Task mit Abhängigkeiten:
+PK und Indizes einer Tabelle starten, sobald ihre Daten geladen sind, ein FK, sobald
+beide Tabellen geladen sind und die Schlüssel der referenzierten Tabelle stehen.
+Alle Tasks teilen sich eine JVM und je einen Verbindungspool für Informix und
+PostgreSQL; der Fortschritt steht je Task in einem gemeinsamen Checkpoint.
+"""
+
+import os
+import sys
+import time
+import queue
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from db_config import connect_informix, connect_postgres
+from catalog_cache import CatalogSnapshot
+from sampling_profiler import start_profiler, finish_profiler, PROFILE_HELP
+import migrate_full_informix_to_postgres as data_phase
+import migrate_primary_keys as pk_phase
+import migrate_indexes as index_phase
+import migrate_foreign_keys as fk_phase
+
+LOG_DIR = data_phase.LOG_DIR
+LOG_FILE = os.path.join(LOG_DIR, f"orchestrator_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+CHECKPOINT_FILE = os.path.join(LOG_DIR, "orchestrator_checkpoint.json")
+PHASES = ('load', 'pk', 'index', 'fk')
+
+# Bisherige Checkpoints der Einzelskripte → Task-Präfix (Import beim ersten Lauf)
+LEGACY_CHECKPOINTS = {
+    'pk:': pk_phase.CHECKPOINT_FILE,
+    'index:': index_phase.CHECKPOINT_FILE,
+    'fk:': fk_phase.CHECKPOINT_FILE,
+}
+
+os.environ['JAVA_HOME'] = r'C:\baustelle_8.6\jdk-17.0.11.9-hotspot'
+
+class ConnectionPool:
+    """Feste Zahl von Verbindungen, erst bei Bedarf geöffnet; connection() blockiert, bis eine frei ist"""
+    def __init__(self, connect, size, setup=None, reset=None):
+        self.connect, self.setup, self.reset = connect, setup, reset
+        self.slots = threading.Semaphore(size)
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.opened = []
+    @contextmanager
+    def connection(self):
+        with self.slots:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                conn = self.connect()
+                if self.setup: self.setup(conn)
+                with self.lock: self.opened.append(conn)
+            try:
+                yield conn
+            finally:
+                # Abgebrochene Transaktionen nicht an den nächsten Task weiterreichen
+                if self.reset:
+                    try: self.reset(conn)
+                    except Exception: pass
+                self.idle.put(conn)
+    def close_all(self):
+        with self.lock:
+            for conn in self.opened:
+                try: conn.close()
+                except Exception: pass
+            self.opened = []
+
+class Task:
+    def __init__(self, task_id, run, deps=(), locks=(), priority=0):
+        self.task_id, self.run = task_id, run
+        self.deps, self.locks, self.priority = list(deps), set(locks), priority
+        self.status = 'pending'
+
+class TaskGraph:
+    """Vergibt Tasks, deren Abhängigkeiten erledigt sind; Tasks mit gemeinsamem Lock-Schlüssel
+    (Tabellenname) laufen nie gleichzeitig, damit sich DDL auf derselben Tabelle nicht blockiert."""
+    def __init__(self, tasks, checkpoint, logger):
+        self.tasks = {task.task_id: task for task in tasks}
+        self.checkpoint, self.logger = checkpoint, logger
+        self.cond = threading.Condition()
+        self.locked = set()
+        for task in tasks:
+            task.deps = [d for d in task.deps if d in self.tasks]
+            if checkpoint.is_completed(task.task_id): task.status = 'done'
+    def _skip_blocked(self):
+        """Tasks, deren Abhängigkeit fehlgeschlagen ist, werden übersprungen (transitiv)"""
+        changed = True
+        while changed:
+            changed = False
+            for task in self.tasks.values():
+                if task.status != 'pending': continue
+                failed = [d for d in task.deps if self.tasks[d].status in ('failed', 'skipped')]
+                if failed:
+                    task.status, changed = 'skipped', True
+                    self.logger.warning(f"{task.task_id}: skipped, dependency {failed[0]} not done")
+                    self.checkpoint.mark_failed(task.task_id, f"dependency {failed[0]} not done")
+    def next_task(self):
+        with self.cond:
+            while True:
+                self._skip_blocked()
+                pending = [t for t in self.tasks.values() if t.status == 'pending']
+                if not pending: return None
+                ready = [t for t in pending if all(self.tasks[d].status == 'done' for d in t.deps) and not (t.locks & self.locked)]
+                if ready:
+                    task = max(ready, key=lambda t: t.priority)
+                    task.status = 'running'
+                    self.locked |= task.locks
+                    return task
+                if not any(t.status == 'running' for t in self.tasks.values()):
+                    # Nur bei zyklischen Abhängigkeiten möglich
+                    for t in pending:
+                        t.status = 'skipped'
+                        self.checkpoint.mark_failed(t.task_id, "unresolvable dependencies")
+                    self.logger.error(f"{len(pending)} tasks with unresolvable dependencies skipped")
+                    self.cond.notify_all()
+                    return None
+                self.cond.wait()
+    def finish(self, task, ok):
+        with self.cond:
+            task.status = 'done' if ok else 'failed'
+            self.locked -= task.locks
+            self.cond.notify_all()
+    def run(self, workers):
+        def worker():
+            while True:
+                task = self.next_task()
+                if task is None: break
+                ok = False
+                try:
+                    ok = task.run()
+                except Exception as e:
+                    self.logger.error(f"{task.task_id}: {e}")
+                    self.checkpoint.mark_failed(task.task_id, str(e))
+                finally:
+                    self.finish(task, ok)
+        threads = [threading.Thread(target=worker, name=f"task-worker-{n}") for n in range(1, workers + 1)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+    def summary(self):
+        counts = {}
+        for task in self.tasks.values(): counts[task.status] = counts.get(task.status, 0) + 1
+        return counts
+
+def import_legacy_checkpoints(checkpoint, logger):
+    """Erster Lauf: erledigte Tabellen/PKs/Indizes/FKs aus den Checkpoints der Einzelskripte übernehmen"""
+    imported = 0
+    sources = [('', data_phase.CHECKPOINT_FILE)] + list(LEGACY_CHECKPOINTS.items())
+    for prefix, path in sources:
+        legacy = data_phase.Checkpoint(path, checkpoint.store)
+        for key in legacy.keys('completed'):
+            checkpoint.mark(prefix + key, 'completed', **dict(legacy.get(key), imported_from=legacy.scope))
+            imported += 1
+    logger.log(f"Imported {imported} completed tasks from legacy checkpoints")
+
+def build_tasks(args, load_options, ifx_conn, catalog, ifx_pool, pg_pool, logger, checkpoint):
+    metrics = data_phase.METRICS
+    stage = {name: metrics.stage(name, phase='constraints') for name in ('primary_keys', 'indexes', 'foreign_keys')}
+
+    def record(task_id, ok, error, start, stage_metrics):
+        duration = time.perf_counter() - start
+        if ok:
+            stage_metrics.record_batch(1, 0, duration)
+            checkpoint.mark_completed(task_id, 0, duration)
+        else:
+            stage_metrics.record_failure()
+            logger.error(f"{task_id}: {error}")
+            checkpoint.mark_failed(task_id, error)
+        return ok
+
+    @contextmanager
+    def range_connections():
+        # Bereiche großer Tabellen leihen ihre Verbindungen ebenfalls aus den Pools (siehe pool_size)
+        with ifx_pool.connection() as ifx, pg_pool.connection() as pg:
+            yield ifx, pg
+
+    def load_task(table_info):
+        def run():
+            with ifx_pool.connection() as ifx, pg_pool.connection() as pg:
+                return data_phase.migrate_single_table(ifx, pg, table_info, logger, checkpoint, load_options, range_connections)
+        return run
+
+    def pk_task(task_id, pk_info):
+        def run():
+            start = time.perf_counter()
+            columns = pk_phase.get_column_names(catalog, pk_info['table_name'], pk_info['column_numbers'])
+            with pg_pool.connection() as pg, stage['primary_keys'].timer('write', pk_info['table_name']):
+                ok, error = pk_phase.create_primary_key(pg, pk_info, columns)
+            return record(task_id, ok, error, start, stage['primary_keys'])
+        return run
+
+    def index_task(task_id, index_info):
+        def run():
+            start = time.perf_counter()
+            columns = index_phase.get_column_names_with_order(catalog, index_info['table_name'], index_info['columns_info'])
+            with pg_pool.connection() as pg, stage['indexes'].timer('write', index_info['table_name']):
+                ok, error, _ = index_phase.create_index(pg, index_info, columns)
+            return record(task_id, ok, error, start, stage['indexes'])
+        return run
+
+    def fk_task(task_id, fk_info):
+        def run():
+            start = time.perf_counter()
+            child_cols = fk_phase.get_column_names(catalog, fk_info['child_table'], fk_info['child_col_numbers'])
+            parent_cols = fk_phase.get_column_names(catalog, fk_info['parent_table'], fk_info['parent_col_numbers'])
+            with pg_pool.connection() as pg, stage['foreign_keys'].timer('write', fk_info['child_table']):
+                ok, error = fk_phase.create_foreign_key(pg, fk_info, child_cols, parent_cols)
+            return record(task_id, ok, error, start, stage['foreign_keys'])
+        return run
+
+    tasks, key_tasks = [], {}
+    tables = data_phase.get_all_tables(ifx_conn, logger)
+    rows = {t['name']: t['rows'] for t in tables}
+    if 'load' in args.phases:
+        # Größte Tabellen zuerst; ihre Schlüssel und Indizes ziehen dann früh nach
+        tasks += [Task(t['name'], load_task(t), priority=3 * t['rows']) for t in tables]
+    if 'pk' in args.phases:
+        for pk_info in pk_phase.get_primary_keys(ifx_conn):
+            table_name = pk_info['table_name']
+            task_id = f"pk:{table_name}"
+            tasks.append(Task(task_id, pk_task(task_id, pk_info), deps=[table_name], locks=[table_name], priority=2 * rows.get(table_name, 0)))
+            key_tasks.setdefault(table_name, []).append(task_id)
+    if 'index' in args.phases:
+        for index_info in index_phase.get_indexes(ifx_conn):
+            table_name = index_info['table_name']
+            task_id = f"index:{table_name}.{index_info['index_name']}"
+            tasks.append(Task(task_id, index_task(task_id, index_info), deps=[table_name], locks=[table_name], priority=2 * index_info['table_rows']))
+            # Eindeutige Indizes können Ziel eines FK sein
+            if index_info['is_unique']: key_tasks.setdefault(table_name, []).append(task_id)
+    if 'fk' in args.phases:
+        for fk_info in fk_phase.get_foreign_keys(ifx_conn):
+            child, parent = fk_info['child_table'], fk_info['parent_table']
+            task_id = f"fk:{child}.{fk_info['fk_name']}"
+            deps = [child, parent] + key_tasks.get(parent, [])
+            tasks.append(Task(task_id, fk_task(task_id, fk_info), deps=deps, locks=[child, parent], priority=rows.get(child, 0)))
+    return tasks
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Migration Informix → PostgreSQL als Task-Graph (Daten, PKs, Indizes, FKs)",
+                                     epilog="Weitere Optionen (z.B. --fast-load, --copy-format, --incremental, --partitions) gehen an die Datenphase.")
+    parser.add_argument('--workers', type=int, default=4, help="Gleichzeitige Tasks und Größe der Verbindungspools (Default: 4)")
+    parser.add_argument('--phases', default=','.join(PHASES), help=f"Kommagetrennte Auswahl aus {', '.join(PHASES)}")
+    parser.add_argument('--maintenance-work-mem', help="maintenance_work_mem der PostgreSQL-Sitzungen, z.B. '1GB'")
+    parser.add_argument('--parallel-maintenance-workers', type=int, help="max_parallel_maintenance_workers der PostgreSQL-Sitzungen")
+    parser.add_argument('--profile', action='store_true', help=PROFILE_HELP)
+    args, load_argv = parser.parse_known_args(argv)
+    args.phases = [p.strip() for p in args.phases.split(',') if p.strip()]
+    unknown = set(args.phases) - set(PHASES)
+    if unknown: parser.error(f"unknown phases: {', '.join(sorted(unknown))}")
+    load_options = data_phase.parse_args(load_argv)
+    # Ein neu geladener Tabelle fehlen danach PK, Indizes und FKs (DROP ... CASCADE); dafür bleibt migrate_full_informix_to_postgres.py zuständig
+    if load_options.incremental: parser.error("--incremental is not supported by the orchestrator")
+    return args, load_options
+
+def pool_size(args, load_options):
+    """Je Task ein Verbindungspaar; Lade-Tasks großer Tabellen halten ihr Paar, während ihre Bereiche
+    weitere leihen. Mit den zusätzlichen Plätzen kommt immer mindestens ein Bereich voran."""
+    if 'load' in args.phases and load_options.partitions > 1: return args.workers + load_options.partitions
+    return args.workers
+
+def main():
+    args, load_options = parse_args()
+    if not os.path.exists(LOG_DIR): os.makedirs(LOG_DIR)
+    logger = data_phase.MigrationLogger(LOG_FILE)
+    checkpoint = data_phase.Checkpoint(CHECKPOINT_FILE)
+    if not checkpoint.keys(): import_legacy_checkpoints(checkpoint, logger)
+    setup_pg = lambda conn: index_phase.configure_session(conn, args.maintenance_work_mem, args.parallel_maintenance_workers)
+    size = pool_size(args, load_options)
+    ifx_pool = ConnectionPool(connect_informix, size)
+    pg_pool = ConnectionPool(connect_postgres, size, setup=setup_pg, reset=lambda conn: conn.rollback())
+    profiler = start_profiler(args.profile, 'orchestrator')
+    try:
+        with ifx_pool.connection() as ifx_conn:
+            catalog = CatalogSnapshot.load(ifx_conn, log=logger.log)
+            tasks = build_tasks(args, load_options, ifx_conn, catalog, ifx_pool, pg_pool, logger, checkpoint)
+        graph = TaskGraph(tasks, checkpoint, logger)
+        logger.log(f"{len(tasks)} tasks ({', '.join(args.phases)}), {args.workers} workers")
+        graph.run(args.workers)
+        counts = graph.summary()
+        # Einzelne fehlgeschlagene Objekte brechen den Lauf nicht ab (wie bisher in den Einzelskripten)
+        if counts.get('failed') or counts.get('skipped'): logger.error(f"Tasks: {counts}")
+        else: logger.success(f"Tasks: {counts}")
+    except Exception as e:
+        logger.error(f"FATAL: {e}"); sys.exit(1)
+    finally:
+        ifx_pool.close_all(); pg_pool.close_all()
+        checkpoint.export()
+        json_path, prom_path = data_phase.METRICS.export(LOG_DIR, "orchestrator_metrics")
+        logger.log(f"Metrics written: {json_path}, {prom_path}")
+        finish_profiler(profiler, LOG_DIR, logger.log)
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,23 @@ Sicherheits-Update: Nutzt zentrale db_config.py
 """
 
 import os
-import json
 import sys
+import time
+import argparse
 from datetime import datetime
 # --- ZENTRALE CONFIG IMPORTIEREN ---
 from db_config import connect_informix, connect_postgres
+from jdbc_fetch import iter_rows
+from catalog_cache import CatalogSnapshot
+from migration_metrics import MetricsRegistry
+from checkpoint_store import Checkpoint
+from sampling_profiler import start_profiler, finish_profiler, PROFILE_HELP
 
 # Log-Konfiguration bleibt lokal, da sie spezifisch für dieses Skript ist
 LOG_DIR = r"C:\postgres\migration"
 LOG_FILE = os.path.join(LOG_DIR, f"pk_migration_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
 CHECKPOINT_FILE = os.path.join(LOG_DIR, "pk_checkpoint.json")
+METRICS = MetricsRegistry()
 
 # Java Home wird für jaydebeapi benötigt
 os.environ['JAVA_HOME'] = r'C:\baustelle_8.6\jdk-17.0.11.9-hotspot'
@@ -56,10 +63,7 @@ def get_primary_keys(ifx_conn):
     """)
     
     primary_keys = []
-    while True:
-        row = cursor.fetchone()
-        if row is None: break
-        
+    for row in iter_rows(cursor):
         col_numbers = [abs(row[i]) for i in range(3, 19) if row[i] and row[i] != 0]
         
         if col_numbers:
@@ -73,33 +77,21 @@ def get_primary_keys(ifx_conn):
     log(f"Found {len(primary_keys)} Primary Keys")
     return primary_keys
 
-def get_column_names(ifx_conn, table_name, col_numbers):
-    cursor = ifx_conn.cursor()
-    placeholders = ','.join(['?'] * len(col_numbers))
-    query = f"""
-        SELECT colno, colname
-        FROM syscolumns c
-        JOIN systables t ON c.tabid = t.tabid
-        WHERE t.tabname = ?
-          AND c.colno IN ({placeholders})
-        ORDER BY c.colno
-    """
-    params = [table_name] + col_numbers
-    cursor.execute(query, params)
-    col_mapping = {}
-    while True:
-        row = cursor.fetchone()
-        if row is None: break
-        col_mapping[row[0]] = row[1]
-    cursor.close()
-    return [col_mapping.get(num, f"col_{num}") for num in col_numbers]
+def get_column_names(catalog, table_name, col_numbers):
+    """Spaltennamen aus dem Katalog-Snapshot (kein eigener syscolumns-Roundtrip)"""
+    return catalog.column_names(table_name, col_numbers)
 
-def create_primary_key(pg_conn, pk_info, column_names):
+def pg_primary_key_name(table_name):
+    return f"{table_name}_pkey"
+
+def primary_key_sql(pk_info, column_names):
     table_name = pk_info['table_name']
     escaped_cols = [f'"{col}"' if col.lower() in ['user', 'order', 'group', 'select'] else col for col in column_names]
     cols_str = ', '.join(escaped_cols)
-    pg_constraint_name = f"{table_name}_pkey"
-    alter_sql = f"ALTER TABLE {table_name} ADD CONSTRAINT {pg_constraint_name} PRIMARY KEY ({cols_str})"
+    return f"ALTER TABLE {table_name} ADD CONSTRAINT {pg_primary_key_name(table_name)} PRIMARY KEY ({cols_str})"
+
+def create_primary_key(pg_conn, pk_info, column_names):
+    alter_sql = primary_key_sql(pk_info, column_names)
     
     try:
         cursor = pg_conn.cursor()
@@ -111,19 +103,18 @@ def create_primary_key(pg_conn, pk_info, column_names):
         pg_conn.rollback()
         return False, str(e)
 
-def load_checkpoint():
-    if os.path.exists(CHECKPOINT_FILE):
-        with open(CHECKPOINT_FILE, 'r') as f: return json.load(f)
-    return {'completed': [], 'failed': [], 'start_time': datetime.now().isoformat()}
-
-def save_checkpoint(checkpoint):
-    with open(CHECKPOINT_FILE, 'w') as f: json.dump(checkpoint, f, indent=2)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Primary-Key-Migration Informix → PostgreSQL")
+    parser.add_argument('--profile', action='store_true', help=PROFILE_HELP)
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
     log("=" * 80)
     log("PRIMARY KEYS MIGRATION: Informix → PostgreSQL (Secure Mode)")
     log("=" * 80)
     
+    profiler = start_profiler(args.profile, 'primary_keys')
     try:
         # Nutzung der importierten Verbindungsfunktionen
         ifx_conn = connect_informix()
@@ -132,27 +123,34 @@ def main():
         pg_conn = connect_postgres()
         log("✓ PostgreSQL connected")
         
-        checkpoint = load_checkpoint()
+        checkpoint = Checkpoint(CHECKPOINT_FILE)
+        catalog = CatalogSnapshot.load(ifx_conn, log=log)
         primary_keys = get_primary_keys(ifx_conn)
-        pending_pks = [pk for pk in primary_keys if pk['table_name'] not in checkpoint['completed']]
+        pending_pks = [pk for pk in primary_keys if not checkpoint.is_completed(pk['table_name'])]
         
         log(f"Pending: {len(pending_pks)}")
+        metrics = METRICS.stage('primary_keys', phase='constraints')
         
         for i, pk_info in enumerate(pending_pks, 1):
             table_name = pk_info['table_name']
             log(f"[{i}/{len(pending_pks)}] Processing: {table_name}")
-            column_names = get_column_names(ifx_conn, table_name, pk_info['column_numbers'])
-            success, error = create_primary_key(pg_conn, pk_info, column_names)
+            column_names = get_column_names(catalog, table_name, pk_info['column_numbers'])
+            start = time.perf_counter()
+            with metrics.timer('write', table_name):
+                success, error = create_primary_key(pg_conn, pk_info, column_names)
             
+            duration = time.perf_counter() - start
             if success:
-                checkpoint['completed'].append(table_name)
+                metrics.record_batch(1, 0, duration)
+                checkpoint.mark_completed(table_name, 0, duration)
             else:
+                metrics.record_failure()
                 log(f"  ✗ FAILED: {error}", "ERROR")
-                checkpoint['failed'].append({'table': table_name, 'error': error})
-            
-            if i % 10 == 0: save_checkpoint(checkpoint)
+                checkpoint.mark_failed(table_name, error)
         
-        save_checkpoint(checkpoint)
+        checkpoint.export()
+        metrics.finish()
+        log(f"Metrics written: {', '.join(METRICS.export(LOG_DIR, 'pk_metrics'))}")
         log("=" * 80)
         log("PRIMARY KEYS MIGRATION COMPLETED!")
         log("=" * 80)
@@ -161,6 +159,7 @@ def main():
         if 'ifx_conn' in locals(): ifx_conn.close()
         if 'pg_conn' in locals(): pg_conn.close()
         log("Connections closed")
+        finish_profiler(profiler, LOG_DIR, log)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,13 +6,14 @@ Zentralisiertes Sicherheits-Update: Nutzt db_config.py
 
 import os
 import sys
+import time
 from datetime import datetime
 # --- ZENTRALE CONFIG IMPORTIEREN ---
 from db_config import connect_informix, connect_postgres
+from batch_sizing import BatchSizer, estimate_width_from_description
 
 # Konfiguration
 TABLE_NAME = 'uno_awlp'
-BATCH_SIZE = 100
 
 def log(message):
     """Einfaches Logging mit Zeitstempel"""
@@ -44,6 +45,8 @@ def migrate_data(ifx_conn, pg_conn):
     log("Lese Daten aus Informix...")
     ifx_cursor = ifx_conn.cursor()
     ifx_cursor.execute(f"SELECT * FROM {TABLE_NAME}")
+    # Batch-Größe aus der Spaltenbreite (cursor.description) und der gemessenen Latenz
+    sizer = BatchSizer(TABLE_NAME, estimate_width_from_description(ifx_cursor.description), log)
     
     # In PostgreSQL einfügen (Batch-Verfahren)
     # WICHTIG: Spaltennamen explizit angeben
@@ -66,9 +69,11 @@ def migrate_data(ifx_conn, pg_conn):
     
         batch.append(tuple(row))
     
-        if len(batch) >= BATCH_SIZE:
+        if len(batch) >= sizer.size:
+            start = time.perf_counter()
             pg_cursor.executemany(insert_sql, batch)
             pg_conn.commit()
+            sizer.observe(len(batch), 0, time.perf_counter() - start)
             rows_migrated += len(batch)
             # Fortschrittsanzeige in einer Zeile
             sys.stdout.write(f"\rFortschritt: {rows_migrated}/{total_rows} Zeilen ({100*rows_migrated//total_rows}%)")
@@ -85,6 +90,7 @@ def migrate_data(ifx_conn, pg_conn):
     ifx_cursor.close()
     pg_cursor.close()
     
+    log(sizer.summary())
     log(f"✓ {rows_migrated} Zeilen migriert")
     return rows_migrated
 
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+MIGRATIONS-METRIKEN: Zeitmessung je Stufe (JDBC-Fetch, Konvertierung, Schreiben, Commit)
+Sammelt je Tabelle bzw. Constraint-Phase Zeilen, Bytes und Batch-Latenzen und
+schreibt sie als JSON und als Prometheus-Textfile neben die Checkpoints.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from collections import defaultdict
+from datetime import datetime
+
+LATENCY_QUANTILES = (0.5, 0.9, 0.99)
+
+# Thread-ID → (Name, laufende Stufe) der innersten aktiven timer(); liest sampling_profiler
+ACTIVE_STAGES = {}
+
+def percentile(sorted_values, q):
+    """Nearest-Rank-Perzentil einer sortierten Liste"""
+    if not sorted_values: return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+class StageMetrics:
+    """Zähler und Timer für eine Tabelle (phase='data') oder eine Constraint-Phase"""
+    def __init__(self, name, phase):
+        self.name, self.phase = name, phase
+        self.lock = threading.Lock()
+        self.stage_seconds = defaultdict(float)
+        self.rows = self.bytes = self.batches = self.failures = 0
+        self.batch_latencies = []
+        self.started = time.perf_counter()
+        self.finished = None
+
+    @contextmanager
+    def timer(self, stage, label=None):
+        """label: Name für den Profiler statt des Stufen-Namens, z.B. die Tabelle innerhalb einer Constraint-Phase"""
+        ident = threading.get_ident()
+        label = label or self.name
+        previous = ACTIVE_STAGES.get(ident, (label, None))
+        ACTIVE_STAGES[ident] = (label, stage)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            # Der Name bleibt stehen, damit Zeit zwischen zwei Stufen noch der Tabelle zugeordnet wird
+            ACTIVE_STAGES[ident] = previous if previous[1] is not None else (label, None)
+            with self.lock: self.stage_seconds[stage] += elapsed
+
+    def record_batch(self, rows, nbytes, latency):
+        with self.lock:
+            self.rows += rows
+            self.bytes += nbytes
+            self.batches += 1
+            self.batch_latencies.append(latency)
+
+    def record_failure(self):
+        with self.lock: self.failures += 1
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def summary(self):
+        with self.lock:
+            duration = (self.finished or time.perf_counter()) - self.started
+            latencies = sorted(self.batch_latencies)
+            return {
+                'name': self.name, 'phase': self.phase,
+                'rows': self.rows, 'bytes': self.bytes, 'batches': self.batches, 'failures': self.failures,
+                'duration': duration,
+                'rows_per_sec': self.rows / duration if duration else 0,
+                'bytes_per_sec': self.bytes / duration if duration else 0,
+                'row_width_bytes': self.bytes / self.rows if self.rows else 0,
+                'commit_seconds': self.stage_seconds.get('commit', 0.0),
+                'stage_seconds': dict(self.stage_seconds),
+                'batch_latency': {str(q): percentile(latencies, q) for q in LATENCY_QUANTILES},
+            }
+
+class MetricsRegistry:
+    """Alle StageMetrics eines Laufs; threadsicher, da Worker parallel Tabellen anlegen"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = []
+        self.created = datetime.now().isoformat()
+
+    def stage(self, name, phase='data'):
+        metrics = StageMetrics(name, phase)
+        with self.lock: self.entries.append(metrics)
+        return metrics
+
+    def write_json(self, path):
+        with self.lock: summaries = [m.summary() for m in self.entries]
+        with open(path, 'w') as f:
+            json.dump({'created': self.created, 'written': datetime.now().isoformat(), 'entries': summaries}, f, indent=2)
+
+    def write_prometheus(self, path):
+        """Prometheus-Textfile-Format (node_exporter textfile collector)"""
+        with self.lock: summaries = [m.summary() for m in self.entries]
+        metrics = [
+            ('migration_rows_total', 'counter', 'Migrated rows', 'rows'),
+            ('migration_bytes_total', 'counter', 'Bytes sent to PostgreSQL', 'bytes'),
+            ('migration_failures_total', 'counter', 'Failed objects', 'failures'),
+            ('migration_duration_seconds', 'gauge', 'Wall time', 'duration'),
+            ('migration_rows_per_second', 'gauge', 'Throughput in rows/s', 'rows_per_sec'),
+            ('migration_bytes_per_second', 'gauge', 'Throughput in bytes/s', 'bytes_per_sec'),
+            ('migration_row_width_bytes', 'gauge', 'Average row width', 'row_width_bytes'),
+            ('migration_commit_seconds', 'gauge', 'Time spent in COMMIT', 'commit_seconds'),
+        ]
+        lines = []
+        for metric, kind, help_text, key in metrics:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for s in summaries:
+                lines.append(f'{metric}{{phase="{s["phase"]}",name="{s["name"]}"}} {s[key]}')
+        lines += ["# HELP migration_stage_seconds Time per stage", "# TYPE migration_stage_seconds gauge"]
+        for s in summaries:
+            for stage, seconds in sorted(s['stage_seconds'].items()):
+                lines.append(f'migration_stage_seconds{{phase="{s["phase"]}",name="{s["name"]}",stage="{stage}"}} {seconds}')
+        lines += ["# HELP migration_batch_latency_seconds Batch latency quantiles", "# TYPE migration_batch_latency_seconds summary"]
+        for s in summaries:
+            for q, value in s['batch_latency'].items():
+                if value is not None:
+                    lines.append(f'migration_batch_latency_seconds{{phase="{s["phase"]}",name="{s["name"]}",quantile="{q}"}} {value}')
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'w') as f: f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_file, path)
+
+    def export(self, log_dir, prefix):
+        """Schreibt <prefix>_<ts>.json und <prefix>_<ts>.prom; liefert beide Pfade"""
+        ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+        json_path = os.path.join(log_dir, f"{prefix}_{ts}.json")
+        prom_path = os.path.join(log_dir, f"{prefix}_{ts}.prom")
+        if not os.path.exists(log_dir): os.makedirs(log_dir)
+        self.write_json(json_path)
+        self.write_prometheus(prom_path)
+        return json_path, prom_path
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+BINÄRES COPY: Batches direkt im PostgreSQL-Binärformat (COPY ... WITH (FORMAT binary))
+Zahlen, DATE und TIMESTAMP werden ohne Umweg über Text kodiert. Welche Spalten
+unterstützt werden, ergibt sich aus den PostgreSQL-Typen von get_table_schema;
+enthält eine Tabelle einen anderen Typ (z.B. INTERVAL), bleibt es beim Text-COPY.
+"""
+
+import io
+import struct
+from datetime import date, datetime
+from decimal import Decimal
+from value_converters import parse_timestamp
+
+COPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('!ii', 0, 0)
+COPY_TRAILER = struct.pack('!h', -1)
+NULL_FIELD = struct.pack('!i', -1)
+
+PG_EPOCH_DATE = date(2000, 1, 1)
+PG_EPOCH_DATETIME = datetime(2000, 1, 1)
+
+# Feldlänge + Wert in einem pack-Aufruf
+_INT2 = struct.Struct('!ih')
+_INT4 = struct.Struct('!ii')
+_INT8 = struct.Struct('!iq')
+_FLOAT4 = struct.Struct('!if')
+_FLOAT8 = struct.Struct('!id')
+_LENGTH = struct.Struct('!i')
+_ROW_HEADER = struct.Struct('!h')
+_NUMERIC_HEADER = struct.Struct('!hhhh')
+_NUMERIC_NAN = _NUMERIC_HEADER.pack(0, 0, 0xC000 - 0x10000, 0)
+
+def _int2(v): return _INT2.pack(2, int(v))
+def _int4(v): return _INT4.pack(4, int(v))
+def _int8(v): return _INT8.pack(8, int(v))
+def _float4(v): return _FLOAT4.pack(4, float(v))
+def _float8(v): return _FLOAT8.pack(8, float(v))
+def _bool(v): return b'\x00\x00\x00\x01\x01' if v else b'\x00\x00\x00\x01\x00'
+
+def _text(v):
+    data = (v if isinstance(v, str) else str(v)).encode('utf-8')
+    return _LENGTH.pack(len(data)) + data
+
+def _bytea(v):
+    # bytes/bytearray (LOB-Streams) ohne Zwischenkopie
+    data = v if isinstance(v, (bytes, bytearray)) else bytes(v)
+    return _LENGTH.pack(len(data)) + data
+
+def _date(v):
+    if not isinstance(v, date): v = date.fromisoformat(str(v)[:10])
+    elif isinstance(v, datetime): v = v.date()
+    return _INT4.pack(4, (v - PG_EPOCH_DATE).days)
+
+def _timestamp(v):
+    if not isinstance(v, datetime):
+        v = datetime.combine(v, datetime.min.time()) if isinstance(v, date) else parse_timestamp(str(v))
+    delta = v.replace(tzinfo=None) - PG_EPOCH_DATETIME
+    return _INT8.pack(8, (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+
+def encode_numeric(value):
+    """Decimal/str/int/float → NUMERIC-Binärdarstellung (Ziffern zur Basis 10000) ohne Längenpräfix"""
+    d = value if isinstance(value, Decimal) else Decimal(str(value))
+    if d.is_nan(): return _NUMERIC_NAN
+    if d.is_infinite(): raise ValueError(f"NUMERIC infinity not supported: {value}")
+    sign, digits, exp = d.as_tuple()
+    dscale = max(0, -exp)
+    coefficient = int(''.join(map(str, digits))) if digits else 0
+    if exp > 0:
+        coefficient, exp = coefficient * 10 ** exp, 0
+    # Nachkommastellen auf ein Vielfaches von 4 auffüllen, damit die Gruppen am Komma ausgerichtet sind
+    frac_digits = -exp
+    pad = (-frac_digits) % 4
+    coefficient *= 10 ** pad
+    frac_groups = (frac_digits + pad) // 4
+    groups = []
+    while coefficient:
+        coefficient, group = divmod(coefficient, 10000)
+        groups.append(group)
+    groups.reverse()
+    weight = len(groups) - frac_groups - 1
+    while groups and groups[-1] == 0: groups.pop()
+    while groups and groups[0] == 0:
+        groups.pop(0)
+        weight -= 1
+    if not groups: weight, sign = 0, 0
+    return _NUMERIC_HEADER.pack(len(groups), weight, 0x4000 if sign else 0, dscale) + struct.pack(f'!{len(groups)}h', *groups)
+
+def _numeric(v):
+    data = encode_numeric(v)
+    return _LENGTH.pack(len(data)) + data
+
+def column_encoder(pg_type):
+    """Encoder für einen PostgreSQL-Typ aus get_table_schema; None, wenn nicht binär kodierbar"""
+    base = pg_type.split('(')[0].strip().upper()
+    return {
+        'SMALLINT': _int2, 'INTEGER': _int4, 'SERIAL': _int4,
+        'BIGINT': _int8, 'BIGSERIAL': _int8,
+        'REAL': _float4, 'DOUBLE PRECISION': _float8,
+        'NUMERIC': _numeric, 'DATE': _date, 'TIMESTAMP': _timestamp,
+        'CHAR': _text, 'VARCHAR': _text, 'TEXT': _text,
+        'BYTEA': _bytea, 'BOOLEAN': _bool,
+    }.get(base)
+
+class BinaryCopyEncoder:
+    """Kodiert Batches einer Tabelle in das COPY-Binärformat"""
+    def __init__(self, columns):
+        self.encoders = [column_encoder(col['type']) for col in columns]
+        self.unsupported = [col['name'] for col, enc in zip(columns, self.encoders) if enc is None]
+        self.row_header = _ROW_HEADER.pack(len(columns))
+
+    @property
+    def supported(self):
+        return not self.unsupported
+
+    def encode(self, batch):
+        """Liefert einen BytesIO-Puffer (Header, Zeilen, Trailer) für copy_expert"""
+        parts = [COPY_HEADER]
+        append, row_header, encoders = parts.append, self.row_header, self.encoders
+        for row in batch:
+            append(row_header)
+            for enc, value in zip(encoders, row):
+                append(NULL_FIELD if value is None else enc(value))
+        append(COPY_TRAILER)
+        return io.BytesIO(b''.join(parts))
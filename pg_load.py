@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+PG-LADEN: PostgreSQL-Seite der Datenphase ohne Informix-Abhängigkeiten
+Tabellen anlegen, COPY-Textformat, BatchWriter und SET LOGGED. Wird vom Voll-Lader
+und vom Stage-Lader (load_stage_segments.py) genutzt; letzterer braucht damit weder
+das Informix-Passwort noch JDBC/JVM.
+"""
+
+import io
+import time
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from pg_binary_copy import BinaryCopyEncoder
+from migration_metrics import StageMetrics
+
+LOAD_MODE = 'copy'  # 'copy' = COPY FROM STDIN, 'insert' = executemany (Fallback)
+COPY_FORMAT = 'text'  # 'binary' = COPY ... WITH (FORMAT binary) für Tabellen, deren Typen pg_binary_copy kodieren kann
+LOAD_MODE_FALLBACK = {'binary': 'copy', 'copy': 'insert'}
+
+POSTGRES_RESERVED_KEYWORDS = {
+    'user', 'order', 'select', 'from', 'where', 'insert', 'update', 'delete',
+    'group', 'having', 'create', 'drop', 'alter', 'table', 'index', 'view',
+    'union', 'all', 'and', 'or', 'not', 'null', 'default', 'primary', 'foreign',
+    'key', 'check', 'unique', 'references', 'on', 'to', 'as', 'is', 'in',
+    'exists', 'like', 'between', 'distinct', 'case', 'when', 'then', 'else',
+    'end', 'cast', 'extract', 'interval', 'timestamp', 'date', 'time'
+}
+
+# COPY-Textformat: Backslash, Trennzeichen und Zeilenumbrüche müssen escaped werden
+COPY_DELIMITER = '|'
+COPY_NULL = '\\N'
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', COPY_DELIMITER: '\\' + COPY_DELIMITER, '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+def escape_identifier(name):
+    if name.lower() in POSTGRES_RESERVED_KEYWORDS:
+        return f'"{name}"'
+    return name
+
+def format_copy_value(value):
+    """Einzelwert als Feld im COPY-Textformat"""
+    if value is None: return COPY_NULL
+    if isinstance(value, str): return value.translate(COPY_ESCAPES)
+    if isinstance(value, bool): return 't' if value else 'f'
+    if isinstance(value, (int, float, Decimal)): return str(value)
+    if isinstance(value, datetime): return value.isoformat(sep=' ')
+    if isinstance(value, date): return value.isoformat()
+    # BYTEA im Hex-Format; der Backslash selbst muss für COPY verdoppelt werden
+    if isinstance(value, (bytes, bytearray, memoryview)): return '\\\\x' + value.hex()
+    return str(value).translate(COPY_ESCAPES)
+
+def build_copy_buffer(batch):
+    """Baut aus einem Batch einen In-Memory-Puffer für COPY FROM STDIN"""
+    buf = io.StringIO()
+    for row in batch:
+        buf.write(COPY_DELIMITER.join(map(format_copy_value, row)))
+        buf.write('\n')
+    buf.seek(0)
+    return buf
+
+class MigrationLogger:
+    def __init__(self, log_file):
+        self.log_file = log_file
+        self.start_time = datetime.now()
+        self.lock = threading.Lock()
+    def log(self, message, level="INFO"):
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        log_line = f"[{timestamp}] [{level}] {message}"
+        with self.lock:
+            print(log_line)
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(log_line + '\n')
+    def error(self, message): self.log(message, "ERROR")
+    def warning(self, message): self.log(message, "WARN")
+    def success(self, message): self.log(message, "SUCCESS")
+
+def postgres_table_exists(pg_conn, table_name):
+    cursor = pg_conn.cursor()
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (table_name.lower(),))
+    exists = cursor.fetchone()[0]
+    cursor.close()
+    return exists
+
+def table_has_foreign_keys(pg_conn, table_name):
+    """FK von oder auf die Tabelle vorhanden (eine noch referenzierte Tabelle kann nicht UNLOGGED werden)"""
+    cursor = pg_conn.cursor()
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_constraint WHERE contype = 'f' AND to_regclass(%s) IN (conrelid, confrelid))",
+                   (table_name.lower(),))
+    found = cursor.fetchone()[0]
+    cursor.close()
+    return found
+
+def create_table_sql(table_name, columns, unlogged=False):
+    col_defs = [f"{escape_identifier(c['name'])} {c['type']} {'NOT NULL' if c['not_null'] else ''}" for c in columns]
+    return f"CREATE {'UNLOGGED ' if unlogged else ''}TABLE IF NOT EXISTS {escape_identifier(table_name)} (\n  " + ",\n  ".join(col_defs) + "\n)"
+
+def create_table_postgres(pg_conn, table_name, columns, logger, unlogged=False, keep_existing=False):
+    """keep_existing: vom DDL-Planer (ddl_planner.py) angelegte Tabelle nur leeren statt DROP/CREATE.
+    Dessen Phase 'tables' entfernt vorher die FKs; TRUNCATE scheitert an noch verbliebenen Verweisen."""
+    escaped_table_name = escape_identifier(table_name)
+    try:
+        cursor = pg_conn.cursor()
+        if keep_existing and postgres_table_exists(pg_conn, table_name):
+            if unlogged and table_has_foreign_keys(pg_conn, table_name):
+                # z.B. nur in PostgreSQL vorhandene FKs, die der Planer stehen lässt
+                logger.warning(f"{table_name}: foreign keys present, loading without UNLOGGED")
+                unlogged = False
+            cursor.execute(f"TRUNCATE TABLE {escaped_table_name}")
+            cursor.execute(f"ALTER TABLE {escaped_table_name} SET {'UNLOGGED' if unlogged else 'LOGGED'}")
+        else:
+            cursor.execute(f"DROP TABLE IF EXISTS {escaped_table_name} CASCADE")
+            cursor.execute(create_table_sql(table_name, columns, unlogged))
+        pg_conn.commit()
+        cursor.close()
+        return True
+    except Exception as e:
+        logger.error(f"Failed to create table {table_name}: {e}")
+        pg_conn.rollback()
+        return False
+
+def set_table_logged(pg_conn, table_name, expected_rows):
+    """Prüft die Zeilenzahl und schaltet die UNLOGGED-Tabelle auf LOGGED (schreibt sie dabei einmal ins WAL)"""
+    escaped_table_name = escape_identifier(table_name)
+    cursor = pg_conn.cursor()
+    try:
+        cursor.execute(f"SELECT COUNT(*) FROM {escaped_table_name}")
+        pg_rows = cursor.fetchone()[0]
+        if pg_rows != expected_rows:
+            raise Exception(f"Row count mismatch before SET LOGGED: PostgreSQL {pg_rows}, migrated {expected_rows}")
+        cursor.execute(f"ALTER TABLE {escaped_table_name} SET LOGGED")
+        pg_conn.commit()
+    except Exception:
+        pg_conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+class BatchWriter:
+    """Schreibt Batches per COPY FROM STDIN (binär oder Text); schlägt ein Format fehl, läuft die Tabelle
+    im nächsten weiter (binary → copy → insert). commit_every > 1 fasst mehrere Batches zu einer
+    Transaktion zusammen (Fast-Load)."""
+    def __init__(self, pg_conn, table_name, columns, logger, mode=LOAD_MODE, metrics=None, commit_every=1, synchronous_commit=True, copy_format=COPY_FORMAT):
+        escaped_table_name = escape_identifier(table_name)
+        col_list = ', '.join(escape_identifier(col['name']) for col in columns)
+        placeholders = ', '.join(['%s'] * len(columns))
+        self.copy_sql = f"COPY {escaped_table_name} ({col_list}) FROM STDIN WITH (FORMAT text, DELIMITER '{COPY_DELIMITER}')"
+        self.binary_sql = f"COPY {escaped_table_name} ({col_list}) FROM STDIN WITH (FORMAT binary)"
+        self.insert_sql = f"INSERT INTO {escaped_table_name} ({col_list}) VALUES ({placeholders})"
+        self.pg_conn, self.table_name, self.logger, self.mode = pg_conn, table_name, logger, mode
+        if mode == 'copy' and copy_format == 'binary':
+            self.encoder = BinaryCopyEncoder(columns)
+            if self.encoder.supported: self.mode = 'binary'
+            else: logger.log(f"{table_name}: binary COPY not possible for {', '.join(self.encoder.unsupported)}, using text COPY")
+        self.metrics = metrics or StageMetrics(table_name, 'data')
+        self.commit_every, self.uncommitted = commit_every, []
+        self.cursor = pg_conn.cursor()
+        if not synchronous_commit:
+            self.cursor.execute("SET synchronous_commit = off")
+            self.pg_conn.commit()
+    def _send_one(self, batch):
+        """Schickt einen Batch im aktuellen Modus ohne Commit; liefert die Größe des COPY-Puffers"""
+        if self.mode == 'insert':
+            with self.metrics.timer('write'):
+                self.cursor.executemany(self.insert_sql, batch)
+            return 0
+        with self.metrics.timer('convert'):
+            buf = self.encoder.encode(batch) if self.mode == 'binary' else build_copy_buffer(batch)
+            nbytes = buf.seek(0, io.SEEK_END)
+            buf.seek(0)
+        with self.metrics.timer('write'):
+            self.cursor.copy_expert(self.binary_sql if self.mode == 'binary' else self.copy_sql, buf)
+        return nbytes
+    def _send(self, batch):
+        batches = [batch]
+        while True:
+            try:
+                for pending in batches: nbytes = self._send_one(pending)
+                return nbytes
+            except Exception as e:
+                next_mode = LOAD_MODE_FALLBACK.get(self.mode)
+                if next_mode is None: raise
+                self.pg_conn.rollback()
+                self.logger.warning(f"{self.mode.upper()} failed for {self.table_name}, falling back to {next_mode.upper()}: {e}")
+                self.mode = next_mode
+                # Der Rollback hat auch die noch nicht committeten Batches davor verworfen
+                batches = self.uncommitted + [batch]
+    def write(self, batch):
+        """Liefert die Anzahl der mit diesem Aufruf committeten Zeilen (0, solange der Commit aussteht)"""
+        start = time.perf_counter()
+        nbytes = self._send(batch)
+        self.uncommitted.append(batch)
+        committed = self.flush() if len(self.uncommitted) >= self.commit_every else 0
+        self.last_bytes, self.last_latency = nbytes, time.perf_counter() - start
+        self.metrics.record_batch(len(batch), nbytes, self.last_latency)
+        return committed
+    def flush(self):
+        if not self.uncommitted: return 0
+        with self.metrics.timer('commit'):
+            self.pg_conn.commit()
+        rows = sum(len(batch) for batch in self.uncommitted)
+        self.uncommitted = []
+        return rows
+    def close(self): self.cursor.close()
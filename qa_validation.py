@@ -11,6 +11,8 @@ from datetime import datetime
 from collections import defaultdict
 # --- ZENTRALE CONFIG IMPORTIEREN ---
 from db_config import connect_informix, connect_postgres, PG_CONFIG
+from catalog_cache import CatalogSnapshot
+from row_counts import count_all_tables, source_tables, summarize
 
 # Konfiguration Pfade
 LOG_DIR = r"C:\postgres\migration"
@@ -104,26 +106,21 @@ def test_table_count(ifx_conn, pg_conn, report):
                    {'Informix': ifx_count, 'PostgreSQL': pg_count}, 
                    'CRITICAL' if status == 'FAIL' else 'INFO')
 
-def test_row_counts_top_tables(ifx_conn, pg_conn, report):
-    log("Test 2: Row Counts (Top 20 Tables)...")
-    pg_cur = pg_conn.cursor()
-    pg_cur.execute("SELECT relname FROM pg_stat_user_tables WHERE schemaname = 'public' ORDER BY n_live_tup DESC LIMIT 20")
-    tables = [row[0] for row in pg_cur.fetchall()]
-    
-    mismatches = []
-    for table in tables:
-        try:
-            ifx_cur = ifx_conn.cursor(); ifx_cur.execute(f"SELECT COUNT(*) FROM {table}")
-            ifx_count = ifx_cur.fetchone()[0]
-            pg_cur.execute(f"SELECT COUNT(*) FROM {table}")
-            pg_count = pg_cur.fetchone()[0]
-            if ifx_count != pg_count:
-                mismatches.append({'table': table, 'ifx': ifx_count, 'pg': pg_count})
-        except: pass
+def test_row_counts_all_tables(ifx_conn, report):
+    """Exakte Zeilenzahlen aller Tabellen; Einzelergebnisse stehen im JSON-Report unter 'row_counts'"""
+    catalog = CatalogSnapshot.load(ifx_conn)
+    tables = source_tables(catalog)
+    log(f"Test 2: Row Counts (all {len(tables)} tables)...")
+    results = count_all_tables(tables, log=log)
+    mismatches, errors = summarize(results)
+    report.results['row_counts'] = results
     
-    status = 'PASS' if not mismatches else 'FAIL'
-    report.add_test('2. DATA INTEGRITY', 'Row Counts (Top 20)', status, 
-                   {'Checked': len(tables), 'Mismatches': len(mismatches)})
+    status = 'PASS' if not mismatches and not errors else 'FAIL'
+    details = {'Checked': len(results), 'Mismatches': len(mismatches), 'Errors': len(errors)}
+    if mismatches: details['Mismatched'] = ', '.join(f"{r['table']} (IFX {r['ifx']} / PG {r['pg']})" for r in mismatches[:20])
+    if errors: details['Failed'] = ', '.join(f"{r['table']}: {r['error']}" for r in errors[:20])
+    report.add_test('2. DATA INTEGRITY', 'Row Counts (all tables)', status, details,
+                   'CRITICAL' if status == 'FAIL' else 'INFO')
 
 def test_primary_keys(pg_conn, report):
     log("Test 3: Primary Keys...")
@@ -156,7 +153,7 @@ def main():
         log("✓ Both databases connected\n")
         
         test_table_count(ifx_conn, pg_conn, report)
-        test_row_counts_top_tables(ifx_conn, pg_conn, report)
+        test_row_counts_all_tables(ifx_conn, report)
         test_primary_keys(pg_conn, report)
         test_database_size(pg_conn, report)
         # (Weitere Tests hier aufrufen...)
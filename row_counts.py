@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+ZEILENZAHLEN: Exakte COUNT(*) aller Tabellen auf beiden Seiten, parallel
+Statt nur der größten Tabellen laut (ggf. veralteter) pg_stat_user_tables wird jede
+Tabelle des Informix-Katalogs in Informix und PostgreSQL gezählt. Je Datenbank arbeitet
+ein eigener Pool von Verbindungen, beide Seiten gleichzeitig. Große Tabellen werden
+einzeln gezählt (größte zuerst), kleine (systables.nrows) zu UNION-ALL-Abfragen
+gebündelt. Schlägt ein Bündel fehl (z.B. fehlende Tabelle), wird es tabellenweise
+wiederholt. Ergebnisse gelten je Lauf: im Prozess und, mit Jenkins-BUILD_TAG, auch
+für weitere Validierungsskripte desselben Builds (CACHE_FILE).
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+from datetime import datetime
+from db_config import connect_informix, connect_postgres
+
+LOG_DIR = r"C:\postgres\migration"
+CACHE_FILE = os.path.join(LOG_DIR, "row_count_cache.json")
+RUN_ID = os.environ.get('BUILD_TAG')  # Jenkins: eindeutig je Build
+COUNT_WORKERS = 4             # Verbindungen je Datenbank
+SMALL_TABLE_ROWS = 100_000    # Darunter wird gebündelt gezählt
+UNION_BATCH_SIZE = 50         # Tabellen je UNION-ALL-Abfrage
+
+_run_cache = {}
+
+def source_tables(catalog):
+    """[{'name', 'rows'}] aller Tabellen aus dem Katalog-Snapshot (rows = systables.nrows, nur für die Planung)"""
+    return [{'name': t['name'], 'rows': t['rows']} for t in catalog.tables.values() if t['type'] == 'T']
+
+def build_jobs(tables, small_rows=SMALL_TABLE_ROWS, batch_size=UNION_BATCH_SIZE):
+    """Listen von Tabellennamen je Abfrage: große einzeln und zuerst, kleine gebündelt"""
+    ordered = sorted(tables, key=lambda t: t['rows'], reverse=True)
+    large = [[t['name']] for t in ordered if t['rows'] >= small_rows]
+    small = [t['name'] for t in ordered if t['rows'] < small_rows]
+    return large + [small[i:i + batch_size] for i in range(0, len(small), batch_size)]
+
+def ifx_table_ref(table_name): return table_name
+def pg_table_ref(table_name): return f'"{table_name.lower()}"'
+
+def count_sql(table_names, table_ref):
+    # Position statt Tabellenname als Kennung: keine String-Literale unterschiedlicher Länge im UNION
+    return " UNION ALL ".join(f"SELECT {i}, COUNT(*) FROM {table_ref(name)}" for i, name in enumerate(table_names))
+
+def _rollback(conn):
+    try:
+        conn.rollback()
+    except Exception:
+        # jaydebeapi läuft im Autocommit; dort gibt es nichts zurückzurollen
+        pass
+
+def count_side(connect, table_ref, jobs, workers, log=print, side=''):
+    """{Tabelle: (Anzahl, Fehler)} für eine Datenbank; jeder Worker mit eigener Verbindung"""
+    job_queue, results, lock = queue.Queue(), {}, threading.Lock()
+    for job in jobs: job_queue.put(job)
+
+    def run_job(conn, job):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(count_sql(job, table_ref))
+            counts = {job[int(i)]: (int(n), None) for i, n in cursor.fetchall()}
+        except Exception as e:
+            _rollback(conn)
+            if len(job) > 1:
+                for table_name in job: run_job(conn, [table_name])
+                return
+            counts = {job[0]: (None, (str(e).strip().splitlines() or [repr(e)])[0])}
+        finally:
+            cursor.close()
+        with lock: results.update(counts)
+
+    def worker():
+        try:
+            conn = connect()
+        except Exception as e:
+            log(f"{side}: connection failed: {e}")
+            return
+        try:
+            while True:
+                try: job = job_queue.get_nowait()
+                except queue.Empty: break
+                run_job(conn, job)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=worker, name=f"count-{side}-{n}") for n in range(max(1, workers))]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    # Übrig, wenn keine Verbindung zustande kam
+    for job in jobs:
+        for table_name in job: results.setdefault(table_name, (None, "not counted (no connection)"))
+    return results
+
+def _load_cache(cache_file, run_id):
+    if not run_id or not cache_file or not os.path.exists(cache_file): return {}
+    try:
+        with open(cache_file, 'r') as f: cached = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cached.get('counts', {}) if cached.get('run_id') == run_id else {}
+
+def _save_cache(cache_file, run_id, counts):
+    if not run_id or not cache_file: return
+    if not os.path.exists(os.path.dirname(cache_file)): os.makedirs(os.path.dirname(cache_file))
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump({'run_id': run_id, 'written': datetime.now().isoformat(), 'counts': counts}, f)
+    os.replace(tmp_file, cache_file)
+
+def count_all_tables(tables, workers=COUNT_WORKERS, small_rows=SMALL_TABLE_ROWS, batch_size=UNION_BATCH_SIZE,
+                     cache_file=CACHE_FILE, run_id=RUN_ID, log=print):
+    """{Tabelle: {'ifx', 'pg', 'match', 'error'}} für alle tables; bereits gezählte Tabellen des Laufs kommen aus dem Cache.
+    Fehlerfreie Ergebnisse werden zwischengespeichert, fehlerhafte beim nächsten Aufruf neu gezählt."""
+    cached = dict(_load_cache(cache_file, run_id), **_run_cache)
+    pending = [t for t in tables if t['name'] not in cached]
+    if pending:
+        jobs = build_jobs(pending, small_rows, batch_size)
+        log(f"Counting {len(pending)} tables in {len(jobs)} queries, {workers} connections per database"
+            + (f" ({len(tables) - len(pending)} cached)" if len(pending) < len(tables) else ""))
+        start, side_results = time.perf_counter(), {}
+        def run_side(side, connect, table_ref):
+            side_results[side] = count_side(connect, table_ref, jobs, workers, log, side)
+        sides = [threading.Thread(target=run_side, args=args, name=f"count-{args[0]}")
+                 for args in (('ifx', connect_informix, ifx_table_ref), ('pg', connect_postgres, pg_table_ref))]
+        for thread in sides: thread.start()
+        for thread in sides: thread.join()
+        for t in pending:
+            (ifx_rows, ifx_error), (pg_rows, pg_error) = side_results['ifx'][t['name']], side_results['pg'][t['name']]
+            error = '; '.join(f"{side}: {e}" for side, e in (('IFX', ifx_error), ('PG', pg_error)) if e) or None
+            cached[t['name']] = {'ifx': ifx_rows, 'pg': pg_rows, 'match': error is None and ifx_rows == pg_rows, 'error': error}
+        log(f"Counted in {time.perf_counter() - start:.1f}s")
+        ok = {name: r for name, r in cached.items() if r['error'] is None}
+        _run_cache.update(ok)
+        _save_cache(cache_file, run_id, ok)
+    return {t['name']: cached[t['name']] for t in tables}
+
+def summarize(results):
+    """(Abweichungen, Fehler) als Listen von {'table', ...}, sortiert nach Tabelle"""
+    mismatches = [dict(r, table=name) for name, r in sorted(results.items()) if r['error'] is None and not r['match']]
+    errors = [dict(r, table=name) for name, r in sorted(results.items()) if r['error'] is not None]
+    return mismatches, errors
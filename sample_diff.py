@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+STICHPROBEN-VERGLEICH: Zufällige Zeilen je Tabelle Spalte für Spalte Informix ↔ PostgreSQL
+Gleiche Zeilenzahlen sagen nichts über die Werte (CHAR-Auffüllung, DATETIME-Genauigkeit,
+DECIMAL-Skala aus dem Mapping von get_table_schema). Je Tabelle wird eine geschichtete
+Stichprobe von Primärschlüsseln gezogen: bei ganzzahliger führender PK-Spalte je
+Schlüsselbereich (STRATA) zufällige Punkte, jeweils der nächste vorhandene Schlüssel in
+Informix und in PostgreSQL; sonst TABLESAMPLE SYSTEM (zufällige Seiten, nur PostgreSQL). Die Zeilen werden mit
+gebündelten Schlüssel-Abfragen aus beiden Datenbanken geholt und mit typabhängigen
+Regeln verglichen. Die Stichprobengröße folgt der Tabellengröße (Fehlerrate ±SAMPLE_MARGIN
+bei 95 % Konfidenz) und wird gekürzt, wenn das Zeitbudget aller Tabellen knapp wird.
+"""
+
+import os
+import json
+import math
+import time
+import queue
+import random
+import threading
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from db_config import connect_informix, connect_postgres
+from jdbc_fetch import iter_row_blocks, column_converters
+from value_converters import build_converter_plan, parse_timestamp
+from schema_mapping import get_table_schema, INTEGER_KEY_TYPES
+
+LOG_DIR = r"C:\postgres\migration"
+SAMPLE_MARGIN = 0.02          # ±2 % → höchstens 2401 Zeilen je Tabelle
+MIN_SAMPLE = 50               # Untergrenze auch bei knappem Budget
+STRATA = 16                   # Schlüsselbereiche je Tabelle
+KEY_BATCH = 100               # Schlüssel je Abfrage
+SAMPLE_BUDGET = 600           # Sekunden für alle Tabellen zusammen
+SAMPLE_WORKERS = 4
+EXAMPLES_PER_COLUMN = 3
+INITIAL_RATE = 200.0          # Zeilen/s bis zur ersten Messung
+
+CHAR_TYPES = {'CHAR', 'NCHAR'}
+DECIMAL_TYPES = {'DECIMAL', 'MONEY'}
+BINARY_TYPES = {'BYTE', 'BLOB'}
+
+def sample_size(rows, margin=SAMPLE_MARGIN):
+    """Stichprobe für einen Anteil mit ±margin bei 95 % Konfidenz, mit Endlichkeitskorrektur"""
+    if not rows: return 0
+    n0 = 1.96 ** 2 * 0.25 / margin ** 2
+    return min(rows, math.ceil(n0 / (1 + (n0 - 1) / rows)))
+
+def _as_datetime(value):
+    return parse_timestamp(value) if isinstance(value, str) else value
+
+def _as_date(value):
+    if isinstance(value, datetime): return value.date()
+    return date.fromisoformat(value[:10]) if isinstance(value, str) else value
+
+def values_equal(ifx_type, ifx_value, pg_value):
+    """Gleichheit nach Informix-Typ: CHAR ohne Auffüllung, DECIMAL numerisch, FLOAT mit Toleranz"""
+    if ifx_value is None or pg_value is None: return ifx_value is None and pg_value is None
+    if ifx_type in CHAR_TYPES: return str(ifx_value).rstrip(' ') == str(pg_value).rstrip(' ')
+    if ifx_type in DECIMAL_TYPES:
+        try: return Decimal(str(ifx_value)) == Decimal(str(pg_value))
+        except InvalidOperation: return str(ifx_value) == str(pg_value)
+    if ifx_type == 'FLOAT': return math.isclose(float(ifx_value), float(pg_value), rel_tol=1e-12)
+    if ifx_type == 'SMALLFLOAT': return math.isclose(float(ifx_value), float(pg_value), rel_tol=1e-6)
+    if ifx_type in INTEGER_KEY_TYPES: return int(ifx_value) == int(pg_value)
+    if ifx_type == 'DATE': return _as_date(ifx_value) == _as_date(pg_value)
+    if ifx_type == 'DATETIME': return _as_datetime(ifx_value) == _as_datetime(pg_value)
+    if ifx_type in BINARY_TYPES: return bytes(ifx_value) == bytes(pg_value)
+    if ifx_type == 'BOOLEAN': return bool(ifx_value) == bool(pg_value)
+    return ifx_value == pg_value or str(ifx_value) == str(pg_value)
+
+def normalize_key(values):
+    """Schlüssel beider Seiten vergleichbar machen (CHAR-Auffüllung, Decimal/float → int)"""
+    return tuple(v.rstrip(' ') if isinstance(v, str) else int(v) if isinstance(v, (int, float, Decimal)) and v == int(v) else v
+                 for v in values)
+
+class SampleBudget:
+    """Gemeinsames Zeitbudget; gemessene Zeilen/s bestimmen, wie groß die nächste Stichprobe sein darf"""
+    def __init__(self, seconds, workers):
+        self.deadline = time.perf_counter() + seconds
+        self.workers, self.rate, self.lock = workers, INITIAL_RATE, threading.Lock()
+    def allowance(self, tables_left):
+        """Zeilen, die der nächsten Tabelle zustehen; 0 = Budget aufgebraucht"""
+        remaining = self.deadline - time.perf_counter()
+        if remaining <= 0: return 0
+        with self.lock: return max(MIN_SAMPLE, int(remaining * self.workers / max(1, tables_left) * self.rate))
+    def observe(self, rows, seconds):
+        if rows and seconds > 0:
+            with self.lock: self.rate = 0.7 * self.rate + 0.3 * rows / seconds
+
+class TableSample:
+    def __init__(self, ifx_conn, pg_conn, catalog, table_name, rnd):
+        self.ifx_conn, self.pg_conn, self.table_name, self.rnd = ifx_conn, pg_conn, table_name, rnd
+        self.pg_table = f'"{table_name.lower()}"'
+        self.columns = get_table_schema(ifx_conn, table_name, None)
+        names = [c['name'] for c in self.columns]
+        self.key = [k for k in catalog.primary_key_columns(table_name) if k in names]
+        self.key_index = [names.index(k) for k in self.key]
+        self.pg_columns = ', '.join(f'"{n}"' for n in names)
+        self.pg_key = ', '.join(f'"{k}"' for k in self.key)
+
+    def _ifx_query(self, sql):
+        cursor = self.ifx_conn.cursor()
+        try:
+            cursor.execute(sql)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _pg_query(self, sql, params=None):
+        cursor = self.pg_conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _lead_indexed(self):
+        """Nur mit Index auf der führenden Spalte sind die Punktabfragen billig"""
+        return bool(self._pg_query("""
+            SELECT 1 FROM pg_index i JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = to_regclass(%s) AND a.attname = %s""", (self.table_name.lower(), self.key[0])))
+
+    def _ifx_first_keys(self, points):
+        """Je Punkt der nächste vorhandene Schlüssel in Informix, KEY_BATCH Punkte je Abfrage:
+        UNION ALL von MIN-Abfragen über die führende PK-Spalte (Index-Zugriff), bei mehrspaltigen
+        Schlüsseln danach die kleinste vollständige Schlüsselkombination je führendem Wert"""
+        k, leads = self.key[0], []
+        for i in range(0, len(points), KEY_BATCH):
+            sql = ' UNION ALL '.join(f"SELECT MIN({k}) FROM {self.table_name} WHERE {k} >= {int(point)}" for point in points[i:i + KEY_BATCH])
+            leads.extend(row[0] for row in self._ifx_query(sql) if row[0] is not None)
+        if len(self.key) == 1: return [(lead,) for lead in leads]
+        first = {}
+        distinct = sorted(set(leads))
+        for i in range(0, len(distinct), KEY_BATCH):
+            values = ', '.join(str(int(lead)) for lead in distinct[i:i + KEY_BATCH])
+            for key in self._ifx_query(f"SELECT {', '.join(self.key)} FROM {self.table_name} WHERE {k} IN ({values})"):
+                lead = int(key[0])
+                if lead not in first or normalize_key(key) < normalize_key(first[lead]): first[lead] = key
+        return list(first.values())
+
+    def sample_keys(self, n, rows):
+        """Geschichtet: dieselben Zufallspunkte in beiden Datenbanken, damit auch Zeilen auffallen,
+        die nur auf einer Seite fehlen. TABLESAMPLE zieht nur aus PostgreSQL (findet fehlende
+        Zeilen in Informix und Wertabweichungen, aber keine in PostgreSQL fehlenden Zeilen)."""
+        lead_type = self.columns[self.key_index[0]]['ifx_type']
+        if lead_type in INTEGER_KEY_TYPES and self._lead_indexed():
+            k = self.key[0]
+            bounds = [self._ifx_query(f"SELECT MIN({k}), MAX({k}) FROM {self.table_name}")[0],
+                      self._pg_query(f'SELECT MIN("{k}"), MAX("{k}") FROM {self.pg_table}')[0]]
+            lows, highs = [int(b[0]) for b in bounds if b[0] is not None], [int(b[1]) for b in bounds if b[1] is not None]
+            if not lows: return []
+            low, high = min(lows), max(highs)
+            strata = max(1, min(STRATA, n))
+            width = (high - low + 1) / strata
+            points = [int(low + width * (s + self.rnd.random())) for s in range(strata) for _ in range(math.ceil(n / strata))]
+            keys = self._pg_query(f'SELECT s.* FROM unnest(%s::bigint[]) AS r(v), LATERAL (SELECT {self.pg_key} FROM {self.pg_table} '
+                                  f'WHERE "{k}" >= r.v ORDER BY {self.pg_key} LIMIT 1) s', (points,))
+            keys += self._ifx_first_keys(points)
+        else:
+            # Zufällige Seiten; dreifache Quote, da Seiten unterschiedlich voll sind
+            percent = min(100.0, 300.0 * n / max(1, rows))
+            keys = self._pg_query(f"SELECT {self.pg_key} FROM {self.pg_table} TABLESAMPLE SYSTEM (%s) REPEATABLE (%s) LIMIT %s",
+                                  (percent, self.rnd.randint(0, 2**31 - 1), n))
+        return list(dict.fromkeys(normalize_key(k) for k in keys))
+
+    def fetch_informix(self, keys):
+        condition = ' OR '.join('(' + ' AND '.join(f"{k} = ?" for k in self.key) + ')' for _ in keys)
+        cursor = self.ifx_conn.cursor()
+        try:
+            cursor.execute(f"SELECT * FROM {self.table_name} WHERE {condition}", [v for key in keys for v in key])
+            converters = build_converter_plan(self.columns, column_converters(cursor)) if getattr(cursor, '_rs', None) is not None else None
+            return [row for block in iter_row_blocks(cursor, converters=converters) for row in block]
+        finally:
+            cursor.close()
+
+    def fetch_postgres(self, keys):
+        condition = ' OR '.join('(' + ' AND '.join(f'"{k}" = %s' for k in self.key) + ')' for _ in keys)
+        return self._pg_query(f"SELECT {self.pg_columns} FROM {self.pg_table} WHERE {condition}", [v for key in keys for v in key])
+
+    def run(self, n, rows):
+        result = {'table': self.table_name, 'key': self.key, 'requested': n, 'sampled': 0, 'compared': 0,
+                  'missing_in_informix': 0, 'missing_in_postgres': 0, 'mismatched_rows': 0, 'columns': {}}
+        if not self.key:
+            result['skipped'] = 'no primary key'
+            return result
+        keys = self.sample_keys(n, rows)
+        result['sampled'] = len(keys)
+        column_stats = {c['name']: {'mismatches': 0, 'examples': []} for c in self.columns}
+        for i in range(0, len(keys), KEY_BATCH):
+            batch = keys[i:i + KEY_BATCH]
+            ifx_rows = {normalize_key(row[j] for j in self.key_index): row for row in self.fetch_informix(batch)}
+            pg_rows = {normalize_key(row[j] for j in self.key_index): row for row in self.fetch_postgres(batch)}
+            for key in map(normalize_key, batch):
+                ifx_row, pg_row = ifx_rows.get(key), pg_rows.get(key)
+                if ifx_row is None or pg_row is None:
+                    result['missing_in_informix' if ifx_row is None else 'missing_in_postgres'] += 1
+                    continue
+                result['compared'] += 1
+                row_differs = False
+                for col, ifx_value, pg_value in zip(self.columns, ifx_row, pg_row):
+                    if values_equal(col['ifx_type'], ifx_value, pg_value): continue
+                    row_differs = True
+                    stats = column_stats[col['name']]
+                    stats['mismatches'] += 1
+                    if len(stats['examples']) < EXAMPLES_PER_COLUMN:
+                        stats['examples'].append({'key': list(map(str, key)), 'informix': repr(ifx_value)[:200], 'postgres': repr(pg_value)[:200]})
+                result['mismatched_rows'] += row_differs
+        compared = result['compared']
+        result['mismatch_rate'] = result['mismatched_rows'] / compared if compared else None
+        result['columns'] = {name: dict(stats, type=col['type'], ifx_type=col['ifx_type'], rate=stats['mismatches'] / compared)
+                             for col in self.columns for name, stats in [(col['name'], column_stats[col['name']])] if stats['mismatches']}
+        return result
+
+def sample_tables(catalog, tables, workers=SAMPLE_WORKERS, budget_seconds=SAMPLE_BUDGET, margin=SAMPLE_MARGIN, seed=None, log=print):
+    """tables: [{'name', 'rows'}]; größte zuerst, je Worker ein Verbindungspaar. Liefert {Tabelle: Ergebnis}"""
+    table_queue, results, lock = queue.Queue(), {}, threading.Lock()
+    for t in sorted(tables, key=lambda t: t['rows'], reverse=True): table_queue.put(t)
+    budget, left = SampleBudget(budget_seconds, workers), [len(tables)]
+    seeds = random.Random(seed)
+
+    def worker():
+        ifx_conn, pg_conn = connect_informix(), connect_postgres()
+        try:
+            while True:
+                try: t = table_queue.get_nowait()
+                except queue.Empty: break
+                with lock:
+                    allowance, left[0] = budget.allowance(left[0]), left[0] - 1
+                    rnd = random.Random(seeds.random())
+                if not allowance:
+                    result = {'table': t['name'], 'skipped': 'time budget exhausted'}
+                else:
+                    start = time.perf_counter()
+                    try:
+                        result = TableSample(ifx_conn, pg_conn, catalog, t['name'], rnd).run(min(sample_size(t['rows'], margin), allowance), t['rows'])
+                    except Exception as e:
+                        pg_conn.rollback()
+                        result = {'table': t['name'], 'error': str(e)}
+                    budget.observe(result.get('compared', 0), time.perf_counter() - start)
+                with lock:
+                    results[t['name']] = result
+                    if result.get('error'):
+                        log(f"✗ {t['name']:30} | ERROR: {result['error']}")
+                    elif result.get('mismatched_rows') or result.get('missing_in_informix') or result.get('missing_in_postgres'):
+                        columns = ', '.join(f"{name} {stats['rate']:.1%}" for name, stats in result['columns'].items())
+                        log(f"✗ {t['name']:30} | {result['mismatched_rows']}/{result['compared']} Zeilen abweichend"
+                            + (f" ({columns})" if columns else "")
+                            + (f" | fehlen in Informix: {result['missing_in_informix']}" if result['missing_in_informix'] else "")
+                            + (f" | fehlen in PG: {result['missing_in_postgres']}" if result['missing_in_postgres'] else ""))
+        finally:
+            ifx_conn.close(); pg_conn.close()
+
+    threads = [threading.Thread(target=worker, name=f"sample-{n}") for n in range(max(1, min(workers, len(tables))))]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    return results
+
+def write_report(results, log_dir=LOG_DIR):
+    if not os.path.exists(log_dir): os.makedirs(log_dir)
+    path = os.path.join(log_dir, f"sample_diff_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w') as f: json.dump({'created': datetime.now().isoformat(), 'tables': results}, f, indent=2, default=str)
+    return path
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+SAMPLING-PROFILER: Wo bleibt die Zeit – JDBC, Python, PostgreSQL oder Logging?
+Ein Hintergrund-Thread nimmt alle SAMPLE_INTERVAL Sekunden die Stacks aller Threads
+(sys._current_frames) und ordnet jede Stichprobe einer Kategorie und einer Tabelle zu.
+Die Kategorie kommt bevorzugt aus der gerade laufenden Stufe von StageMetrics.timer()
+(fetch/execute → jdbc, convert/transpose → convert, write/commit → postgres); außerhalb
+der Timer entscheidet die innerste Python-Frame. JPype- und psycopg2-Aufrufe haben als
+C-Code keine eigene Frame, ihre Zeit fällt auf die aufrufende Funktion (FUNCTION_CATEGORIES).
+Ausgabe: je Tabelle eine Folded-Stack-Datei (flamegraph.pl, speedscope) und eine Übersicht.
+"""
+
+import os
+import re
+import sys
+import time
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from migration_metrics import ACTIVE_STAGES
+
+SAMPLE_INTERVAL = 0.01  # 10 ms; ein Durchlauf über alle Threads kostet einige µs
+MAX_STACK_DEPTH = 64
+CATEGORIES = ('jdbc', 'convert', 'postgres', 'logging', 'python', 'wait')
+PROFILE_HELP = "Sampling-Profiler: Zeit je Tabelle nach JDBC/Konvertierung/PostgreSQL/Logging, Folded Stacks ins Log-Verzeichnis"
+
+STAGE_CATEGORIES = {
+    'execute': 'jdbc', 'fetch': 'jdbc', 'transpose': 'convert', 'convert': 'convert',
+    'write': 'postgres', 'commit': 'postgres', 'set_logged': 'postgres', 'wait': 'wait',
+}
+MODULE_CATEGORIES = {
+    'jaydebeapi': 'jdbc', 'jpype': 'jdbc', '_jpype': 'jdbc', 'jdbc_fetch': 'jdbc', 'value_converters': 'jdbc',
+    'lob_stream': 'jdbc', 'catalog_cache': 'jdbc', 'schema_mapping': 'jdbc', 'informix_standin': 'jdbc',
+    'psycopg2': 'postgres', 'pg_load': 'postgres', 'pg_binary_copy': 'convert', 'logging': 'logging',
+    'threading': 'wait', 'queue': 'wait',
+}
+# Funktionen, deren eigene Zeit überwiegend in einem JDBC- bzw. psycopg2-Aufruf steckt
+FUNCTION_CATEGORIES = {
+    'get_all_tables': 'jdbc', 'get_table_schema': 'jdbc', 'compute_fingerprint': 'jdbc', 'get_partition_key': 'jdbc',
+    'compute_key_ranges': 'jdbc', 'count_source_rows': 'jdbc', 'connect_informix': 'jdbc', 'read_batches': 'jdbc',
+    'get_primary_keys': 'jdbc', 'get_indexes': 'jdbc', 'get_foreign_keys': 'jdbc',
+    'build_copy_buffer': 'convert', 'format_copy_value': 'convert',
+    'connect_postgres': 'postgres', 'create_table_postgres': 'postgres', 'postgres_table_exists': 'postgres',
+    'set_table_logged': 'postgres', 'prepare_resume': 'postgres', 'BatchWriter.__init__': 'postgres',
+    'BatchWriter._send_one': 'postgres', 'BatchWriter.flush': 'postgres', 'load_staged_table': 'postgres',
+    'create_primary_key': 'postgres', 'create_index': 'postgres', 'configure_session': 'postgres',
+    'create_foreign_key': 'postgres', 'validate_foreign_key': 'postgres',
+}
+
+def _is_logging(qualname):
+    return qualname == 'log' or qualname.startswith('MigrationLogger.')
+
+class SamplingProfiler:
+    def __init__(self, name, interval=SAMPLE_INTERVAL):
+        self.name, self.interval = name, interval
+        self.stacks = defaultdict(Counter)       # Tabelle → {folded stack: Stichproben}
+        self.seconds = defaultdict(float)        # (Tabelle, Kategorie) → Thread-Sekunden
+        self.samples = 0
+        self.frame_names = {}                    # code → (Modul, qualname)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self.started = self.last = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+        self.duration = time.perf_counter() - self.started
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def _frame_name(self, frame):
+        code = frame.f_code
+        name = self.frame_names.get(code)
+        if name is None:
+            module = frame.f_globals.get('__name__', '?')
+            if module == '__main__': module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            name = self.frame_names[code] = (module.split('.')[0], getattr(code, 'co_qualname', code.co_name))
+        return name
+
+    def classify(self, names, stage):
+        """names: (Modul, qualname) von innen nach außen"""
+        if any(_is_logging(qualname) or module == 'logging' for module, qualname in names): return 'logging'
+        if stage in STAGE_CATEGORIES: return STAGE_CATEGORIES[stage]
+        module, qualname = names[0]
+        return FUNCTION_CATEGORIES.get(qualname) or MODULE_CATEGORIES.get(module, 'python')
+
+    def sample(self):
+        now = time.perf_counter()
+        # Jede Stichprobe zählt mit der tatsächlich vergangenen Zeit (der Thread kann sich verspäten)
+        elapsed, self.last = now - self.last, now
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own: continue
+            names = []
+            while frame is not None and len(names) < MAX_STACK_DEPTH:
+                names.append(self._frame_name(frame))
+                frame = frame.f_back
+            label, stage = ACTIVE_STAGES.get(ident, (None, None))
+            label = label or self.name
+            category = self.classify(names, stage)
+            folded = ';'.join([category] + [f"{module}:{qualname}" for module, qualname in reversed(names)])
+            self.stacks[label][folded] += 1
+            self.seconds[(label, category)] += elapsed
+        self.samples += 1
+
+    def summary(self):
+        """Zeilen: (Tabelle, {Kategorie: Sekunden}, Summe ohne 'wait'), größte zuerst, plus Gesamtzeile"""
+        by_label = defaultdict(lambda: dict.fromkeys(CATEGORIES, 0.0))
+        for (label, category), seconds in self.seconds.items(): by_label[label][category] += seconds
+        total = dict.fromkeys(CATEGORIES, 0.0)
+        for categories in by_label.values():
+            for category, seconds in categories.items(): total[category] += seconds
+        busy = lambda categories: sum(v for k, v in categories.items() if k != 'wait')
+        rows = sorted(((label, categories, busy(categories)) for label, categories in by_label.items()), key=lambda r: r[2], reverse=True)
+        return rows + [('TOTAL', total, busy(total))]
+
+    def format_summary(self):
+        header = f"{'table':30} " + ' '.join(f"{c:>9}" for c in CATEGORIES) + f" {'busy_s':>9}"
+        lines = [f"Profile {self.name}: {self.samples} samples every {self.interval * 1000:.0f} ms over {self.duration:.1f}s wall (thread-seconds)", header]
+        for label, categories, busy in self.summary():
+            lines.append(f"{label[:30]:30} " + ' '.join(f"{categories[c]:>9.1f}" for c in CATEGORIES) + f" {busy:>9.1f}")
+        return lines
+
+    def write(self, log_dir):
+        """profile_<name>_<ts>/<tabelle>.folded je Tabelle plus summary.txt; liefert Verzeichnis und Übersicht"""
+        ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+        profile_dir = os.path.join(log_dir, f"profile_{self.name}_{ts}")
+        if not os.path.exists(profile_dir): os.makedirs(profile_dir)
+        for label, stacks in self.stacks.items():
+            with open(os.path.join(profile_dir, re.sub(r'[^\w.-]', '_', label) + '.folded'), 'w', encoding='utf-8') as f:
+                for stack, count in stacks.most_common(): f.write(f"{stack} {count}\n")
+        lines = self.format_summary()
+        with open(os.path.join(profile_dir, "summary.txt"), 'w', encoding='utf-8') as f: f.write('\n'.join(lines) + '\n')
+        return profile_dir, lines
+
+def start_profiler(enabled, name, interval=SAMPLE_INTERVAL):
+    """--profile: gestarteter Profiler, sonst None"""
+    return SamplingProfiler(name, interval).start() if enabled else None
+
+def finish_profiler(profiler, log_dir, log=print):
+    if profiler is None: return
+    profiler.stop()
+    profile_dir, lines = profiler.write(log_dir)
+    for line in lines: log(line)
+    log(f"Profile written: {profile_dir}")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+SCHEMA-MAPPING: Informix-Spaltentypen → PostgreSQL ohne Verbindungs-Seiteneffekte
+Von der Datenphase, dem DDL-Planer, dem Stichproben-Vergleich und den Benchmarks
+gemeinsam genutzt; importiert weder jaydebeapi noch psycopg2.
+"""
+
+from jdbc_fetch import iter_rows
+
+# Datentyp-Mapping: Informix → PostgreSQL
+TYPE_MAPPING = {
+    0: 'CHAR', 1: 'SMALLINT', 2: 'INTEGER', 3: 'FLOAT', 4: 'SMALLFLOAT', 
+    5: 'DECIMAL', 6: 'SERIAL', 7: 'DATE', 8: 'MONEY', 9: 'NULL', 
+    10: 'DATETIME', 11: 'BYTE', 12: 'TEXT', 13: 'VARCHAR', 14: 'INTERVAL', 
+    15: 'NCHAR', 16: 'NVARCHAR', 17: 'INT8', 18: 'SERIAL8', 19: 'SET', 
+    20: 'MULTISET', 21: 'LIST', 22: 'ROW', 23: 'COLLECTION', 40: 'LVARCHAR', 
+    41: 'BLOB', 43: 'BOOLEAN', 52: 'BIGINT', 53: 'BIGSERIAL',
+}
+
+POSTGRES_TYPE_MAPPING = {
+    'CHAR': 'CHAR', 'SMALLINT': 'SMALLINT', 'INTEGER': 'INTEGER', 
+    'FLOAT': 'DOUBLE PRECISION', 'SMALLFLOAT': 'REAL', 'DECIMAL': 'NUMERIC', 
+    'SERIAL': 'SERIAL', 'DATE': 'DATE', 'MONEY': 'NUMERIC(12,2)', 
+    'DATETIME': 'TIMESTAMP', 'BYTE': 'BYTEA', 'TEXT': 'TEXT', 
+    'VARCHAR': 'VARCHAR', 'LVARCHAR': 'TEXT', 'INTERVAL': 'INTERVAL', 
+    'NCHAR': 'CHAR', 'NVARCHAR': 'VARCHAR', 'INT8': 'BIGINT', 
+    'SERIAL8': 'BIGSERIAL', 'BLOB': 'BYTEA', 'BOOLEAN': 'BOOLEAN', 
+    'BIGINT': 'BIGINT', 'BIGSERIAL': 'BIGSERIAL',
+}
+
+# Ganzzahlige Typen: Bereichsaufteilung und Stichproben über die führende PK-Spalte
+INTEGER_KEY_TYPES = {'SMALLINT', 'INTEGER', 'SERIAL', 'INT8', 'SERIAL8', 'BIGINT', 'BIGSERIAL'}
+
+def ifx_epoch_seconds(name):
+    """Informix-Ausdruck: Sekunden seit 1970-01-01 für eine DATETIME-Spalte (Sekundenbruchteile abgeschnitten),
+    entspricht FLOOR(EXTRACT(EPOCH FROM spalte)) in PostgreSQL"""
+    seconds_of_day = (f"CAST(CAST(CAST(EXTEND({name}, HOUR TO SECOND) - DATETIME(00:00:00) HOUR TO SECOND "
+                      f"AS INTERVAL SECOND(5) TO SECOND) AS CHAR(6)) AS INTEGER)")
+    return f"(CAST(DATE({name}) - MDY(1,1,1970) AS INT8) * 86400 + {seconds_of_day})"
+
+def schema_column(col_name, coltype, col_length):
+    """Spaltendefinition aus syscolumns (coltype mit NOT-NULL-Bit 256)"""
+    ifx_type = TYPE_MAPPING.get(coltype % 256, 'VARCHAR')
+    pg_type = POSTGRES_TYPE_MAPPING.get(ifx_type, 'TEXT')
+    if ifx_type in ['CHAR', 'NCHAR'] and col_length: pg_type = f"CHAR({col_length})"
+    elif ifx_type in ['VARCHAR', 'NVARCHAR'] and col_length: pg_type = f"VARCHAR({col_length})"
+    elif ifx_type == 'DECIMAL' and col_length:
+        precision, scale = (col_length >> 8) & 0xFF, col_length & 0xFF
+        pg_type = f"NUMERIC({precision},{scale})" if 0 < precision <= 1000 else "NUMERIC(12,2)"
+    return {'name': col_name, 'type': pg_type, 'not_null': coltype >= 256, 'ifx_type': ifx_type, 'length': col_length}
+
+def get_table_schema(ifx_conn, table_name, logger):
+    cursor = ifx_conn.cursor()
+    cursor.execute(f"SELECT c.colname, c.coltype, c.collength FROM syscolumns c JOIN systables t ON c.tabid = t.tabid WHERE t.tabname = '{table_name}' ORDER BY c.colno")
+    columns = [schema_column(*row) for row in iter_rows(cursor)]
+    cursor.close()
+    return columns
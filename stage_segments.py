@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+STAGING: Tabellen einmal aus Informix in komprimierte Segmentdateien extrahieren
+Je Tabelle ein Verzeichnis <stage_dir>/<tabelle>/ mit gzip-Segmenten im COPY-Textformat
+(00001.copy.gz, ...) und einer manifest.json (Spalten, Segmente mit Zeilen/Bytes/SHA1,
+complete-Flag). load_stage_segments.py lädt die Segmente beliebig oft nach PostgreSQL,
+ohne Informix erneut zu lesen.
+"""
+
+import os
+import gzip
+import json
+import mmap
+import time
+import shutil
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime
+from migration_metrics import StageMetrics
+
+MANIFEST_FILE = "manifest.json"
+SEGMENT_BYTES = 256 * 1024 * 1024  # Unkomprimierte Bytes pro Segment
+STAGE_COMPRESSLEVEL = 1            # gzip: schnell statt maximal klein, die Extraktion soll Informix kurz belasten
+
+def table_stage_dir(stage_dir, table_name):
+    return os.path.join(stage_dir, table_name)
+
+def load_manifest(stage_dir, table_name):
+    path = os.path.join(table_stage_dir(stage_dir, table_name), MANIFEST_FILE)
+    if not os.path.exists(path): return None
+    with open(path, 'r', encoding='utf-8') as f: return json.load(f)
+
+def save_manifest(stage_dir, manifest):
+    path = os.path.join(table_stage_dir(stage_dir, manifest['table']), MANIFEST_FILE)
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f: json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, path)
+
+def is_staged(stage_dir, table_name):
+    manifest = load_manifest(stage_dir, table_name)
+    return bool(manifest and manifest.get('complete'))
+
+def list_staged_tables(stage_dir):
+    """Vollständig extrahierte Tabellen (Manifeste mit complete=True)"""
+    manifests = []
+    for name in sorted(os.listdir(stage_dir)):
+        manifest = load_manifest(stage_dir, name) if os.path.isdir(os.path.join(stage_dir, name)) else None
+        if manifest and manifest.get('complete'): manifests.append(manifest)
+    return manifests
+
+def manifest_identity(manifest):
+    """Kennung einer Extraktion: ändert sich bei jeder neuen Extraktion der Tabelle"""
+    parts = [manifest['created']] + [segment['sha1'] for segment in manifest['segments']]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+def file_sha1(path):
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return hashlib.sha1(mm).hexdigest()
+
+@contextmanager
+def read_segment(path, expected_sha1=None):
+    """Segment per mmap öffnen; liefert einen entpackenden Stream für copy_expert"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if expected_sha1 and hashlib.sha1(mm).hexdigest() != expected_sha1:
+            raise Exception(f"Checksum mismatch in segment {path}")
+        with gzip.GzipFile(fileobj=mm, mode='rb') as stream:
+            yield stream
+
+class SegmentWriter:
+    """Schreibt Batches als gzip-Segmente statt nach PostgreSQL; gleiche Schnittstelle wie BatchWriter.
+    write() meldet Zeilen erst, wenn ihr Segment abgeschlossen und im Manifest eingetragen ist."""
+    def __init__(self, stage_dir, table_name, columns, logger, encode, metrics=None, segment_bytes=SEGMENT_BYTES):
+        self.stage_dir, self.table_name, self.logger, self.encode = stage_dir, table_name, logger, encode
+        self.metrics, self.segment_bytes = metrics or StageMetrics(table_name, 'stage'), segment_bytes
+        self.dir = table_stage_dir(stage_dir, table_name)
+        # Reste einer abgebrochenen Extraktion verwerfen
+        if os.path.exists(self.dir): shutil.rmtree(self.dir)
+        os.makedirs(self.dir)
+        self.manifest = {'table': table_name, 'columns': columns, 'format': 'text', 'compression': 'gzip',
+                         'created': datetime.now().isoformat(), 'complete': False, 'rows': 0, 'segments': []}
+        save_manifest(stage_dir, self.manifest)
+        self.current = None
+        self.last_bytes, self.last_latency = 0, 0.0
+
+    def _open_segment(self):
+        self.current_file = f"{len(self.manifest['segments']) + 1:05d}.copy.gz"
+        self.current_path = os.path.join(self.dir, self.current_file)
+        self.current = gzip.open(self.current_path + '.tmp', 'wb', compresslevel=STAGE_COMPRESSLEVEL)
+        self.current_rows = self.current_bytes = 0
+
+    def _close_segment(self):
+        """Segment abschließen und ins Manifest eintragen; liefert seine Zeilenzahl"""
+        if self.current is None: return 0
+        self.current.close()
+        self.current = None
+        os.replace(self.current_path + '.tmp', self.current_path)
+        rows = self.current_rows
+        self.manifest['segments'].append({
+            'file': self.current_file, 'rows': rows, 'bytes': self.current_bytes,
+            'compressed_bytes': os.path.getsize(self.current_path), 'sha1': file_sha1(self.current_path),
+        })
+        self.manifest['rows'] += rows
+        save_manifest(self.stage_dir, self.manifest)
+        return rows
+
+    def write(self, batch):
+        start = time.perf_counter()
+        with self.metrics.timer('convert'):
+            data = self.encode(batch).getvalue().encode('utf-8')
+        with self.metrics.timer('write'):
+            if self.current is None: self._open_segment()
+            self.current.write(data)
+        self.current_rows += len(batch)
+        self.current_bytes += len(data)
+        committed = self._close_segment() if self.current_bytes >= self.segment_bytes else 0
+        self.last_bytes, self.last_latency = len(data), time.perf_counter() - start
+        self.metrics.record_batch(len(batch), len(data), self.last_latency)
+        return committed
+
+    def flush(self):
+        return self._close_segment()
+
+    def close(self):
+        # Nach einem Fehler bleibt kein halbes Segment liegen
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+            os.remove(self.current_path + '.tmp')
+
+    def complete(self, rows):
+        """Nach erfolgreicher Extraktion: Manifest als vollständig markieren"""
+        if rows != self.manifest['rows']:
+            raise Exception(f"Staged row count mismatch: {self.manifest['rows']} in segments, {rows} extracted")
+        self.manifest['complete'] = True
+        self.manifest['completed'] = datetime.now().isoformat()
+        save_manifest(self.stage_dir, self.manifest)
@@ -0,0 +1,10 @@
+"""Gemeinsame Test-Einstellungen: Skripte liegen flach im Repo-Wurzelverzeichnis.
+Die Passwort-Variablen werden nur gesetzt, damit die Module importierbar sind;
+die Tests öffnen keine Datenbankverbindung (Informix-Seite: SQLite-Stand-in)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('IFX_PW', 'test')
+os.environ.setdefault('PG_PW', 'test')
@@ -0,0 +1,39 @@
+from batch_sizing import (BatchSizer, estimate_row_width, TARGET_BATCH_BYTES, TARGET_BATCH_SECONDS,
+                          MIN_BATCH_ROWS, MAX_BATCH_ROWS, LOB_WIDTH_ESTIMATE)
+
+
+def test_row_width_estimate():
+    columns = [{'ifx_type': 'INTEGER'}, {'ifx_type': 'VARCHAR', 'length': 40 + 256 * 5}, {'ifx_type': 'CHAR', 'length': 10}]
+    # 11 + 40 + 10 Zeichen, je Spalte ein Trennzeichen
+    assert estimate_row_width(columns) == 11 + 40 + 10 + 3
+    assert estimate_row_width([{'ifx_type': 'TEXT'}]) == LOB_WIDTH_ESTIMATE + 1
+    assert estimate_row_width([]) == 1
+
+
+def test_start_size_from_width_and_limits():
+    assert BatchSizer('t', 100).size == TARGET_BATCH_BYTES // 100
+    assert BatchSizer('t', 1).size == MAX_BATCH_ROWS
+    assert BatchSizer('t', 10 ** 9).size == MIN_BATCH_ROWS
+
+
+def test_latency_doubles_and_halves():
+    sizer = BatchSizer('t', 100)
+    start = sizer.size
+    assert sizer.observe(start, start * 100, TARGET_BATCH_SECONDS / 4) == start * 2
+    assert sizer.observe(start * 2, start * 200, TARGET_BATCH_SECONDS * 4) == start
+    assert sizer.observe(start, start * 100, TARGET_BATCH_SECONDS) == start
+    assert sizer.sizes == [start, start * 2, start]
+
+
+def test_measured_width_caps_memory():
+    sizer = BatchSizer('t', 100, min_rows=10, memory_limit=1000 * 1000)
+    # Tatsächlich 10 KB je Zeile: höchstens 100 Zeilen im Speicherlimit, auch bei schnellen Batches
+    for _ in range(5): sizer.observe(sizer.size, sizer.size * 10000, 0.0)
+    assert sizer.size == 100
+
+
+def test_log_on_change():
+    lines = []
+    sizer = BatchSizer('t', 100, log=lines.append)
+    sizer.observe(sizer.size, sizer.size * 100, 0.0)
+    assert len(lines) == 2 and 'batch size' in lines[1]
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from checkpoint_store import Checkpoint, CheckpointStore, read_legacy_json
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'checkpoints.db'))
+    yield store
+    store.close()
+
+
+def write_json(path, data):
+    with open(path, 'w') as f: json.dump(data, f)
+    return str(path)
+
+
+def test_legacy_table_checkpoint_imported(tmp_path, store):
+    path = write_json(tmp_path / 'checkpoint.json', {
+        'completed_tables': ['a', 'b'], 'failed_tables': [], 'last_table': 'c',
+        'stats': {'a': {'rows': 10, 'duration': 1.5, 'status': 'completed'}, 'c': {'status': 'failed', 'error': 'boom'}},
+    })
+    checkpoint = Checkpoint(path, store)
+    assert checkpoint.scope == 'checkpoint'
+    assert checkpoint.is_completed('a') and checkpoint.get('a') == {'rows': 10, 'duration': 1.5}
+    # In completed_tables, aber ohne Statistik
+    assert checkpoint.is_completed('b')
+    assert checkpoint.status('c') == 'failed' and checkpoint.get('c') == {'error': 'boom'}
+
+
+def test_legacy_constraint_checkpoint_imported(tmp_path, store):
+    path = write_json(tmp_path / 'index_checkpoint.json', {
+        'completed': ['t.ix1'], 'not_valid': ['t.fk1'],
+        'failed': [{'table': 't', 'index': 'ix2', 'error': 'dup'}, {'table': 'u', 'error': 'no pk'}],
+    })
+    entries = {key: (status, data) for key, status, data in read_legacy_json(path)}
+    assert entries == {'t.ix1': ('completed', {}), 't.fk1': ('not_valid', {}),
+                       't.ix2': ('failed', {'error': 'dup'}), 'u': ('failed', {'error': 'no pk'})}
+    assert Checkpoint(path, store).keys('completed') == ['t.ix1']
+
+
+def test_legacy_import_only_once(tmp_path, store):
+    path = write_json(tmp_path / 'pk_checkpoint.json', {'completed': ['a'], 'failed': []})
+    Checkpoint(path, store).mark_failed('a', 'redo')
+    write_json(path, {'completed': ['a', 'b'], 'failed': []})
+    # Der Bereich existiert schon in SQLite: die JSON-Datei wird nicht erneut gelesen
+    checkpoint = Checkpoint(path, store)
+    assert checkpoint.status('a') == 'failed' and checkpoint.status('b') is None
+
+
+def test_export_roundtrip(tmp_path, store):
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'), store)
+    checkpoint.mark_completed('a', 5, 0.5, fingerprint='f1')
+    checkpoint.mark_progress('big', 1000, resume={'mode': 'key', 'key': 'id', 'last_key': 999})
+    checkpoint.mark_failed('c', ValueError('bad'))
+    path = checkpoint.export()
+    with open(path) as f: exported = json.load(f)
+    assert exported['scope'] == 'checkpoint'
+    assert exported['counts'] == {'completed': 1, 'running': 1, 'failed': 1}
+    assert exported['entries']['a'] == {'rows': 5, 'duration': 0.5, 'fingerprint': 'f1', 'status': 'completed'}
+    # Export ist wieder als Legacy-Datei lesbar
+    other = CheckpointStore(str(tmp_path / 'other.db'))
+    restored = Checkpoint(path, other)
+    assert restored.get_fingerprint('a') == 'f1'
+    assert restored.get('big')['resume']['last_key'] == 999
+    assert restored.get('c') == {'error': 'bad'}
+    other.close()
+
+
+def test_mark_unchanged_keeps_data(tmp_path, store):
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'), store)
+    checkpoint.mark_completed('a', 5, 0.5, fingerprint='f1')
+    checkpoint.mark_unchanged('a')
+    assert checkpoint.get_fingerprint('a') == 'f1' and 'last_checked' in checkpoint.get('a')
+    # Neu geöffnet: Stand kommt aus SQLite
+    assert Checkpoint(str(tmp_path / 'checkpoint.json'), store).get_fingerprint('a') == 'f1'
+
+
+def test_failed_keeps_progress(tmp_path, store):
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'), store)
+    resume = {'mode': 'key', 'key': 'id', 'last_key': 40000000}
+    checkpoint.mark_progress('big', 40000000, resume=resume)
+    checkpoint.mark_failed('big', ConnectionError('connection reset'))
+    assert checkpoint.status('big') == 'failed'
+    assert checkpoint.get('big') == {'rows_committed': 40000000, 'resume': resume, 'error': 'connection reset'}
+    # Ein erfolgreicher Lauf ersetzt den Stand vollständig
+    checkpoint.mark_completed('big', 50000000, 12.5)
+    assert checkpoint.get('big') == {'rows': 50000000, 'duration': 12.5}
@@ -0,0 +1,96 @@
+import pytest
+
+pytest.importorskip('psycopg2')
+
+import informix_standin
+import ddl_planner
+from catalog_cache import CatalogSnapshot
+
+
+@pytest.fixture(scope='module')
+def catalog(tmp_path_factory):
+    db_file = str(tmp_path_factory.mktemp('standin') / 'source.db')
+    parent = informix_standin.table_spec('parent', 10, 4, 'narrow')
+    child = informix_standin.add_reference(informix_standin.table_spec('child', 10, 4, 'mixed'), parent)
+    informix_standin.build_source(db_file, [parent, child])
+    conn = informix_standin.connect(db_file)
+    try:
+        yield CatalogSnapshot.load(conn, cache_file=None)
+    finally:
+        conn.close()
+
+
+def existing_from(plan):
+    """Ist-Schema, das genau dem Plan entspricht (wie read_pg_schema es nach dem Anwenden liefert)"""
+    return {phase: {obj['name']: (obj['table'], obj['signature']) for obj in plan[phase]} for phase in ddl_planner.PHASES}
+
+
+def actions(plan, phase):
+    return {obj['name']: obj['action'] for obj in plan[phase]}
+
+
+def test_plan_covers_all_phases(catalog):
+    plan = ddl_planner.plan_objects(catalog)
+    assert [o['name'] for o in plan['tables']] == ['child', 'parent']
+    assert len(plan['primary_keys']) == 2 and len(plan['indexes']) == 2
+    assert [(o['table'], o['parent']) for o in plan['foreign_keys']] == [('child', 'parent')]
+
+
+def test_empty_database_creates_everything(catalog):
+    plan = ddl_planner.plan_objects(catalog)
+    extra = ddl_planner.diff_plan(plan, {phase: {} for phase in ddl_planner.PHASES})
+    assert all(o['action'] == 'create' and o['statements'] == [o['create']] for phase in ddl_planner.PHASES for o in plan[phase])
+    assert extra == {phase: [] for phase in ddl_planner.PHASES}
+
+
+def test_unchanged_schema_only_replaces_foreign_keys(catalog):
+    plan = ddl_planner.plan_objects(catalog)
+    ddl_planner.diff_plan(plan, existing_from(ddl_planner.plan_objects(catalog)))
+    for phase in ('tables', 'primary_keys', 'indexes'):
+        assert set(actions(plan, phase).values()) == {'unchanged'}
+    fk = plan['foreign_keys'][0]
+    # Vor dem Neuladen entfernt (Phase tables), danach neu angelegt
+    assert fk['action'] == 'replace' and fk['statements'] == [fk['create']]
+    assert ddl_planner.phase_statements(plan, 'tables') == [fk['drop']]
+
+
+def test_constraint_phases_only_keep_foreign_keys(catalog):
+    plan = ddl_planner.plan_objects(catalog)
+    ddl_planner.diff_plan(plan, existing_from(ddl_planner.plan_objects(catalog)), drop_foreign_keys=False)
+    assert all(o['action'] == 'unchanged' for phase in ddl_planner.PHASES for o in plan[phase])
+    assert ddl_planner.phase_statements(plan, 'tables') == []
+
+
+def test_changed_parent_table_rebuilds_dependents(catalog):
+    plan = ddl_planner.plan_objects(catalog)
+    existing = existing_from(ddl_planner.plan_objects(catalog))
+    table, signature = existing['tables']['parent']
+    existing['tables']['parent'] = (table, signature[:-1])
+    ddl_planner.diff_plan(plan, existing, drop_foreign_keys=False)
+    assert actions(plan, 'tables') == {'child': 'unchanged', 'parent': 'replace'}
+    # DROP TABLE ... CASCADE nimmt PK, Index und den FK des Kindes mit
+    assert {o['table']: o['action'] for o in plan['primary_keys']} == {'child': 'unchanged', 'parent': 'create'}
+    assert {o['table']: o['action'] for o in plan['indexes']} == {'child': 'unchanged', 'parent': 'create'}
+    fk = plan['foreign_keys'][0]
+    assert fk['action'] == 'replace' and fk['statements'] == [fk['drop'], fk['create']]
+
+
+def test_objects_only_in_postgres_are_reported(catalog):
+    plan = ddl_planner.plan_objects(catalog, tables={'parent'})
+    existing = existing_from(ddl_planner.plan_objects(catalog))
+    existing['indexes']['ix_manual'] = ('parent', ['parent', False, ['c1']])
+    extra = ddl_planner.diff_plan(plan, existing, all_tables=False)
+    assert extra['indexes'] == ['ix_manual'] and extra['tables'] == []
+    assert ddl_planner.diff_plan(ddl_planner.plan_objects(catalog, tables={'parent'}), existing)['tables'] == ['child']
+
+
+def test_script_hash_matches_plan(catalog, tmp_path):
+    plan = ddl_planner.plan_objects(catalog)
+    ddl_planner.diff_plan(plan, {phase: {} for phase in ddl_planner.PHASES})
+    script, digest = ddl_planner.render_script(plan, {}, catalog.version)
+    path = tmp_path / 'plan.sql'
+    path.write_text(script, encoding='utf-8')
+    assert ddl_planner.script_hash(str(path)) == (digest, digest)
+    path.write_text(script.replace('CREATE', 'create', 1), encoding='utf-8')
+    recorded, actual = ddl_planner.script_hash(str(path))
+    assert recorded == digest != actual
@@ -0,0 +1,27 @@
+import pytest
+
+pytest.importorskip('psycopg2')
+
+from checkpoint_store import Checkpoint, CheckpointStore
+from load_stage_segments import pending_manifests
+from stage_segments import manifest_identity
+
+
+def manifest(table, created, sha1s):
+    return {'table': table, 'created': created, 'complete': True, 'rows': len(sha1s),
+            'segments': [{'file': f"{i:05d}.copy.gz", 'rows': 1, 'sha1': sha1} for i, sha1 in enumerate(sha1s, 1)]}
+
+
+def test_reextracted_table_is_loaded_again(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'checkpoints.db'))
+    checkpoint = Checkpoint(str(tmp_path / 'stage_load_checkpoint.json'), store)
+    loaded = manifest('a', '2026-10-01T02:00:00', ['s1', 's2'])
+    checkpoint.mark_completed('a', 2, 1.0, manifest_identity(loaded))
+    checkpoint.mark_completed('b', 1, 1.0)  # Eintrag aus einem Lauf ohne Kennung
+    assert pending_manifests([loaded], checkpoint) == []
+    reextracted = manifest('a', '2026-10-02T02:00:00', ['s3'])
+    assert pending_manifests([reextracted], checkpoint) == [reextracted]
+    old = manifest('b', '2026-10-01T02:00:00', ['s4'])
+    assert pending_manifests([old], checkpoint) == [old]
+    assert pending_manifests([loaded], checkpoint, replay=True) == [loaded]
+    store.close()
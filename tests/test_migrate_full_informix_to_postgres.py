@@ -0,0 +1,169 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip('jaydebeapi')
+pytest.importorskip('psycopg2')
+
+import informix_standin
+import migrate_full_informix_to_postgres as data_phase
+
+
+@pytest.fixture(scope='module')
+def ifx_conn(tmp_path_factory):
+    db_file = str(tmp_path_factory.mktemp('standin') / 'source.db')
+    informix_standin.build_source(db_file, [informix_standin.table_spec('items', 1003, 4, 'narrow'),
+                                           informix_standin.table_spec('empty', 0, 2, 'narrow')])
+    conn = informix_standin.connect(db_file)
+    yield conn
+    conn.close()
+
+
+def count(ifx_conn, where):
+    cursor = ifx_conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM items WHERE {where}")
+    rows = cursor.fetchone()[0]
+    cursor.close()
+    return rows
+
+
+def test_partition_key_is_serial_pk(ifx_conn):
+    assert data_phase.get_partition_key(ifx_conn, 'items') == 'id'
+    assert data_phase.get_partition_key(ifx_conn, 'items', unique=True) == 'id'
+
+
+@pytest.mark.parametrize('partitions', [1, 2, 8, 7, 2000])
+def test_key_ranges_cover_every_row_once(ifx_conn, partitions):
+    ranges = data_phase.compute_key_ranges(ifx_conn, 'items', 'id', partitions)
+    assert 1 <= len(ranges) <= partitions
+    assert ranges[0][0] == 1 and ranges[-1][1] == 1003 and ranges[-1][2]
+    # Lückenlos aneinander: exklusives Ende = Start des nächsten Bereichs
+    for previous, following in zip(ranges, ranges[1:]):
+        assert not previous[2] and previous[1] == following[0]
+    counts = [count(ifx_conn, data_phase.range_condition('id', bounds)) for bounds in ranges]
+    assert sum(counts) == 1003 and all(counts)
+
+
+def test_key_ranges_empty_table(ifx_conn):
+    assert data_phase.compute_key_ranges(ifx_conn, 'empty', 'id', 4) == []
+
+
+# --- prepare_resume: Zieltabelle in SQLite, Zugriff über die psycopg2-Schnittstelle ---
+
+class SqlitePgCursor:
+    def __init__(self, db): self.cursor = db.cursor()
+    def execute(self, sql, params=None):
+        if 'to_regclass' in sql:
+            sql = "SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s)"
+        self.cursor.execute(sql.replace('%s', '?'), params or ())
+    def fetchone(self): return self.cursor.fetchone()
+    def close(self): self.cursor.close()
+
+
+class SqlitePg:
+    def __init__(self, ids):
+        self.db = sqlite3.connect(':memory:')
+        self.db.execute("CREATE TABLE big (id INTEGER)")
+        self.db.executemany("INSERT INTO big VALUES (?)", [(i,) for i in ids])
+        self.db.commit()
+    def cursor(self): return SqlitePgCursor(self.db)
+    def commit(self): self.db.commit()
+    def rollback(self): self.db.rollback()
+    def ids(self): return [row[0] for row in self.db.execute("SELECT id FROM big ORDER BY id")]
+
+
+class Logger:
+    def __init__(self): self.warnings = []
+    def warning(self, message): self.warnings.append(message)
+
+
+def test_resume_key_mode_trims_uncommitted_rows():
+    pg = SqlitePg(range(1, 101))
+    progress = {'rows_committed': 80, 'resume': {'mode': 'key', 'key': 'id', 'last_key': 80}}
+    resume = data_phase.prepare_resume(pg, 'big', progress, Logger())
+    assert resume == {'mode': 'key', 'key': 'id', 'last_key': 80, 'rows': 80}
+    assert pg.ids() == list(range(1, 81))
+    # Der gespeicherte Stand selbst bleibt unverändert
+    assert 'rows' not in progress['resume']
+
+
+def test_resume_ranges_mode():
+    pg = SqlitePg(list(range(1, 50)) + list(range(50, 81)) + list(range(100, 131)))
+    ranges = [{'bounds': [1, 50, False], 'rows': 49, 'done': True},
+              {'bounds': [50, 100, False], 'rows': 20, 'done': False, 'last_key': 69},
+              {'bounds': [100, 150, True], 'rows': 30, 'done': False}]
+    progress = {'rows_committed': 99, 'resume': {'mode': 'ranges', 'key': 'id', 'ranges': ranges}}
+    resume = data_phase.prepare_resume(pg, 'big', progress, Logger())
+    # Bereich 2 ab last_key gekürzt, Bereich 3 ohne Position komplett geleert
+    assert resume['rows'] == 69 and [r['rows'] for r in resume['ranges']] == [49, 20, 0]
+    assert pg.ids() == list(range(1, 70))
+
+
+def test_resume_row_count_mismatch_reloads_without_deleting():
+    # z.B. UNLOGGED-Tabelle nach einem Absturz nur teilweise vorhanden
+    pg = SqlitePg(list(range(1, 51)) + list(range(90, 101)))
+    logger = Logger()
+    progress = {'rows_committed': 80, 'resume': {'mode': 'key', 'key': 'id', 'last_key': 80}}
+    assert data_phase.prepare_resume(pg, 'big', progress, logger) is None
+    assert len(pg.ids()) == 61 and 'reloading' in logger.warnings[0]
+
+
+def test_resume_needs_state_and_table():
+    pg = SqlitePg(range(1, 11))
+    assert data_phase.prepare_resume(pg, 'big', None, Logger()) is None
+    assert data_phase.prepare_resume(pg, 'big', {'rows_committed': 5}, Logger()) is None
+    progress = {'rows_committed': 5, 'resume': {'mode': 'key', 'key': 'id', 'last_key': 5}}
+    assert data_phase.prepare_resume(pg, 'missing', progress, Logger()) is None
+
+
+def test_failed_load_resumes(tmp_path, monkeypatch):
+    from checkpoint_store import Checkpoint, CheckpointStore
+    pg = SqlitePg([])
+    calls = []
+    def migrate_table_data(ifx_conn, pg_conn, table_name, columns, total_rows, logger, on_commit=None, resume_key=None, last_key=None, **kwargs):
+        calls.append(last_key)
+        start = last_key or 0
+        for batch_end in range(start + 10, 101, 10):
+            pg.db.executemany("INSERT INTO big VALUES (?)", [(i,) for i in range(batch_end - 9, batch_end + 1)])
+            on_commit(batch_end - start, batch_end)
+            if batch_end == 40 and len(calls) == 1:
+                # Abbruch nach 40 bestätigten Zeilen, die nächsten 5 sind nicht mehr bestätigt
+                pg.db.executemany("INSERT INTO big VALUES (?)", [(i,) for i in range(41, 46)])
+                raise ConnectionError("connection reset by peer")
+        return 100 - start
+    def create_table_postgres(pg_conn, table_name, columns, logger, **kwargs):
+        pg.db.execute("DELETE FROM big")
+        return True
+    monkeypatch.setattr(data_phase, 'get_table_schema', lambda ifx_conn, table_name, logger: [{'name': 'id'}])
+    monkeypatch.setattr(data_phase, 'get_partition_key', lambda ifx_conn, table_name, unique=False: 'id')
+    monkeypatch.setattr(data_phase, 'create_table_postgres', create_table_postgres)
+    monkeypatch.setattr(data_phase, 'migrate_table_data', migrate_table_data)
+    monkeypatch.setattr(data_phase, 'set_table_logged', lambda pg_conn, table_name, rows: None)
+    store = CheckpointStore(str(tmp_path / 'checkpoints.db'))
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'), store)
+    logger = Logger()
+    logger.log = logger.error = lambda message: None
+    options = data_phase.parse_args(['--resume-threshold', '1'])
+    table_info = {'name': 'big', 'rows': 100}
+
+    assert not data_phase.migrate_single_table(None, pg, table_info, logger, checkpoint, options)
+    assert checkpoint.status('big') == 'failed' and checkpoint.get('big')['rows_committed'] == 40
+    assert data_phase.migrate_single_table(None, pg, table_info, logger, checkpoint, options)
+    # Zweiter Lauf setzt nach Schlüssel 40 fort, ohne die Tabelle neu anzulegen
+    assert calls == [None, 40]
+    assert pg.ids() == list(range(1, 101))
+    assert checkpoint.is_completed('big') and checkpoint.get('big')['rows'] == 100
+    store.close()
+
+
+def test_fingerprint_covers_every_column():
+    from schema_mapping import TYPE_MAPPING, schema_column
+    columns = [schema_column(f"c{code}", code, 10) for code in sorted(TYPE_MAPPING)] * 3
+    aggregates = data_phase.fingerprint_aggregates(columns)
+    # COUNT(*) plus ein Aggregat je Spalte, auch über die 16. Spalte hinaus
+    assert aggregates[0] == 'COUNT(*)' and len(aggregates) == len(columns) + 1
+    by_type = dict(zip([c['ifx_type'] for c in columns], aggregates[1:]))
+    assert by_type['DATETIME'].startswith('SUM((CAST(DATE(c10)')
+    assert by_type['BOOLEAN'] == "SUM(CASE WHEN c43 = 't' THEN 1 ELSE 0 END)"
+    assert by_type['LVARCHAR'] == 'SUM(LENGTH(c40))'
+    assert by_type['TEXT'] == 'SUM(CASE WHEN c12 IS NULL THEN 0 ELSE 1 END)'
@@ -0,0 +1,16 @@
+import threading
+
+from migration_metrics import ACTIVE_STAGES, StageMetrics
+
+
+def test_timer_label_for_profiler():
+    metrics = StageMetrics('indexes', 'constraints')
+    ident = threading.get_ident()
+    with metrics.timer('write', 'orders'):
+        assert ACTIVE_STAGES[ident] == ('orders', 'write')
+    # Zwischen zwei Stufen bleibt die Tabelle zugeordnet, die Zeit zählt zur Phase
+    assert ACTIVE_STAGES[ident] == ('orders', None)
+    with metrics.timer('commit'):
+        assert ACTIVE_STAGES[ident] == ('indexes', 'commit')
+    assert set(metrics.stage_seconds) == {'write', 'commit'}
+    ACTIVE_STAGES.pop(ident, None)
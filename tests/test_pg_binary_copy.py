@@ -0,0 +1,69 @@
+import struct
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from pg_binary_copy import encode_numeric, BinaryCopyEncoder, COPY_HEADER, COPY_TRAILER
+
+
+def decode_numeric(data):
+    """Gegenstück zu encode_numeric (Format von numeric_send)"""
+    ndigits, weight, sign, dscale = struct.unpack('!hhHh', data[:8])
+    groups = struct.unpack(f'!{ndigits}h', data[8:])
+    value = sum(Decimal(g) * Decimal(10000) ** (weight - i) for i, g in enumerate(groups))
+    return (-value if sign == 0x4000 else value), dscale
+
+
+def header(data):
+    return struct.unpack('!hhHh', data[:8])
+
+
+def test_numeric_layout():
+    assert header(encode_numeric(Decimal('0'))) == (0, 0, 0, 0)
+    assert encode_numeric('12345.678') == struct.pack('!hhHh3h', 3, 1, 0, 3, 1, 2345, 6780)
+    assert encode_numeric('-0.0001') == struct.pack('!hhHh1h', 1, -1, 0x4000, 4, 1)
+    # Nullgruppen am Ende entfallen, die Skala bleibt
+    assert encode_numeric('10000.00') == struct.pack('!hhHh1h', 1, 1, 0, 2, 1)
+    assert header(encode_numeric(Decimal('NaN')))[2] == 0xC000
+
+
+@pytest.mark.parametrize('text', ['1', '-1', '0.5', '9999', '10000', '123456789012345678.123456', '-0.000001230',
+                                  '1E+5', '0.00', '-7.10', '99999999.99'])
+def test_numeric_roundtrip(text):
+    value, dscale = decode_numeric(encode_numeric(text))
+    assert value == Decimal(text)
+    assert dscale == max(0, -Decimal(text).as_tuple().exponent)
+
+
+def test_numeric_accepts_int_and_float():
+    assert decode_numeric(encode_numeric(42))[0] == 42
+    assert decode_numeric(encode_numeric(2.5))[0] == Decimal('2.5')
+
+
+def test_numeric_infinity_rejected():
+    with pytest.raises(ValueError):
+        encode_numeric(Decimal('Infinity'))
+
+
+def test_encoder_rows():
+    columns = [{'name': 'id', 'type': 'INTEGER'}, {'name': 'name', 'type': 'VARCHAR(10)'},
+               {'name': 'day', 'type': 'DATE'}, {'name': 'at', 'type': 'TIMESTAMP'}, {'name': 'amount', 'type': 'NUMERIC(12,2)'}]
+    encoder = BinaryCopyEncoder(columns)
+    assert encoder.supported
+    data = encoder.encode([(7, 'ä', date(2000, 1, 2), datetime(2000, 1, 1, 0, 0, 1), None)]).getvalue()
+    assert data.startswith(COPY_HEADER) and data.endswith(COPY_TRAILER)
+    row = data[len(COPY_HEADER):-len(COPY_TRAILER)]
+    assert row == (struct.pack('!h', 5) + struct.pack('!ii', 4, 7) + struct.pack('!i', 2) + 'ä'.encode('utf-8')
+                   + struct.pack('!ii', 4, 1) + struct.pack('!iq', 8, 1000000) + struct.pack('!i', -1))
+
+
+def test_encoder_reports_unsupported_types():
+    encoder = BinaryCopyEncoder([{'name': 'id', 'type': 'INTEGER'}, {'name': 'span', 'type': 'INTERVAL'}])
+    assert not encoder.supported and encoder.unsupported == ['span']
+
+
+def test_bytea_accepts_bytearray():
+    from pg_binary_copy import column_encoder
+    encode = column_encoder('BYTEA')
+    assert encode(bytearray(b'\x00\xff')) == encode(b'\x00\xff') == struct.pack('!i', 2) + b'\x00\xff'
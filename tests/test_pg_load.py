@@ -0,0 +1,36 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from pg_load import format_copy_value, build_copy_buffer, COPY_NULL
+
+
+def test_null_and_scalars():
+    assert format_copy_value(None) == COPY_NULL
+    assert format_copy_value(True) == 't'
+    assert format_copy_value(False) == 'f'
+    assert format_copy_value(42) == '42'
+    assert format_copy_value(Decimal('-12.50')) == '-12.50'
+    assert format_copy_value(1.5) == '1.5'
+
+
+def test_dates():
+    assert format_copy_value(date(2024, 2, 29)) == '2024-02-29'
+    assert format_copy_value(datetime(2024, 2, 29, 13, 5, 7, 120000)) == '2024-02-29 13:05:07.120000'
+
+
+def test_text_escapes():
+    assert format_copy_value('a|b') == 'a\\|b'
+    assert format_copy_value('back\\slash') == 'back\\\\slash'
+    assert format_copy_value('tab\tnl\ncr\r') == 'tab\\tnl\\ncr\\r'
+    # Ein Text "\N" darf nicht als NULL ankommen
+    assert format_copy_value('\\N') == '\\\\N'
+
+
+def test_bytea_hex():
+    assert format_copy_value(b'\x00\xff') == '\\\\x00ff'
+    assert format_copy_value(bytearray(b'A')) == '\\\\x41'
+
+
+def test_build_copy_buffer():
+    buf = build_copy_buffer([(1, 'x|y', None), (2, '', date(2000, 1, 1))])
+    assert buf.read() == '1|x\\|y|\\N\n2||2000-01-01\n'
@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip('psycopg2')
+
+from validate_migration import build_checksum_exprs
+
+
+class Catalog:
+    def __init__(self, columns): self.columns = columns
+    def table_columns(self, table_name): return dict(enumerate(self.columns, 1))
+
+
+def test_checksum_exprs_cover_datetime_and_boolean():
+    catalog = Catalog([{'name': 'id', 'coltype': 262}, {'name': 'changed', 'coltype': 10},
+                       {'name': 'active', 'coltype': 43}, {'name': 'note', 'coltype': 13}, {'name': 'blob', 'coltype': 11}])
+    ifx, pg = build_checksum_exprs(catalog, 't')
+    # COUNT(*), id, changed, active, note; BYTE geht nicht ein
+    assert len(ifx) == len(pg) == 5
+    assert 'DATE(changed) - MDY(1,1,1970)' in ifx[2] and pg[2] == 'SUM(FLOOR(EXTRACT(EPOCH FROM "changed"))::bigint)::text'
+    assert ifx[3] == "COUNT(CASE WHEN active = 't' THEN 1 END)" and pg[3] == 'COUNT(CASE WHEN "active" THEN 1 END)'
@@ -6,8 +6,31 @@ Zentralisiertes Sicherheits-Update: Nutzt db_config.py
 
 import sys
 import os
+import argparse
+import queue
+import threading
+from decimal import Decimal, InvalidOperation
 # --- ZENTRALE CONFIG IMPORTIEREN ---
 from db_config import connect_informix, connect_postgres, PG_CONFIG
+from catalog_cache import CatalogSnapshot
+from pg_load import escape_identifier
+from schema_mapping import ifx_epoch_seconds
+from row_counts import count_all_tables, source_tables, summarize, COUNT_WORKERS
+from sample_diff import sample_tables, write_report, SAMPLE_BUDGET, SAMPLE_MARGIN, SAMPLE_WORKERS
+
+# Prüfsummen-Vergleich: Bereiche je Tabelle, Aufteilung beim Drill-Down, Bereichsgröße für den Schlüsselabgleich
+CHECKSUM_CHUNKS = 16
+DRILL_SPLIT = 8
+DRILL_MIN_KEYS = 1000
+CHECKSUM_WORKERS = 4
+
+# Informix-Basistypen (coltype MOD 256)
+INTEGER_TYPES = {1, 2, 6, 17, 18, 52, 53}
+SUM_TYPES = INTEGER_TYPES | {5, 8}
+TEXT_TYPES = {0, 13, 15, 16}
+DATE_TYPE = 7
+DATETIME_TYPE = 10
+BOOLEAN_TYPE = 43
 
 def validate_table_count(ifx_conn, pg_conn):
     """Vergleicht die Anzahl der Tabellen in beiden Systemen"""
@@ -32,52 +55,21 @@ def validate_table_count(ifx_conn, pg_conn):
     print(f"{'✓' if match else '✗'} {'MATCH!' if match else 'MISMATCH!'}")
     return match
 
-def validate_large_tables(ifx_conn, pg_conn):
-    """Vergleicht Zeilenzahlen der 10 größten Tabellen"""
+def validate_row_counts(catalog, workers=COUNT_WORKERS):
+    """Exakte Zeilenzahlen aller Tabellen auf beiden Seiten (row_counts)"""
+    tables = source_tables(catalog)
     print("\n" + "=" * 80)
-    print("2. TOP 10 TABELLEN - ROW COUNT VALIDIERUNG")
+    print(f"2. ROW COUNT VALIDIERUNG ({len(tables)} Tabellen, {workers} Verbindungen je Datenbank)")
     print("=" * 80)
     
-    pg_cursor = pg_conn.cursor()
-    # Wir holen die Top 10 Tabellennamen basierend auf der aktuellen Statistik
-    pg_cursor.execute("""
-        SELECT relname, n_live_tup 
-        FROM pg_stat_user_tables 
-        WHERE schemaname = 'public'
-        ORDER BY n_live_tup DESC 
-        LIMIT 10
-    """)
-    
-    all_match = True
-    rows = pg_cursor.fetchall()
-    
-    if not rows:
-        print("⚠ Keine Daten in PostgreSQL gefunden oder Statistiken nicht aktuell.")
-        return False
-
-    for table_name, pg_rows in rows:
-        ifx_cursor = ifx_conn.cursor()
-        try:
-            ifx_cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-            ifx_rows = ifx_cursor.fetchone()[0]
-            
-            # Da n_live_tup ein Schätzwert sein kann, machen wir zur Sicherheit 
-            # bei Mismatch einen echten COUNT(*) in PG
-            if ifx_rows != pg_rows:
-                pg_cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                pg_rows = pg_cursor.fetchone()[0]
-
-            is_match = ifx_rows == pg_rows
-            icon = "✓" if is_match else "✗"
-            print(f"{icon} {table_name:30} | IFX: {ifx_rows:>10,} | PG: {pg_rows:>10,}")
-            
-            if not is_match:
-                all_match = False
-        except Exception as e:
-            print(f"✗ {table_name:30} | ERROR: {e}")
-            all_match = False
-            
-    return all_match
+    results = count_all_tables(tables, workers)
+    mismatches, errors = summarize(results)
+    for r in mismatches:
+        print(f"✗ {r['table']:30} | IFX: {r['ifx']:>10,} | PG: {r['pg']:>10,}")
+    for r in errors:
+        print(f"✗ {r['table']:30} | ERROR: {r['error']}")
+    print(f"{len(results) - len(mismatches) - len(errors)}/{len(results)} Tabellen mit gleicher Zeilenzahl")
+    return not mismatches and not errors
 
 def validate_data_integrity(pg_conn):
     """Zusätzliche Integritätschecks"""
@@ -98,7 +90,196 @@ def validate_data_integrity(pg_conn):
     size = cursor.fetchone()[0]
     print(f"Größe der PostgreSQL Datenbank '{db_name}': {size}")
 
+# --- 4. INHALTS-PRÜFSUMMEN JE SCHLÜSSELBEREICH ---
+
+def build_checksum_exprs(catalog, table_name):
+    """Reihenfolgeunabhängige Aggregate je Spalte als (Informix, PostgreSQL)-Ausdrücke.
+    Informix-Summen werden als Text geliefert, da jaydebeapi DECIMAL sonst als double umwandelt.
+    Text nur über die Länge: gleich lange Abweichungen findet erst der Stichproben-Vergleich (--sample).
+    INTERVAL, BYTE und TEXT gehen nicht ein."""
+    ifx_exprs, pg_exprs = ['COUNT(*)'], ['COUNT(*)']
+    for colno, col in sorted(catalog.table_columns(table_name).items()):
+        base, name = col['coltype'] % 256, col['name']
+        if base in SUM_TYPES:
+            ifx_exprs.append(f"CAST(SUM({name}) AS VARCHAR(64))")
+            pg_exprs.append(f'SUM("{name}")::text')
+        elif base in TEXT_TYPES:
+            # Informix-LENGTH zählt Bytes ohne Leerzeichen am Ende
+            ifx_exprs.append(f"SUM(LENGTH({name}))")
+            pg_exprs.append(f'SUM(OCTET_LENGTH(RTRIM("{name}")))')
+        elif base == DATE_TYPE:
+            ifx_exprs.append(f"SUM({name} - MDY(12,31,1899))")
+            pg_exprs.append(f'SUM("{name}" - DATE \'1899-12-31\')')
+        elif base == DATETIME_TYPE:
+            # Sekunden seit 1970 auf beiden Seiten, Sekundenbruchteile abgeschnitten
+            ifx_exprs.append(f"CAST(SUM({ifx_epoch_seconds(name)}) AS VARCHAR(64))")
+            pg_exprs.append(f'SUM(FLOOR(EXTRACT(EPOCH FROM "{name}"))::bigint)::text')
+        elif base == BOOLEAN_TYPE:
+            ifx_exprs.append(f"COUNT(CASE WHEN {name} = 't' THEN 1 END)")
+            pg_exprs.append(f'COUNT(CASE WHEN "{name}" THEN 1 END)')
+    return ifx_exprs, pg_exprs
+
+def normalize_checksum(values):
+    result = []
+    for v in values:
+        try: result.append(None if v is None else Decimal(str(v)).normalize())
+        except InvalidOperation: result.append(str(v))
+    return tuple(result)
+
+class TableChecksum:
+    """Vergleicht eine Tabelle bereichsweise; nur abweichende Bereiche werden weiter unterteilt"""
+    def __init__(self, ifx_conn, pg_conn, catalog, table_name):
+        self.ifx_conn, self.pg_conn, self.table_name = ifx_conn, pg_conn, table_name
+        self.pg_table = escape_identifier(table_name)  # wie beim Anlegen (Schlüsselwörter wie "user" in Anführungszeichen)
+        self.ifx_exprs, self.pg_exprs = build_checksum_exprs(catalog, table_name)
+        pk = catalog.primary_key_columns(table_name)
+        cols = {c['name']: c for c in catalog.table_columns(table_name).values()}
+        # Bereiche nur über eine ganzzahlige führende PK-Spalte
+        self.key = pk[0] if pk and cols.get(pk[0], {}).get('coltype', -1) % 256 in INTEGER_TYPES else None
+
+    def _ifx_query(self, sql):
+        cursor = self.ifx_conn.cursor()
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    def _pg_query(self, sql):
+        cursor = self.pg_conn.cursor()
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    def bucket_sums(self, low, high, width):
+        """{Bucket-Nr: Aggregate} für beide Seiten in je einem Scan über [low, high]"""
+        k = self.key
+        ifx_sql = (f"SELECT TRUNC(({k} - {low}) / {width}), {', '.join(self.ifx_exprs)} FROM {self.table_name} "
+                   f"WHERE {k} >= {low} AND {k} <= {high} GROUP BY 1")
+        pg_sql = (f'SELECT ("{k}" - {low}) / {width}, {", ".join(self.pg_exprs)} FROM {self.pg_table} '
+                  f'WHERE "{k}" >= {low} AND "{k}" <= {high} GROUP BY 1')
+        ifx = {int(row[0]): normalize_checksum(row[1:]) for row in self._ifx_query(ifx_sql)}
+        pg = {int(row[0]): normalize_checksum(row[1:]) for row in self._pg_query(pg_sql)}
+        return ifx, pg
+
+    def diff_keys(self, low, high):
+        k = self.key
+        ifx_keys = {int(r[0]) for r in self._ifx_query(f"SELECT {k} FROM {self.table_name} WHERE {k} >= {low} AND {k} <= {high}")}
+        pg_keys = {int(r[0]) for r in self._pg_query(f'SELECT "{k}" FROM {self.pg_table} WHERE "{k}" >= {low} AND "{k}" <= {high}')}
+        return sorted(ifx_keys - pg_keys), sorted(pg_keys - ifx_keys)
+
+    def compare_range(self, low, high, width):
+        mismatches = []
+        ifx, pg = self.bucket_sums(low, high, width)
+        for bucket in sorted(set(ifx) | set(pg)):
+            if ifx.get(bucket) == pg.get(bucket): continue
+            b_low = low + bucket * width
+            b_high = min(high, b_low + width - 1)
+            if b_high - b_low + 1 <= DRILL_MIN_KEYS:
+                missing, extra = self.diff_keys(b_low, b_high)
+                mismatches.append({'range': (b_low, b_high), 'ifx_rows': (ifx.get(bucket) or (0,))[0], 'pg_rows': (pg.get(bucket) or (0,))[0],
+                                   'missing_in_pg': missing[:10], 'extra_in_pg': extra[:10]})
+            else:
+                mismatches.extend(self.compare_range(b_low, b_high, -(-(b_high - b_low + 1) // DRILL_SPLIT)))
+        return mismatches
+
+    def run(self):
+        if self.key is None:
+            # Ohne Schlüssel: ein Aggregat über die ganze Tabelle, kein Drill-Down möglich
+            ifx = normalize_checksum(self._ifx_query(f"SELECT {', '.join(self.ifx_exprs)} FROM {self.table_name}")[0])
+            pg = normalize_checksum(self._pg_query(f"SELECT {', '.join(self.pg_exprs)} FROM {self.pg_table}")[0])
+            return [] if ifx == pg else [{'range': None, 'ifx_rows': ifx[0], 'pg_rows': pg[0]}]
+        k = self.key
+        ifx_low, ifx_high = self._ifx_query(f"SELECT MIN({k}), MAX({k}) FROM {self.table_name}")[0]
+        pg_low, pg_high = self._pg_query(f'SELECT MIN("{k}"), MAX("{k}") FROM {self.pg_table}')[0]
+        lows = [int(v) for v in (ifx_low, pg_low) if v is not None]
+        highs = [int(v) for v in (ifx_high, pg_high) if v is not None]
+        if not lows: return []
+        low, high = min(lows), max(highs)
+        return self.compare_range(low, high, max(1, -(-(high - low + 1) // CHECKSUM_CHUNKS)))
+
+def validate_checksums(catalog, tables, workers=CHECKSUM_WORKERS):
+    """Prüfsummen-Vergleich über alle Tabellen, parallel mit eigenen Verbindungen je Worker"""
+    print("\n" + "=" * 80)
+    print(f"4. INHALTS-PRÜFSUMMEN ({len(tables)} Tabellen, {workers} Worker)")
+    print("=" * 80)
+    print("Hinweis: Textspalten nur über die Länge geprüft, Werte vergleicht --sample")
+    
+    table_queue, results, lock = queue.Queue(), {}, threading.Lock()
+    for table_name in tables: table_queue.put(table_name)
+    
+    def worker():
+        try:
+            ifx_conn = connect_informix()
+            pg_conn = connect_postgres()
+        except Exception as e:
+            # Die Tabellen übernehmen die übrigen Worker; ohne jeden Worker werden sie unten als Fehler gemeldet
+            with lock: print(f"✗ {threading.current_thread().name}: Verbindung fehlgeschlagen: {e}")
+            if 'ifx_conn' in locals(): ifx_conn.close()
+            return
+        try:
+            while True:
+                try: table_name = table_queue.get_nowait()
+                except queue.Empty: break
+                try:
+                    mismatches, error = TableChecksum(ifx_conn, pg_conn, catalog, table_name).run(), None
+                except Exception as e:
+                    pg_conn.rollback()
+                    mismatches, error = None, str(e)
+                with lock:
+                    results[table_name] = mismatches
+                    if error:
+                        print(f"✗ {table_name:30} | ERROR: {error}")
+                    elif mismatches:
+                        print(f"✗ {table_name:30} | {len(mismatches)} abweichende Bereiche")
+                        for m in mismatches:
+                            print(f"    Bereich {m['range']}: IFX {m['ifx_rows']} / PG {m['pg_rows']} Zeilen"
+                                  + (f" | fehlt in PG: {m['missing_in_pg']} | nur in PG: {m['extra_in_pg']}" if 'missing_in_pg' in m else ""))
+        finally:
+            ifx_conn.close(); pg_conn.close()
+    
+    threads = [threading.Thread(target=worker, name=f"checksum-{n}") for n in range(workers)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    while not table_queue.empty():
+        table_name = table_queue.get_nowait()
+        results[table_name] = None
+        print(f"✗ {table_name:30} | ERROR: nicht geprüft, keine Verbindung")
+    
+    failed = [t for t, m in results.items() if m is None or m]
+    print(f"{len(results) - len(failed)}/{len(tables)} Tabellen identisch")
+    return not failed and len(results) == len(tables)
+
+def validate_samples(catalog, tables, workers=SAMPLE_WORKERS, budget=SAMPLE_BUDGET, margin=SAMPLE_MARGIN, seed=None):
+    """Stichproben-Vergleich Spalte für Spalte (sample_diff), Bericht als JSON im Log-Verzeichnis"""
+    print("\n" + "=" * 80)
+    print(f"5. STICHPROBEN-VERGLEICH ({len(tables)} Tabellen, {workers} Worker, Budget {budget}s)")
+    print("=" * 80)
+    
+    results = sample_tables(catalog, tables, workers, budget, margin, seed)
+    compared = sum(r.get('compared', 0) for r in results.values())
+    failed = [r for r in results.values() if r.get('error') or r.get('mismatched_rows') or r.get('missing_in_informix') or r.get('missing_in_postgres')]
+    skipped = [r for r in results.values() if r.get('skipped')]
+    print(f"{compared} Zeilen verglichen, {len(results) - len(failed) - len(skipped)}/{len(tables)} Tabellen ohne Abweichung"
+          + (f", {len(skipped)} übersprungen" if skipped else ""))
+    for r in skipped: print(f"  - {r['table']:30} | {r['skipped']}")
+    print(f"Bericht: {write_report(results)}")
+    return not failed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Validierung Informix → PostgreSQL")
+    parser.add_argument('--checksums', action='store_true', help="Inhalte je Schlüsselbereich per Prüfsumme vergleichen (Zahlen, DATE, DATETIME, BOOLEAN; Text nur über die Länge, Werte vergleicht --sample)")
+    parser.add_argument('--tables', help="Kommagetrennte Tabellen für Prüfsummen- und Stichproben-Vergleich (Default: alle)")
+    parser.add_argument('--workers', type=int, default=CHECKSUM_WORKERS, help="Parallele Tabellen beim Prüfsummen- und Stichproben-Vergleich")
+    parser.add_argument('--count-workers', type=int, default=COUNT_WORKERS, help="Verbindungen je Datenbank für die Zeilenzählung")
+    parser.add_argument('--sample', action='store_true', help="Zufällige Zeilen je Tabelle Spalte für Spalte vergleichen")
+    parser.add_argument('--sample-budget', type=int, default=SAMPLE_BUDGET, help="Sekunden für den Stichproben-Vergleich aller Tabellen")
+    parser.add_argument('--sample-margin', type=float, default=SAMPLE_MARGIN, help="Zulässige Unschärfe der Abweichungsrate (0.02 = ±2 %%)")
+    parser.add_argument('--sample-seed', type=int, help="Feste Stichprobe für wiederholbare Läufe")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     print("=" * 80)
     print("CATUNO MIGRATION VALIDIERUNG (SECURE MODE)")
     print("=" * 80)
@@ -111,14 +292,24 @@ def main():
         
         # Validierungen ausführen
         res_count = validate_table_count(ifx_conn, pg_conn)
-        res_rows = validate_large_tables(ifx_conn, pg_conn)
+        catalog = CatalogSnapshot.load(ifx_conn)
+        res_rows = validate_row_counts(catalog, args.count_workers)
         validate_data_integrity(pg_conn)
+        res_checksums = True
+        if args.checksums:
+            tables = args.tables.split(',') if args.tables else sorted(t['name'] for t in catalog.tables.values() if t['type'] == 'T')
+            res_checksums = validate_checksums(catalog, tables, args.workers)
+        res_samples = True
+        if args.sample:
+            names = set(args.tables.split(',')) if args.tables else None
+            tables = [t for t in source_tables(catalog) if names is None or t['name'] in names]
+            res_samples = validate_samples(catalog, tables, args.workers, args.sample_budget, args.sample_margin, args.sample_seed)
         
         # Fazit
         print("\n" + "=" * 80)
         print("ERGEBNIS")
         print("-" * 80)
-        if res_count and res_rows:
+        if res_count and res_rows and res_checksums and res_samples:
             print("✓✓✓ VALIDIERUNG ERFOLGREICH! Alle Kern-Metriken passen. ✓✓✓")
             return 0
         else:
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+SPALTEN-KONVERTER: Ein vorab gewählter JDBC-Getter pro Spalte
+Statt jaydebeapis generischer Umwandlung (DECIMAL über double, DATE/TIMESTAMP
+über mehrere Java-Aufrufe, Strings teils als JString) wird einmal pro Tabelle
+aus den Informix-Typen von get_table_schema ein Konverter je Spalte gewählt.
+Die Konverter haben die Signatur der jaydebeapi-Konverter (rs, index) und
+werden von jdbc_fetch.fetch_column_block blockweise angewendet.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+# DECIMAL/MONEY: 'string' reicht den Text unverändert an COPY durch, 'decimal' liefert Decimal
+DECIMAL_MODE = 'string'
+
+def _int(rs, idx):
+    v = rs.getObject(idx)
+    return None if v is None else int(v)
+
+def _float(rs, idx):
+    v = rs.getObject(idx)
+    return None if v is None else float(v)
+
+def _bool(rs, idx):
+    v = rs.getObject(idx)
+    return None if v is None else bool(v)
+
+def _string(rs, idx):
+    v = rs.getString(idx)
+    return None if v is None else str(v)
+
+def _decimal(rs, idx):
+    v = rs.getString(idx)
+    return None if v is None else Decimal(str(v))
+
+def _date(rs, idx):
+    # java.sql.Date.toString() liefert immer yyyy-mm-dd, unabhängig von DBDATE
+    v = rs.getDate(idx)
+    return None if v is None else date.fromisoformat(str(v))
+
+def parse_timestamp(text):
+    """java.sql.Timestamp.toString() (bis zu 9 Nachkommastellen) → datetime"""
+    main, _, fraction = text.partition('.')
+    value = datetime.fromisoformat(main)
+    if fraction:
+        value = value.replace(microsecond=int(fraction[:6].ljust(6, '0')))
+    return value
+
+def _timestamp(rs, idx):
+    v = rs.getTimestamp(idx)
+    return None if v is None else parse_timestamp(str(v))
+
+def _bytes(rs, idx):
+    v = rs.getBytes(idx)
+    return None if v is None else bytes(v)
+
+TYPE_CONVERTERS = {
+    'SMALLINT': _int, 'INTEGER': _int, 'SERIAL': _int,
+    'INT8': _int, 'SERIAL8': _int, 'BIGINT': _int, 'BIGSERIAL': _int,
+    'FLOAT': _float, 'SMALLFLOAT': _float,
+    'DATE': _date, 'DATETIME': _timestamp,
+    'CHAR': _string, 'NCHAR': _string, 'VARCHAR': _string, 'NVARCHAR': _string,
+    'LVARCHAR': _string, 'TEXT': _string,
+    'BYTE': _bytes, 'BLOB': _bytes, 'BOOLEAN': _bool,
+}
+
+def build_converter_plan(columns, default_converters=None, decimal_mode=DECIMAL_MODE):
+    """Ein Konverter je Spalte (Reihenfolge wie get_table_schema / SELECT *).
+    Typen ohne eigenen Konverter (z.B. INTERVAL) behalten den jaydebeapi-Konverter."""
+    plan = []
+    for i, col in enumerate(columns):
+        ifx_type = col.get('ifx_type')
+        if ifx_type in ('DECIMAL', 'MONEY'):
+            plan.append(_string if decimal_mode == 'string' else _decimal)
+        elif ifx_type in TYPE_CONVERTERS:
+            plan.append(TYPE_CONVERTERS[ifx_type])
+        elif default_converters is not None:
+            plan.append(default_converters[i])
+        else:
+            plan.append(lambda rs, idx: rs.getObject(idx))
+    return plan